@@ -0,0 +1,134 @@
+"""Non-blocking access to LanceDBClient from async code.
+
+LanceDBClient is synchronous: calling it from a FastAPI handler blocks
+the event loop for the whole search or insert. Handlers go through this
+layer instead. It runs the client's methods on two dedicated thread pools:
+
+- reads (search, lookups): up to DB_READ_CONCURRENCY at a time
+- writes (insert, delete, status updates): one thread, so writes run one
+  after another in submission order
+
+Reads never wait for writes. LanceDB reads see the last committed
+version, so a query keeps being served while a large insert is running on
+the writer thread.
+
+submit_write() queues a write from synchronous code without waiting
+(e.g. the orphan-source cleanup in retrieval).
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+import asyncio
+import functools
+import threading
+
+import pyarrow as pa
+import numpy as np
+
+from config import DB_READ_CONCURRENCY
+
+_read_executor: Optional[ThreadPoolExecutor] = None
+_write_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()  # submit_write() may create the writer from any thread
+
+
+def _readers() -> ThreadPoolExecutor:
+    global _read_executor
+    if _read_executor is None:
+        with _executor_lock:
+            if _read_executor is None:
+                _read_executor = ThreadPoolExecutor(max_workers=DB_READ_CONCURRENCY, thread_name_prefix="lancedb-read")
+    return _read_executor
+
+
+def _writer() -> ThreadPoolExecutor:
+    global _write_executor
+    if _write_executor is None:
+        with _executor_lock:
+            if _write_executor is None:
+                _write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lancedb-write")
+    return _write_executor
+
+
+async def run_read(fn: Callable, *args, **kwargs):
+    """Run a blocking read on the read pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_readers(), functools.partial(fn, *args, **kwargs))
+
+
+async def run_write(fn: Callable, *args, **kwargs):
+    """Run a blocking write on the single writer thread, after the writes queued before it."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_writer(), functools.partial(fn, *args, **kwargs))
+
+
+def submit_write(fn: Callable, *args, **kwargs) -> Future:
+    """Queue a write from any thread without waiting for it."""
+    return _writer().submit(fn, *args, **kwargs)
+
+
+class AsyncLanceDB:
+    """Awaitable versions of the LanceDBClient methods used by request handlers."""
+
+    def __init__(self, client):
+        self.client = client
+
+    # --- reads ---
+
+    async def search(self, query_embedding, limit: int = 5, **kwargs) -> list[dict]:
+        return await run_read(self.client.search, query_embedding, limit, **kwargs)
+
+    async def search_arrow(self, query_embedding, limit: int = 5, **kwargs) -> pa.Table:
+        return await run_read(self.client.search_arrow, query_embedding, limit, **kwargs)
+
+    async def get_by_id(self, chunk_id: str, columns: Optional[list[str]] = None) -> Optional[dict]:
+        return await run_read(self.client.get_by_id, chunk_id, columns)
+
+    async def get_by_ids(self, chunk_ids: list[str], columns: Optional[list[str]] = None) -> list[dict]:
+        return await run_read(self.client.get_by_ids, chunk_ids, columns)
+
+    async def get_by_source(self, source_id: str, columns: Optional[list[str]] = None) -> list[dict]:
+        return await run_read(self.client.get_by_source, source_id, columns)
+
+    async def index_stats(self) -> dict:
+        return await run_read(self.client.index_stats)
+
+    def count(self) -> int:
+        """O(1) from the corpus stats; no thread hop needed."""
+        return self.client.count()
+
+    # --- writes ---
+
+    async def insert(self, chunks: list[dict], embeddings: Optional[np.ndarray] = None) -> int:
+        return await run_write(self.client.insert, chunks, embeddings)
+
+    async def delete_source(self, source_id: str) -> int:
+        return await run_write(self.client.delete_source, source_id)
+
+    async def delete_source_from(self, source_id: str, timestamp: float) -> None:
+        return await run_write(self.client.delete_source_from, source_id, timestamp)
+
+    async def mark_source_complete(self, source_id: str) -> None:
+        return await run_write(self.client.mark_source_complete, source_id)
+
+
+_async_db: Optional[AsyncLanceDB] = None
+
+
+def get_async_db() -> AsyncLanceDB:
+    """Async facade over get_db()."""
+    global _async_db
+    if _async_db is None:
+        from db import get_db
+        _async_db = AsyncLanceDB(get_db())
+    return _async_db
+
+
+def shutdown_async_db() -> None:
+    """Finish queued writes; drop queued reads."""
+    global _read_executor, _write_executor
+    if _read_executor is not None:
+        _read_executor.shutdown(wait=False, cancel_futures=True)
+        _read_executor = None
+    if _write_executor is not None:
+        _write_executor.shutdown(wait=True)
+        _write_executor = None
@@ -0,0 +1,121 @@
+"""Benchmark ANN vector indexes: recall@k vs exact search and query latency.
+
+Copies the evidence table's vectors into a scratch LanceDB table and
+times flat (brute-force) search there. It then builds each index type
+with the parameters indexes.py would use and sweeps nprobes and
+refine_factor. Stored rows serve as queries (each excluded from its own
+results).
+
+Usage (from the Backend directory):
+    python benchmarks/bench_ann.py --k 10 --nprobes 5 10 20 50 --refine 0 5 10
+    python benchmarks/bench_ann.py --synthetic 200000   # random unit vectors
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import lancedb  # noqa: E402
+
+from indexes import METRIC, index_params  # noqa: E402
+
+
+def load_vectors(synthetic: int, dim: int, seed: int) -> np.ndarray:
+    if synthetic:
+        vectors = np.random.default_rng(seed).standard_normal((synthetic, dim)).astype(np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    from db import get_db
+
+    db = get_db()
+    parts = []
+    for batch in db.scan(columns=["text_embedding"]):
+        flat = batch.column(0).flatten().to_numpy(zero_copy_only=False)
+        parts.append(flat.reshape(-1, db.dim))
+    return np.vstack(parts).astype(np.float32) if parts else np.empty((0, db.dim), np.float32)
+
+
+def scratch_table(vectors: np.ndarray, path: str):
+    ids = pa.array(np.arange(len(vectors)))
+    flat = pa.array(np.ascontiguousarray(vectors).reshape(-1))
+    data = pa.table({"row": ids, "vector": pa.FixedSizeListArray.from_arrays(flat, vectors.shape[1])})
+    return lancedb.connect(path).create_table("bench", data, mode="overwrite")
+
+
+def run_queries(table, vectors, query_rows, truth, k, nprobes=None, refine=None) -> dict:
+    recalls, latencies = [], []
+    for qi, expected in zip(query_rows, truth):
+        t0 = time.perf_counter()
+        query = table.search(vectors[qi]).metric(METRIC).select(["row"]).limit(k + 1)
+        if nprobes:
+            query = query.nprobes(nprobes)
+        if refine:
+            query = query.refine_factor(refine)
+        found = [r for r in query.to_arrow().column("row").to_pylist() if r != qi][:k]
+        latencies.append((time.perf_counter() - t0) * 1000)
+        recalls.append(len(expected & set(found)) / len(expected))
+    return {
+        "recall": round(float(np.mean(recalls)), 4),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--index-types", nargs="+", default=["IVF_PQ", "IVF_HNSW_SQ"])
+    parser.add_argument("--nprobes", type=int, nargs="+", default=[5, 10, 20, 50])
+    parser.add_argument("--refine", type=int, nargs="+", default=[0, 5, 10])
+    parser.add_argument("--synthetic", type=int, default=0, help="use N random unit vectors instead of the table")
+    parser.add_argument("--dim", type=int, default=384, help="dimension of --synthetic vectors")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    vectors = load_vectors(args.synthetic, args.dim, args.seed)
+    if len(vectors) <= args.k:
+        sys.exit(f"Need more than {args.k} vectors, found {len(vectors)}")
+
+    rng = np.random.default_rng(args.seed)
+    query_rows = rng.choice(len(vectors), size=min(args.queries, len(vectors)), replace=False)
+    truth = []
+    for qi in query_rows:
+        scores = vectors @ vectors[qi]
+        scores[qi] = -np.inf
+        truth.append(set(np.argsort(-scores)[:args.k].tolist()))
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        table = scratch_table(vectors, tmp)
+        results.append({"index": "flat", "nprobes": None, "refine_factor": None,
+                        **run_queries(table, vectors, query_rows, truth, args.k)})
+
+        for index_type in args.index_types:
+            params = index_params(index_type, len(vectors), vectors.shape[1])
+            t0 = time.perf_counter()
+            table.create_index(metric=METRIC, vector_column_name="vector", index_type=index_type,
+                               replace=True, **params)
+            print(f"{index_type} {params}: built in {time.perf_counter() - t0:.1f}s")
+            for nprobes in args.nprobes:
+                for refine in args.refine:
+                    results.append({"index": index_type, "nprobes": nprobes, "refine_factor": refine,
+                                    **run_queries(table, vectors, query_rows, truth, args.k, nprobes, refine)})
+
+    print(f"{len(vectors)} vectors x {vectors.shape[1]} dims, recall@{args.k} over {len(query_rows)} queries")
+    print(f"{'index':<14}{'nprobes':>8}{'refine':>8}{'recall':>9}{'p50 ms':>9}{'p95 ms':>9}")
+    for r in results:
+        print(f"{r['index']:<14}{str(r['nprobes'] or '-'):>8}{str(r['refine_factor'] if r['refine_factor'] is not None else '-'):>8}"
+              f"{r['recall']:>9}{r['p50_ms']:>9}{r['p95_ms']:>9}")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Benchmark ASR backends: real-time factor (RTF) and word error rate (WER).
+
+Fixture layout: a directory of audio files, each with a sibling reference
+transcript of the same stem (e.g. ``talk.wav`` + ``talk.txt``).
+
+Usage (from the Backend directory):
+    python benchmarks/bench_asr.py fixtures/asr --backends whisper faster_whisper
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ingestion import AUDIO_EXTENSIONS  # noqa: E402
+from ingestion.audio import ASR_BACKENDS, get_asr_backend  # noqa: E402
+
+
+def _normalize_words(text: str) -> list[str]:
+    text = re.sub(r"[^\w\s']", " ", text.lower())
+    return text.split()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level Levenshtein distance divided by reference length."""
+    ref = _normalize_words(reference)
+    hyp = _normalize_words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    prev = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, start=1):
+        curr = [i] + [0] * len(hyp)
+        for j, h in enumerate(hyp, start=1):
+            curr[j] = min(
+                prev[j] + 1,          # deletion
+                curr[j - 1] + 1,      # insertion
+                prev[j - 1] + (r != h),  # substitution
+            )
+        prev = curr
+    return prev[-1] / len(ref)
+
+
+def audio_duration(path: Path) -> float:
+    """Audio duration in seconds via ffprobe."""
+    out = subprocess.run(
+        [
+            "ffprobe", "-v", "error",
+            "-show_entries", "format=duration",
+            "-of", "default=noprint_wrappers=1:nokey=1",
+            str(path),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(out.stdout.strip())
+
+
+def load_fixtures(fixture_dir: Path) -> list[tuple[Path, str]]:
+    fixtures = []
+    for audio in sorted(fixture_dir.iterdir()):
+        if audio.suffix.lower() not in AUDIO_EXTENSIONS:
+            continue
+        ref = audio.with_suffix(".txt")
+        if not ref.exists():
+            print(f"skipping {audio.name}: no reference transcript", file=sys.stderr)
+            continue
+        fixtures.append((audio, ref.read_text(encoding="utf-8")))
+    return fixtures
+
+
+def bench_backend(name: str, fixtures: list[tuple[Path, str]]) -> dict:
+    backend = get_asr_backend(name)
+
+    t0 = time.perf_counter()
+    backend.load()
+    load_sec = time.perf_counter() - t0
+
+    total_audio = 0.0
+    total_elapsed = 0.0
+    weighted_errors = 0.0
+    total_words = 0
+    per_file = []
+
+    for audio, reference in fixtures:
+        duration = audio_duration(audio)
+        t0 = time.perf_counter()
+        segments = backend.transcribe(audio)
+        elapsed = time.perf_counter() - t0
+
+        hypothesis = " ".join(s["text"] for s in segments)
+        wer = word_error_rate(reference, hypothesis)
+        n_words = len(_normalize_words(reference))
+
+        total_audio += duration
+        total_elapsed += elapsed
+        weighted_errors += wer * n_words
+        total_words += n_words
+        per_file.append({
+            "file": audio.name,
+            "duration_sec": round(duration, 2),
+            "rtf": round(elapsed / duration, 4) if duration else None,
+            "wer": round(wer, 4),
+        })
+
+    return {
+        "backend": name,
+        "model": backend.model_version,
+        "decode_options": backend.decode_options,
+        "load_sec": round(load_sec, 2),
+        "rtf": round(total_elapsed / total_audio, 4) if total_audio else None,
+        "wer": round(weighted_errors / total_words, 4) if total_words else None,
+        "files": per_file,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("fixture_dir", type=Path)
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        default=list(ASR_BACKENDS),
+        choices=list(ASR_BACKENDS),
+    )
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixture_dir)
+    if not fixtures:
+        sys.exit(f"No audio fixtures with reference transcripts in {args.fixture_dir}")
+
+    results = [bench_backend(name, fixtures) for name in args.backends]
+
+    print(f"{'backend':<16}{'RTF':>10}{'WER':>10}{'load (s)':>10}")
+    for r in results:
+        print(f"{r['backend']:<16}{r['rtf']:>10}{r['wer']:>10}{r['load_sec']:>10}")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
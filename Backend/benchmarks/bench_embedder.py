@@ -0,0 +1,111 @@
+"""Benchmark text embedding backends: throughput, query latency and agreement with torch.
+
+The corpus is a text file with one passage per line (e.g. chunk texts
+exported from the evidence table). Each backend reports:
+
+- load (s):    model load time (includes the ONNX export on first run)
+- texts/s:     batch throughput over the whole corpus (ingestion path)
+- p50/p95 ms:  single-text latency (query path)
+- min cosine:  worst row-wise cosine vs the torch backend, checked against
+               the backend's documented tolerance
+
+Usage (from the Backend directory):
+    python benchmarks/bench_embedder.py corpus.txt --backends torch onnx onnx-fp32
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from embedder import (  # noqa: E402
+    OnnxTextBackend,
+    TorchTextBackend,
+    cosine_agreement,
+)
+
+BACKENDS = {
+    "torch": lambda threads: TorchTextBackend(),
+    "onnx": lambda threads: OnnxTextBackend(quantize=True, threads=threads),
+    "onnx-fp32": lambda threads: OnnxTextBackend(quantize=False, threads=threads),
+}
+
+
+def bench_backend(name: str, texts: list[str], queries: int, threads: int, reference=None) -> tuple[dict, object]:
+    backend = BACKENDS[name](threads)
+
+    t0 = time.perf_counter()
+    backend.load()
+    load_sec = time.perf_counter() - t0
+
+    backend.encode(texts[:8])  # warm-up
+
+    t0 = time.perf_counter()
+    vectors = backend.encode(texts)
+    batch_sec = time.perf_counter() - t0
+
+    latencies = []
+    for text in texts[:queries]:
+        t0 = time.perf_counter()
+        backend.encode([text])
+        latencies.append((time.perf_counter() - t0) * 1000)
+    latencies.sort()
+
+    result = {
+        "backend": name,
+        "model": backend.model_version,
+        "load_sec": round(load_sec, 2),
+        "texts_per_sec": round(len(texts) / batch_sec, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 2),
+    }
+    if reference is not None:
+        cosine = cosine_agreement(reference, vectors)
+        tolerance = getattr(backend, "tolerance", 1.0)
+        result["min_cosine"] = round(cosine, 5)
+        result["tolerance"] = tolerance
+        result["within_tolerance"] = cosine >= tolerance
+    return result, vectors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("corpus", type=Path, help="text file, one passage per line")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument("--queries", type=int, default=200, help="texts timed one by one")
+    parser.add_argument("--threads", type=int, default=0, help="ONNX intra-op threads (0 = default)")
+    args = parser.parse_args()
+
+    texts = [line.strip() for line in args.corpus.read_text(encoding="utf-8").splitlines() if line.strip()]
+    if not texts:
+        sys.exit(f"No passages in {args.corpus}")
+
+    # torch is the reference for the cosine check, so it always runs first
+    names = ["torch"] + [n for n in args.backends if n != "torch"]
+    results = []
+    reference = None
+    for name in names:
+        result, vectors = bench_backend(name, texts, args.queries, args.threads, reference)
+        if name == "torch":
+            reference = vectors
+            if "torch" not in args.backends:
+                continue
+        results.append(result)
+
+    print(f"{'backend':<12}{'texts/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'min cos':>10}{'load (s)':>10}")
+    for r in results:
+        print(
+            f"{r['backend']:<12}{r['texts_per_sec']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}"
+            f"{r.get('min_cosine', 1.0):>10}{r['load_sec']:>10}"
+        )
+    print(json.dumps(results, indent=2))
+
+    if not all(r.get("within_tolerance", True) for r in results):
+        sys.exit("Some backends exceed their cosine tolerance")
+
+
+if __name__ == "__main__":
+    main()
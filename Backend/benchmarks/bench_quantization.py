@@ -0,0 +1,98 @@
+"""Benchmark quantized first-pass search: recall@k vs exact search, memory and latency.
+
+Uses the vectors of the evidence table. `--queries` stored rows serve as
+queries (each excluded from its own results). For every mode and rescore
+factor, the quantized candidates are rescored with the float32 vectors
+exactly as LanceDBClient does. The result is compared with exact
+brute-force top-k.
+
+Usage (from the Backend directory):
+    python benchmarks/bench_quantization.py --k 10 --factors 1 2 4 8
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from db import get_db  # noqa: E402
+from quantization import QUANT_BINARY, QUANT_INT8, approximate_scores, quantize  # noqa: E402
+
+
+def load_vectors() -> np.ndarray:
+    db = get_db()
+    parts = []
+    for batch in db.scan(columns=["text_embedding"]):
+        flat = batch.column(0).flatten().to_numpy(zero_copy_only=False)
+        parts.append(flat.reshape(-1, db.dim))
+    return np.vstack(parts).astype(np.float32) if parts else np.empty((0, db.dim), np.float32)
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    k = min(k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def bench_mode(mode: str, vectors: np.ndarray, query_rows: np.ndarray, k: int, factors: list[int]) -> list[dict]:
+    codes = quantize(vectors, mode)
+    results = []
+    for factor in factors:
+        recalls, latencies = [], []
+        for qi in query_rows:
+            query = vectors[qi]
+
+            exact = vectors @ query
+            exact[qi] = -np.inf
+            truth = set(top_k(exact, k).tolist())
+
+            t0 = time.perf_counter()
+            approx = approximate_scores(codes, query, mode)
+            approx[qi] = -np.inf
+            candidates = top_k(approx, k * factor)
+            rescored = candidates[top_k(vectors[candidates] @ query, k)]
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+            recalls.append(len(truth & set(rescored.tolist())) / len(truth))
+        results.append({
+            "mode": mode,
+            "rescore_factor": factor,
+            f"recall@{k}": round(float(np.mean(recalls)), 4),
+            "mean_ms": round(float(np.mean(latencies)), 2),
+            "bytes_per_row": codes.shape[1],
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--factors", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    vectors = load_vectors()
+    if len(vectors) <= args.k:
+        sys.exit(f"Need more than {args.k} rows in the evidence table, found {len(vectors)}")
+
+    rng = np.random.default_rng(args.seed)
+    query_rows = rng.choice(len(vectors), size=min(args.queries, len(vectors)), replace=False)
+
+    print(f"{len(vectors)} rows, float32 vectors: {vectors.shape[1] * 4} bytes/row")
+    results = []
+    for mode in (QUANT_INT8, QUANT_BINARY):
+        results += bench_mode(mode, vectors, query_rows, args.k, args.factors)
+
+    print(f"{'mode':<8}{'factor':>8}{'recall':>10}{'ms':>10}{'B/row':>8}")
+    for r in results:
+        print(f"{r['mode']:<8}{r['rescore_factor']:>8}{r[f'recall@{args.k}']:>10}{r['mean_ms']:>10}{r['bytes_per_row']:>8}")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
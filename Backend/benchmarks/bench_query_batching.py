@@ -0,0 +1,97 @@
+"""Benchmark query embedding under concurrency: per-request encode vs the micro-batcher.
+
+Fires `--concurrency` simultaneous query embeddings, `--rounds` times, in
+two modes:
+
+- direct:  every request runs embed_text() on its own in a worker thread
+           (what /query did before micro-batching)
+- batched: requests go through QueryEmbeddingBatcher
+
+and reports p50/p95/p99 request latency and process CPU time per query.
+
+Usage (from the Backend directory):
+    python benchmarks/bench_query_batching.py queries.txt --concurrency 50
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from embedder import QueryEmbeddingBatcher, get_embedder  # noqa: E402
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    return sorted_values[int(q * (len(sorted_values) - 1))]
+
+
+async def _timed(coro) -> float:
+    t0 = time.perf_counter()
+    await coro
+    return (time.perf_counter() - t0) * 1000
+
+
+async def run_mode(mode: str, queries: list[str], concurrency: int, rounds: int, wait_ms: float) -> dict:
+    embedder = get_embedder()
+    batcher = QueryEmbeddingBatcher(embedder, max_batch=concurrency, max_wait_ms=wait_ms)
+
+    def request(text: str):
+        if mode == "batched":
+            return batcher.embed(text)
+        return asyncio.to_thread(embedder.embed_text, text)
+
+    latencies = []
+    cpu0 = time.process_time()
+    wall0 = time.perf_counter()
+    for r in range(rounds):
+        texts = [queries[(r * concurrency + i) % len(queries)] for i in range(concurrency)]
+        latencies += await asyncio.gather(*(_timed(request(t)) for t in texts))
+    wall = time.perf_counter() - wall0
+    cpu = time.process_time() - cpu0
+
+    latencies.sort()
+    n = len(latencies)
+    return {
+        "mode": mode,
+        "queries": n,
+        "p50_ms": round(_percentile(latencies, 0.50), 2),
+        "p95_ms": round(_percentile(latencies, 0.95), 2),
+        "p99_ms": round(_percentile(latencies, 0.99), 2),
+        "cpu_ms_per_query": round(cpu * 1000 / n, 2),
+        "queries_per_sec": round(n / wall, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("queries", type=Path, help="text file, one query per line")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--wait-ms", type=float, default=5.0, help="batcher max wait")
+    args = parser.parse_args()
+
+    queries = [q.strip() for q in args.queries.read_text(encoding="utf-8").splitlines() if q.strip()]
+    if not queries:
+        sys.exit(f"No queries in {args.queries}")
+
+    get_embedder().embed_text(queries[0])  # load the model outside the timings
+
+    results = [
+        asyncio.run(run_mode(mode, queries, args.concurrency, args.rounds, args.wait_ms))
+        for mode in ("direct", "batched")
+    ]
+
+    print(f"{'mode':<10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'CPU ms/q':>10}{'q/s':>10}")
+    for r in results:
+        print(
+            f"{r['mode']:<10}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}"
+            f"{r['cpu_ms_per_query']:>10}{r['queries_per_sec']:>10}"
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
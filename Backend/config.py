@@ -26,23 +26,95 @@ PRIMARY_MODEL = os.getenv("PRIMARY_MODEL", "anthropic/claude-3.5-sonnet")
 FAST_MODEL = os.getenv("FAST_MODEL", "openai/gpt-4o-mini")
 LLM_MODELS = [PRIMARY_MODEL, FAST_MODEL, "google/gemini-flash-1.5"]
 
-# Video limits
+# Video budgets (soft: larger/longer videos are processed fully, in windows)
 MAX_VIDEO_SIZE_MB = int(os.getenv("MAX_VIDEO_SIZE_MB", 100))
 MAX_VIDEO_DURATION_SEC = int(os.getenv("MAX_VIDEO_DURATION_SEC", 600))
-VIDEO_FRAME_RATE = 0.5  # 1 frame per 2 seconds
-MAX_KEYFRAMES = 30
+VIDEO_HARD_MAX_SIZE_MB = int(os.getenv("VIDEO_HARD_MAX_SIZE_MB", 0))  # 0 = no hard limit
+VIDEO_HARD_MAX_DURATION_SEC = int(os.getenv("VIDEO_HARD_MAX_DURATION_SEC", 0))  # 0 = no hard limit
+MAX_KEYFRAMES = int(os.getenv("MAX_KEYFRAMES", 30))  # keyframe budget per MAX_VIDEO_DURATION_SEC of video
+VIDEO_SCENE_SAMPLE_FPS = float(os.getenv("VIDEO_SCENE_SAMPLE_FPS", 2.0))  # frames/s analysed for scene changes
+VIDEO_SCENE_THRESHOLD = float(os.getenv("VIDEO_SCENE_THRESHOLD", 0.3))  # histogram distance that starts a scene
+VIDEO_SCENE_ANALYSIS_WIDTH = 160  # px, downscaled copy used for scene analysis
+VIDEO_DECODE_QUEUE_SIZE = 8  # decoded frames buffered between decoder thread and consumer
+VIDEO_FRAME_AUDIO_CONTEXT_SEC = 30.0  # max transcript attached to one keyframe
 VIDEO_MAX_WIDTH = 1280
+VIDEO_INDEX_BATCH_FRAMES = int(os.getenv("VIDEO_INDEX_BATCH_FRAMES", 5))  # frames per progressive batch
+
+# Keyframe images: WebP thumbnails on disk, full frames rendered on demand into an LRU cache
+FRAME_THUMB_WIDTH = int(os.getenv("FRAME_THUMB_WIDTH", 320))
+FRAME_THUMB_QUALITY = int(os.getenv("FRAME_THUMB_QUALITY", 70))
+FRAME_FULL_QUALITY = 90  # JPEG quality of rendered full frames
+FRAME_CACHE_DIR = Path(os.getenv("FRAME_CACHE_DIR", "./cache/frames"))
+FRAME_CACHE_MAX_MB = int(os.getenv("FRAME_CACHE_MAX_MB", 200))
+
+# Long audio/video ingestion: fixed-size windows with a checkpoint after each
+INGEST_WINDOW_SEC = float(os.getenv("INGEST_WINDOW_SEC", 300))
+INGEST_CHECKPOINT_DIR = Path(os.getenv("INGEST_CHECKPOINT_DIR", "./cache/checkpoints"))
+INGEST_AUTO_RESUME = os.getenv("INGEST_AUTO_RESUME", "1") == "1"  # resume interrupted jobs on startup
+INTERVAL_INDEX_DIR = Path(os.getenv("INTERVAL_INDEX_DIR", "./cache/intervals"))  # per-source time interval indexes
 
 VIDEO_OCR_LANGS = os.getenv("VIDEO_OCR_LANGS", "en").split(",")
 VIDEO_OCR_USE_GPU = os.getenv("VIDEO_OCR_USE_GPU", "0") == "1"
 VIDEO_OCR_MIN_CONFIDENCE = float(os.getenv("VIDEO_OCR_MIN_CONFIDENCE", "0.5"))
 
+# Speech recognition (ASR)
+ASR_BACKEND = os.getenv("ASR_BACKEND", "whisper")  # whisper | faster_whisper
+ASR_COMPUTE_TYPE = os.getenv("ASR_COMPUTE_TYPE", "int8")  # faster_whisper only
+ASR_CPU_THREADS = int(os.getenv("ASR_CPU_THREADS", 0))  # 0 = runtime default
+ASR_BEAM_SIZE = int(os.getenv("ASR_BEAM_SIZE", 5))  # faster_whisper only
+ASR_CHUNK_SEC = float(os.getenv("ASR_CHUNK_SEC", 600))  # long audio is decoded/transcribed in chunks
+
+# Transcript cache (raw ASR segments keyed by audio content + model + decode options)
+TRANSCRIPT_CACHE_ENABLED = os.getenv("TRANSCRIPT_CACHE_ENABLED", "1") == "1"
+TRANSCRIPT_CACHE_DIR = Path(os.getenv("TRANSCRIPT_CACHE_DIR", "./cache/transcripts"))
+
 # Embedding models
-TEXT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
-TEXT_EMBEDDING_DIM = 384
+# Text model for new installs and the default target of an embedding migration;
+# the model actually serving queries is recorded in the LanceDB directory (embedding_state.py)
+TEXT_EMBEDDING_MODEL = os.getenv("TEXT_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+TEXT_EMBEDDING_DIM = int(os.getenv("TEXT_EMBEDDING_DIM", 384))  # fallback; a fresh install probes the model
+LEGACY_TEXT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"  # model of rows written before versioning
+EMBED_MIGRATION_BATCH_SIZE = int(os.getenv("EMBED_MIGRATION_BATCH_SIZE", 1024))  # rows per re-embed batch
 IMAGE_EMBEDDING_MODEL = "openai/clip-vit-base-patch32"
 IMAGE_EMBEDDING_DIM = 512
 
+# Text embedding backend: torch (sentence-transformers) | onnx (onnxruntime, optional int8)
+TEXT_EMBEDDING_BACKEND = os.getenv("TEXT_EMBEDDING_BACKEND", "torch")
+EMBED_ONNX_QUANTIZE = os.getenv("EMBED_ONNX_QUANTIZE", "1") == "1"  # dynamic int8 weights
+EMBED_ONNX_THREADS = int(os.getenv("EMBED_ONNX_THREADS", 0))  # intra-op threads, 0 = runtime default
+EMBED_ONNX_DIR = Path(os.getenv("EMBED_ONNX_DIR", "./cache/onnx"))  # exported models
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", 32))
+EMBED_POOL_WORKERS = int(os.getenv("EMBED_POOL_WORKERS", 0))  # embedding processes for bulk work, < 2 = off
+EMBED_POOL_THREADS = int(os.getenv("EMBED_POOL_THREADS", 1))  # torch threads per pool worker
+EMBED_POOL_SHARD_SIZE = int(os.getenv("EMBED_POOL_SHARD_SIZE", 128))  # texts per worker task
+EMBED_POOL_MIN_BATCH = int(os.getenv("EMBED_POOL_MIN_BATCH", 64))  # smaller batches stay in-process
+QUERY_BATCH_MAX_SIZE = int(os.getenv("QUERY_BATCH_MAX_SIZE", 32))  # queries per micro-batch
+QUERY_BATCH_MAX_WAIT_MS = float(os.getenv("QUERY_BATCH_MAX_WAIT_MS", 5))  # max wait to fill a micro-batch
+
+# Vector search: quantized first pass (none | int8 | binary) rescored with float32 vectors
+VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "none")
+VECTOR_RESCORE_FACTOR = int(os.getenv("VECTOR_RESCORE_FACTOR", 4))  # candidates rescored = limit * factor
+
+# ANN index on text_embedding (IVF_PQ | IVF_HNSW_SQ | none), built once the table is big enough
+ANN_INDEX_TYPE = os.getenv("ANN_INDEX_TYPE", "IVF_PQ")
+ANN_INDEX_MIN_ROWS = int(os.getenv("ANN_INDEX_MIN_ROWS", 50000))  # below this, brute force is fast enough
+ANN_REBUILD_FRACTION = float(os.getenv("ANN_REBUILD_FRACTION", 0.2))  # rebuild when unindexed > fraction of indexed
+ANN_NPROBES = int(os.getenv("ANN_NPROBES", 20))  # IVF partitions searched per query
+ANN_REFINE_FACTOR = int(os.getenv("ANN_REFINE_FACTOR", 5))  # re-rank limit * factor candidates exactly (0 = off)
+
+# Table maintenance: compaction, old-version cleanup and index updates
+MAINTENANCE_CHECK_SEC = int(os.getenv("MAINTENANCE_CHECK_SEC", 60))  # how often to check; 0 disables the scheduler
+MAINTENANCE_IDLE_SEC = int(os.getenv("MAINTENANCE_IDLE_SEC", 120))  # no reads/writes for this long = idle
+MAINTENANCE_MAX_FRAGMENTS = int(os.getenv("MAINTENANCE_MAX_FRAGMENTS", 64))  # compact even when busy past this
+MAINTENANCE_SMALL_FRAGMENT_ROWS = int(os.getenv("MAINTENANCE_SMALL_FRAGMENT_ROWS", 8192))
+MAINTENANCE_RETAIN_VERSIONS_HOURS = float(os.getenv("MAINTENANCE_RETAIN_VERSIONS_HOURS", 24))  # older versions are removed
+
+# LanceDB access from request handlers (async_db)
+DB_READ_CONCURRENCY = int(os.getenv("DB_READ_CONCURRENCY", 8))  # searches/lookups running at once; writes use one thread
+
+# Models loaded and exercised at startup (embedder, asr, ocr, clip); empty = lazy loading only
+WARMUP_MODELS = [m.strip() for m in os.getenv("WARMUP_MODELS", "embedder,asr,ocr").split(",") if m.strip()]
+
 # Uncertainty thresholds
 REFUSAL_THRESHOLD = 0.4
 WARNING_THRESHOLD = 0.6
@@ -0,0 +1,157 @@
+"""Exact corpus statistics, maintained incrementally.
+
+Counts rows and text bytes (UTF-8 of text_content) per source, with each
+source's modality breakdown and source type. Totals by modality and
+source type are derived from these and kept in step:
+
+- build(): one scan of the active table projected to four columns and
+  aggregated with Arrow group_by. Runs once at startup, in the
+  background. An embedding model cutover keeps the same rows, so the
+  counts carry over.
+- add(): aggregates the batch LanceDBClient just inserted
+- remove_source() / remove(): subtract a deleted source, or the rows a
+  partial delete removed
+
+Reads are O(1) in the table size, so /health and /stats never scan.
+LanceDBClient applies every update under its write lock, so a build
+never races an insert.
+"""
+from collections import Counter
+from typing import Optional
+from loguru import logger
+import threading
+import time
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+STATS_COLUMNS = ["source_id", "modality", "source_type", "text_content"]
+
+
+def _aggregate(rows: pa.Table) -> list[dict]:
+    """[{source_id, modality, source_type, rows, text_bytes}] of a batch."""
+    if rows.num_rows == 0:
+        return []
+    text_bytes = pc.fill_null(pc.binary_length(rows.column("text_content")), 0)
+    keys = ["source_id", "modality", "source_type"]
+    grouped = (
+        pa.table({**{k: rows.column(k) for k in keys}, "text_bytes": text_bytes})
+        .group_by(keys)
+        .aggregate([("text_bytes", "sum"), ("text_bytes", "count")])
+    )
+    return [
+        {
+            "source_id": g["source_id"],
+            "modality": g["modality"],
+            "source_type": g["source_type"],
+            "rows": g["text_bytes_count"],
+            "text_bytes": g["text_bytes_sum"] or 0,
+        }
+        for g in grouped.to_pylist()
+    ]
+
+
+class CorpusStats:
+    """Row and byte counts per source, modality and source type."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ready = False
+        self.built_at: Optional[float] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self.total_rows = 0
+        self.text_bytes = 0
+        self.by_modality: Counter = Counter()
+        self.by_source_type: Counter = Counter()
+        # source_id -> {"rows", "text_bytes", "source_type", "modalities": Counter}
+        self.sources: dict[str, dict] = {}
+
+    def build(self, table) -> None:
+        """Recount from the table (projected scan); reads see the old counts until it is done."""
+        t0 = time.perf_counter()
+        fresh = CorpusStats()
+        if table is not None:
+            columns = [c for c in STATS_COLUMNS if c in table.schema.names]
+            for batch in table.to_lance().to_batches(columns=columns):
+                fresh._apply(_aggregate(_with_defaults(pa.Table.from_batches([batch]))), 1)
+        with self._lock:
+            self.total_rows = fresh.total_rows
+            self.text_bytes = fresh.text_bytes
+            self.by_modality = fresh.by_modality
+            self.by_source_type = fresh.by_source_type
+            self.sources = fresh.sources
+            self.ready = True
+            self.built_at = time.time()
+        logger.info(f"Corpus stats: {self.total_rows} rows, {len(self.sources)} sources in {time.perf_counter() - t0:.2f}s")
+
+    def add(self, rows: pa.Table) -> None:
+        with self._lock:
+            self._apply(_aggregate(rows.select(STATS_COLUMNS)), 1)
+
+    def remove(self, rows: pa.Table) -> None:
+        with self._lock:
+            self._apply(_aggregate(rows.select(STATS_COLUMNS)), -1)
+
+    def remove_source(self, source_id: str) -> None:
+        with self._lock:
+            source = self.sources.pop(source_id, None)
+            if source is None:
+                return
+            self.total_rows -= source["rows"]
+            self.text_bytes -= source["text_bytes"]
+            self.by_modality.subtract(source["modalities"])
+            self.by_source_type[source["source_type"]] -= source["rows"]
+            self._prune()
+
+    def _apply(self, groups: list[dict], sign: int) -> None:
+        for g in groups:
+            rows, text_bytes = sign * g["rows"], sign * g["text_bytes"]
+            source = self.sources.setdefault(
+                g["source_id"],
+                {"rows": 0, "text_bytes": 0, "source_type": g["source_type"], "modalities": Counter()},
+            )
+            source["rows"] += rows
+            source["text_bytes"] += text_bytes
+            source["modalities"][g["modality"]] += rows
+            self.total_rows += rows
+            self.text_bytes += text_bytes
+            self.by_modality[g["modality"]] += rows
+            self.by_source_type[g["source_type"]] += rows
+        if sign < 0:
+            self._prune()
+
+    def _prune(self) -> None:
+        self.sources = {sid: s for sid, s in self.sources.items() if s["rows"] > 0}
+        for source in self.sources.values():
+            source["modalities"] = +source["modalities"]
+        self.by_modality = +self.by_modality
+        self.by_source_type = +self.by_source_type
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "total_rows": self.total_rows,
+                "text_bytes": self.text_bytes,
+                "sources": len(self.sources),
+                "by_modality": dict(self.by_modality),
+                "by_source_type": dict(self.by_source_type),
+                "built_at": self.built_at,
+            }
+
+    def source(self, source_id: str) -> Optional[dict]:
+        with self._lock:
+            source = self.sources.get(source_id)
+            if source is None:
+                return None
+            return {**source, "modalities": dict(source["modalities"])}
+
+
+def _with_defaults(rows: pa.Table) -> pa.Table:
+    """Fill columns a pre-migration table lacks, so every row lands in a group."""
+    for name in STATS_COLUMNS:
+        if name not in rows.column_names:
+            rows = rows.append_column(name, pa.nulls(rows.num_rows, type=pa.string()))
+    return rows.select(STATS_COLUMNS)
@@ -8,10 +8,37 @@ import lancedb
 import pyarrow as pa
 import numpy as np
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 from loguru import logger
+import functools
+import threading
+import time
 
-from config import LANCEDB_PATH, TEXT_EMBEDDING_DIM
+from config import (
+    LANCEDB_PATH,
+    TEXT_EMBEDDING_MODEL,
+    TEXT_EMBEDDING_DIM,
+    VECTOR_QUANTIZATION,
+    VECTOR_RESCORE_FACTOR,
+    ANN_NPROBES,
+    ANN_REFINE_FACTOR,
+)
+from quantization import QUANT_NONE, QuantizedIndex, quantize, code_size
+from embedding_state import DEFAULT_TABLE, get_active, set_active, has_state
+import indexes
+from corpus_stats import CorpusStats, STATS_COLUMNS
+from filters import and_, eq, ge, in_, is_null, is_not_null, or_
+from schema import (
+    STATUS_PARTIAL,
+    STATUS_COMPLETE,
+    METADATA_FIELDS,
+    METADATA_DEFAULTS,
+    VECTOR_COLUMNS,
+    SchemaError,
+    coerce,
+    evidence_schema,
+    migrate,
+)
 
 _mongo_client = None
 _db = None
@@ -29,6 +56,98 @@ def get_db():
     return _db
 
 
+def _record_batch(chunks: list[dict], embeddings: np.ndarray, model: str) -> pa.Table:
+    """
+    Build one RecordBatch from chunk metadata and an embedding matrix,
+    wrapped as a single-batch Table (what LanceDB's create_table/add take).
+
+    Metadata columns are built column-wise with the types of the evidence
+    schema. The vector column wraps the matrix's float32 buffer as a
+    FixedSizeList without copying.
+    """
+    columns = []
+    for name, type_, _ in METADATA_FIELDS:
+        default = METADATA_DEFAULTS.get(name)
+        values = [c.get(name) for c in chunks]
+        columns.append(pa.array([default if v is None else v for v in values], type=type_))
+    
+    batch = pa.RecordBatch.from_arrays(columns, names=[name for name, _, _ in METADATA_FIELDS])
+    return with_embeddings(pa.Table.from_batches([batch]), embeddings, model)
+
+
+# Columns returned by searches and lookups unless the caller asks for others:
+# all metadata, no vectors
+RESULT_COLUMNS = [name for name, _, _ in METADATA_FIELDS]
+
+# Under an ANN index a postfiltered search fetches at least this many times `limit`
+_POSTFILTER_OVERFETCH = 4
+
+
+def vector_matrix(column, dim: int) -> np.ndarray:
+    """(n, dim) float32 view of a FixedSizeList vector column (no per-row lists)."""
+    if isinstance(column, pa.ChunkedArray):
+        column = column.combine_chunks()
+    return column.flatten().to_numpy(zero_copy_only=False).reshape(-1, dim)
+
+
+def _with_similarity(rows: pa.Table) -> pa.Table:
+    """Append similarity = 1 - distance / 2 (cosine for normalized vectors, L2 distance in [0, 4])."""
+    distance = rows.column("_distance").to_numpy(zero_copy_only=False)
+    return rows.append_column("similarity", pa.array(np.maximum(0.0, 1.0 - distance / 2.0), type=pa.float64()))
+
+
+def _writer(method):
+    """Run a LanceDBClient method under its write lock (see cutover)."""
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.write_lock:
+            self.last_activity = time.monotonic()
+            return method(self, *args, **kwargs)
+    return locked
+
+
+def with_embeddings(rows: pa.Table, embeddings: np.ndarray, model: str) -> pa.Table:
+    """
+    Replace (or add) the vector columns of `rows`: text_embedding from the
+    (n, dim) matrix without copying, its quantized code, and the model name.
+    """
+    rows = rows.drop([c for c in VECTOR_COLUMNS if c in rows.column_names])
+    dim = embeddings.shape[1]
+    flat = np.ascontiguousarray(embeddings, dtype=np.float32).reshape(-1)
+    rows = rows.append_column("text_embedding", pa.FixedSizeListArray.from_arrays(pa.array(flat), dim))
+    rows = rows.append_column("text_embedding_q", _quantized_column(embeddings))
+    return rows.append_column("embedding_model", pa.array([model] * rows.num_rows, type=pa.string()))
+
+
+def _quantized_column(embeddings: np.ndarray) -> pa.Array:
+    """text_embedding_q column: one code per row over a single buffer, or nulls if disabled."""
+    n = len(embeddings)
+    if VECTOR_QUANTIZATION == QUANT_NONE:
+        return pa.nulls(n, type=pa.binary())
+    
+    codes = np.ascontiguousarray(quantize(embeddings, VECTOR_QUANTIZATION))
+    offsets = np.arange(n + 1, dtype=np.int32) * codes.shape[1]
+    return pa.Array.from_buffers(
+        pa.binary(), n, [None, pa.py_buffer(offsets), pa.py_buffer(codes)]
+    )
+
+
+def _probe_dim(model: str) -> int:
+    """Output dimension of `model`, by embedding a probe text (TEXT_EMBEDDING_DIM if it cannot load)."""
+    from embedder import Embedder, set_embedder
+    
+    embedder = Embedder(model_name=model)
+    try:
+        dim = int(embedder.encode_texts(["probe"]).shape[1])
+    except Exception as e:
+        logger.error(f"Cannot load {model} to probe its dimension, using TEXT_EMBEDDING_DIM={TEXT_EMBEDDING_DIM}: {e}")
+        return TEXT_EMBEDDING_DIM
+    if dim != TEXT_EMBEDDING_DIM:
+        logger.warning(f"{model} embeds to {dim}-d, not TEXT_EMBEDDING_DIM={TEXT_EMBEDDING_DIM}; using {dim}")
+    set_embedder(embedder)  # already loaded; reused for queries and ingests
+    return dim
+
+
 class LanceDBClient:
     """Client for LanceDB operations with unified cross-modal search."""
     
@@ -36,100 +155,175 @@ class LanceDBClient:
         self.db_path = db_path or LANCEDB_PATH
         self.db = None
         self.table = None
+        self._qindex: Optional[QuantizedIndex] = None  # loaded on first quantized search
+        # Guards _qindex swaps; the generation moves on every change a load in progress could miss
+        self._qindex_lock = threading.Lock()
+        self._qindex_generation = 0
+        self._qindex_load_lock = threading.Lock()  # one load at a time
+        # Serializes inserts with an embedding model cutover
+        self.write_lock = threading.RLock()
+        # Scalar and ANN index maintenance (see indexes)
+        self.ann_indexed = False
+        self._index_thread: Optional[threading.Thread] = None
+        self._index_pending = False
+        self._index_lock = threading.Lock()
+        # Held while indexes are updated or the table is compacted (see maintenance)
+        self.maintenance_lock = threading.Lock()
+        # Last search or write (monotonic clock), for idle-time maintenance
+        self.last_activity = time.monotonic()
+        # Exact counts, kept in step with inserts and deletes
+        self.stats = CorpusStats()
         self._init_db()
     
     def _init_db(self):
-        """Initialize database and table."""
+        """Initialize database and open the active table (see embedding_state)."""
         self.db_path.mkdir(parents=True, exist_ok=True)
         self.db = lancedb.connect(str(self.db_path))
         
+        active = get_active()
+        if not has_state() and active["table"] not in self.db.table_names():
+            # Fresh install: index with the configured model, at its actual dimension
+            set_active(DEFAULT_TABLE, TEXT_EMBEDDING_MODEL, _probe_dim(TEXT_EMBEDDING_MODEL))
+            active = get_active()
+        self.table_name = active["table"]
+        self.model = active["model"]
+        self.dim = active["dim"]
+        
         # Check if table exists
-        if "evidence" in self.db.table_names():
-            self.table = self.db.open_table("evidence")
-            logger.info(f"Opened existing table with {self.table.count_rows()} rows")
+        if self.table_name in self.db.table_names():
+            self.table = self.db.open_table(self.table_name)
+            self._ensure_columns()
+            logger.info(
+                f"Opened existing table '{self.table_name}' with {self.table.count_rows()} rows "
+                f"(model {self.model})"
+            )
+            self.schedule_index_update()
+            threading.Thread(target=self._build_stats, name="corpus-stats", daemon=True).start()
         else:
-            logger.info("Table 'evidence' does not exist yet, will create on first insert")
+            logger.info(f"Table '{self.table_name}' does not exist yet, will create on first insert")
+            self.stats.build(None)
+        
+        if TEXT_EMBEDDING_MODEL != self.model:
+            logger.warning(
+                f"TEXT_EMBEDDING_MODEL is {TEXT_EMBEDDING_MODEL} but the index uses {self.model}; "
+                f"queries keep using {self.model} until an embedding migration completes"
+            )
+    
+    def _ensure_columns(self):
+        """Migrate tables created by older releases to the current schema (see schema.migrate)."""
+        migrate(self.table, self.dim)
     
-    def insert(self, chunks: list[dict]) -> int:
-        """Insert evidence chunks into the database."""
+    def insert(self, chunks: list[dict], embeddings: Optional[np.ndarray] = None) -> int:
+        """
+        Insert evidence chunks into the database as one Arrow RecordBatch.
+        
+        `embeddings` is a (len(chunks), dim) float32 matrix whose row i
+        belongs to chunk i (see ingestion.build_chunks). Its buffer becomes
+        the FixedSizeList vector column without copying. Without it, each
+        chunk's own "text_embedding" is used.
+        
+        Chunks embedded with another model than the active one (a batch
+        that straddled an embedding model cutover) are re-embedded first.
+        """
         if not chunks:
             return 0
         
-        # Ensure all embeddings are numpy arrays of correct dimension
-        sanitized = []
-        for chunk in chunks:
-            embedding = chunk.get("text_embedding", [])
+        with self.write_lock:
+            models = {c.get("embedding_model") or self.model for c in chunks}
+            if models != {self.model}:
+                from embedder import get_embedder
+                logger.info(f"Re-embedding {len(chunks)} chunks from {models} with {self.model}")
+                embeddings = get_embedder().encode_texts([c.get("text_content") or " " for c in chunks])
             
-            # Skip chunks without valid embeddings
-            if not embedding or len(embedding) != TEXT_EMBEDDING_DIM:
-                logger.warning(f"Skipping chunk with invalid embedding length: {len(embedding) if embedding else 0}")
-                continue
+            if embeddings is None:
+                # Keep only chunks with an embedding of the right dimension
+                valid = []
+                for chunk in chunks:
+                    embedding = chunk.get("text_embedding")
+                    if embedding is None or len(embedding) != self.dim:
+                        logger.warning(f"Skipping chunk with invalid embedding length: {len(embedding) if embedding is not None else 0}")
+                        continue
+                    valid.append(chunk)
+                chunks = valid
+                if not chunks:
+                    logger.warning("No valid chunks to insert after filtering")
+                    return 0
+                embeddings = np.stack([np.asarray(c["text_embedding"], dtype=np.float32) for c in chunks])
             
-            # Convert to numpy array for proper FixedSizeList inference
-            embedding_array = np.array(embedding, dtype=np.float32)
+            if embeddings.shape != (len(chunks), self.dim):
+                logger.error(f"Embedding matrix shape {embeddings.shape} does not match {len(chunks)} chunks x {self.dim}")
+                return 0
             
-            row = {
-                "chunk_id": chunk.get("chunk_id", ""),
-                "source_id": chunk.get("source_id", ""),
-                "source_file": chunk.get("source_file", ""),
-                "text_content": chunk.get("text_content") or "",
-                "modality": chunk.get("modality", "unknown"),
-                "page_number": chunk.get("page_number"),
-                "timestamp_start": chunk.get("timestamp_start"),
-                "timestamp_end": chunk.get("timestamp_end"),
-                "line_start": chunk.get("line_start"),
-                "line_end": chunk.get("line_end"),
-                "bbox": chunk.get("bbox"),
-                "image_path": chunk.get("image_path"),
-                "ocr_confidence": chunk.get("ocr_confidence"),
-                "asr_confidence": chunk.get("asr_confidence"),
-                "avg_logprob": chunk.get("avg_logprob"),
-                "text_embedding": embedding_array,  # numpy array for FixedSizeList
-            }
-            sanitized.append(row)
-        
-        if not sanitized:
-            logger.warning("No valid chunks to insert after filtering")
+            sanitized = _record_batch(chunks, embeddings, self.model)
+            return self._add(sanitized)
+    
+    def _add(self, sanitized: pa.Table) -> int:
+        """Append rows coerced to the table schema; a batch that does not fit is rejected, never the table."""
+        self.last_activity = time.monotonic()
+        try:
+            if self.table is None:
+                schema = evidence_schema(self.dim)
+                rows = coerce(sanitized, schema)
+                self.table = self.db.create_table(self.table_name, rows, mode="create")
+                logger.info(f"Created table '{self.table_name}' (schema v{schema.metadata[b'schema_version'].decode()}), {rows.num_rows} rows")
+            else:
+                rows = coerce(sanitized, self.table.schema)
+                self.table.add(rows)
+                logger.info(f"Added {rows.num_rows} rows")
+                self._append_to_qindex(rows)
+        except SchemaError as e:
+            logger.error(f"Rejected batch of {sanitized.num_rows} rows that does not fit the table schema: {e}")
             return 0
         
-        if self.table is None:
-            # Create table - LanceDB will infer FixedSizeList from numpy arrays
-            self.table = self.db.create_table(
-                "evidence", 
-                sanitized,
-                mode="overwrite"
-            )
-            # Verify the schema is correct
-            schema = self.table.schema
-            embedding_field = schema.field("text_embedding")
-            logger.info(f"Created table, {len(sanitized)} rows, embedding type: {embedding_field.type}")
-        else:
+        self.stats.add(rows)
+        self.schedule_index_update()
+        return rows.num_rows
+    
+    def _build_stats(self) -> None:
+        # Under the write lock so no insert or delete lands mid-scan
+        try:
+            with self.write_lock:
+                self.stats.build(self.table)
+        except Exception as e:
+            logger.error(f"Corpus stats build failed: {e}")
+    
+    def schedule_index_update(self) -> None:
+        """
+        Bring the scalar and ANN indexes up to date in a background thread.
+        
+        At most one update runs at a time; inserts during an update make
+        it run once more afterwards instead of starting another thread.
+        """
+        with self._index_lock:
+            self._index_pending = True
+            if self._index_thread is not None and self._index_thread.is_alive():
+                return
+            self._index_thread = threading.Thread(target=self._run_index_updates, name="ann-index", daemon=True)
+            self._index_thread.start()
+    
+    def _run_index_updates(self) -> None:
+        while True:
+            with self._index_lock:
+                if not self._index_pending:
+                    self._index_thread = None
+                    return
+                self._index_pending = False
+            table, dim = self.table, self.dim
             try:
-                self.table.add(sanitized)
-                logger.info(f"Added {len(sanitized)} rows")
+                with self.maintenance_lock:
+                    indexes.update_indexes(table, dim)
+                self.ann_indexed = indexes.index_state(table) is not None
             except Exception as e:
-                # Handle schema mismatch (e.g. adding float to null column)
-                error_msg = str(e)
-                if "LanceError" in error_msg or "Arrow" in error_msg or "cast" in error_msg:
-                    logger.warning(f"Schema mismatch detected ({e}). Dropping and recreating table 'evidence'...")
-                    
-                    # Drop existing table
-                    self.db.drop_table("evidence")
-                    
-                    # Recreate with new data (this infers correct schema from current batch)
-                    self.table = self.db.create_table(
-                        "evidence", 
-                        sanitized,
-                        mode="overwrite"
-                    )
-                    
-                    # Verify
-                    schema = self.table.schema
-                    logger.info(f"Recreated table with Schema correction. Rows: {len(sanitized)}")
-                else:
-                    raise e
-        
-        return len(sanitized)
+                logger.error(f"Vector index update failed: {e}")
+    
+    def index_stats(self) -> dict:
+        """State of the ANN index on text_embedding and of the scalar indexes."""
+        if self.table is None:
+            return {"vector": None, "scalar": {}}
+        return {
+            "vector": indexes.index_state(self.table),
+            "scalar": indexes.scalar_index_state(self.table),
+        }
     
     def search(
         self,
@@ -138,74 +332,272 @@ class LanceDBClient:
         modalities: Optional[list[str]] = None,
         source_id: Optional[str] = None,
         min_confidence: Optional[float] = None,
+        nprobes: Optional[int] = None,
+        refine_factor: Optional[int] = None,
+        columns: Optional[list[str]] = None,
     ) -> list[dict]:
+        """search_arrow() as dicts, one per hit."""
+        return self.search_arrow(
+            query_embedding, limit, modalities, source_id, min_confidence, nprobes, refine_factor, columns
+        ).to_pylist()
+    
+    def search_arrow(
+        self,
+        query_embedding: list[float],
+        limit: int = 5,
+        modalities: Optional[list[str]] = None,
+        source_id: Optional[str] = None,
+        min_confidence: Optional[float] = None,
+        nprobes: Optional[int] = None,
+        refine_factor: Optional[int] = None,
+        columns: Optional[list[str]] = None,
+    ) -> pa.Table:
         """
         Unified cross-modal search using text embeddings.
         
-        Uses cosine similarity on FixedSizeList vector column.
+        Uses cosine similarity on FixedSizeList vector column. Once the table
+        has an ANN index, `nprobes` (IVF partitions searched) and
+        `refine_factor` (limit * factor candidates re-ranked with exact
+        distances) trade latency for recall; they default to ANN_NPROBES and
+        ANN_REFINE_FACTOR.
+        
+        Returns an Arrow table of `columns` (default RESULT_COLUMNS, i.e. no
+        vectors) plus `_distance` and `similarity`, best hit first.
         """
+        columns = list(columns or RESULT_COLUMNS)
+        empty = pa.table({c: pa.array([], type=pa.null()) for c in columns + ["_distance", "similarity"]})
         if self.table is None:
-            return []
+            return empty
+        self.last_activity = time.monotonic()
         
         # Ensure query is numpy array
         query_array = np.array(query_embedding, dtype=np.float32)
+        if len(query_array) != self.dim:
+            # Embedded just before an embedding model cutover
+            logger.warning(f"Query vector has {len(query_array)} dims, index has {self.dim}; skipping search")
+            return empty
+        
+        if VECTOR_QUANTIZATION != QUANT_NONE:
+            return self._search_quantized(query_array, limit, modalities, source_id, min_confidence, columns)
         
         # Start search with cosine metric
         query = self.table.search(query_array, vector_column_name="text_embedding")
+        if self.ann_indexed:
+            query = query.nprobes(nprobes or ANN_NPROBES)
+            refine_factor = ANN_REFINE_FACTOR if refine_factor is None else refine_factor
+            if refine_factor > 0:
+                query = query.refine_factor(refine_factor)
+        
+        # Filters go through the safe builder; modality/source_id hit scalar indexes
+        confidence_filter = None
+        if min_confidence is not None:
+            # Filter by confidence: use OCR if present, else ASR if present, else allow text-only
+            confidence_filter = or_(
+                and_(is_not_null("ocr_confidence"), ge("ocr_confidence", float(min_confidence))),
+                and_(is_null("ocr_confidence"), is_not_null("asr_confidence"), ge("asr_confidence", float(min_confidence))),
+                and_(is_null("ocr_confidence"), is_null("asr_confidence")),
+            )
+        filter_str = and_(
+            in_("modality", modalities) if modalities else None,
+            eq("source_id", source_id) if source_id else None,
+            confidence_filter,
+        )
         
-        # Build filter conditions
-        filters = []
+        fetch = limit
+        if filter_str:
+            # Prefilter so `limit` matches survive the filter. Under an ANN
+            # index an unindexed-only filter (confidence) is cheaper applied
+            # to the candidates afterwards; over-fetch so enough of them pass.
+            prefilter = not self.ann_indexed or bool(modalities or source_id)
+            query = query.where(filter_str, prefilter=prefilter)
+            if not prefilter:
+                fetch = limit * max(refine_factor, _POSTFILTER_OVERFETCH)
         
-        if modalities:
-            mod_conditions = [f"modality = '{m}'" for m in modalities]
-            filters.append(f"({' OR '.join(mod_conditions)})")
+        # Only the requested columns are read and returned
+        results = query.select(columns).limit(fetch).to_arrow()
+        return _with_similarity(results.slice(0, limit))
+    
+    def _quantized_index(self) -> QuantizedIndex:
+        """
+        Load the codes of all rows into memory (once; invalidated by deletes).
         
-        if source_id:
-            filters.append(f"source_id = '{source_id}'")
+        Rows without a code of the current mode (written before quantization
+        was enabled, or under another mode) are encoded from their vectors.
+        A load that an insert or delete overlapped serves the query that ran
+        it but is not kept, since it may lack those rows.
+        """
+        index = self._qindex
+        if index is not None:
+            return index
         
-        if min_confidence is not None:
-            # Filter by confidence: use OCR if present, else ASR if present, else allow text-only
-            filters.append(f"((ocr_confidence IS NOT NULL AND ocr_confidence >= {min_confidence}) OR (ocr_confidence IS NULL AND asr_confidence IS NOT NULL AND asr_confidence >= {min_confidence}) OR (ocr_confidence IS NULL AND asr_confidence IS NULL))")
+        with self._qindex_load_lock:
+            with self._qindex_lock:
+                if self._qindex is not None:
+                    return self._qindex
+                generation = self._qindex_generation
+            index = self._load_quantized_index()
+            with self._qindex_lock:
+                if self._qindex_generation == generation:
+                    self._qindex = index
+        return index
+    
+    def _load_quantized_index(self) -> QuantizedIndex:
+        total = max(self.table.count_rows(), 1)
+        data = (
+            self.table.search()
+            .select(["chunk_id", "modality", "source_id", "text_embedding_q"])
+            .limit(total)
+            .to_arrow()
+        )
+        size = code_size(VECTOR_QUANTIZATION, self.dim)
+        raw = data.column("text_embedding_q").to_pylist()
+        codes = np.zeros((len(raw), size), dtype=np.uint8)
+        missing = []
+        for i, code in enumerate(raw):
+            if code is not None and len(code) == size:
+                codes[i] = np.frombuffer(code, dtype=np.uint8)
+            else:
+                missing.append(i)
         
-        if filters:
-            filter_str = " AND ".join(filters)
-            query = query.where(filter_str)
+        chunk_ids = data.column("chunk_id").to_pylist()
+        if missing:
+            logger.info(f"Encoding {len(missing)} rows without {VECTOR_QUANTIZATION} codes")
+            vectors = self.table.search().select(["chunk_id", "text_embedding"]).limit(total).to_arrow()
+            by_id = dict(zip(vectors.column("chunk_id").to_pylist(), range(vectors.num_rows)))
+            flat = vectors.column("text_embedding").combine_chunks().flatten().to_numpy()
+            matrix = flat.reshape(-1, self.dim)
+            rows = [by_id[chunk_ids[i]] for i in missing]
+            codes[missing] = quantize(matrix[rows], VECTOR_QUANTIZATION)
         
-        # Execute and return results with distance → similarity conversion
-        results = query.limit(limit).to_list()
+        index = QuantizedIndex(
+            VECTOR_QUANTIZATION,
+            self.dim,
+            chunk_ids,
+            data.column("modality").to_pylist(),
+            data.column("source_id").to_pylist(),
+            codes,
+        )
+        logger.info(f"Loaded {VECTOR_QUANTIZATION} index: {len(index)} rows, {index.nbytes / 1e6:.1f} MB")
+        return index
+    
+    def _append_to_qindex(self, batch: pa.Table) -> None:
+        """Keep a loaded quantized index in sync with an insert (published as a new snapshot)."""
+        if VECTOR_QUANTIZATION == QUANT_NONE:
+            return
+        with self._qindex_lock:
+            if self._qindex is None:
+                # A load in progress may have missed these rows
+                self._qindex_generation += 1
+                return
+            flat = batch.column("text_embedding").combine_chunks().flatten().to_numpy()
+            self._qindex = self._qindex.extended(
+                batch.column("chunk_id").to_pylist(),
+                batch.column("modality").to_pylist(),
+                batch.column("source_id").to_pylist(),
+                quantize(flat.reshape(-1, self.dim), VECTOR_QUANTIZATION),
+            )
+    
+    def _invalidate_qindex(self) -> None:
+        """Drop the quantized index after rows were removed or changed; reloaded on the next search."""
+        with self._qindex_lock:
+            self._qindex = None
+            self._qindex_generation += 1
+    
+    def _search_quantized(
+        self,
+        query_array: np.ndarray,
+        limit: int,
+        modalities: Optional[list[str]],
+        source_id: Optional[str],
+        min_confidence: Optional[float],
+        columns: list[str],
+    ) -> pa.Table:
+        """
+        First pass over in-memory codes, then exact rescoring of the
+        limit * VECTOR_RESCORE_FACTOR best candidates with their float32 vectors.
+        
+        min_confidence is not in the codes, so it filters the candidates:
+        they are over-fetched, and widened again while fewer than `limit` pass.
+        """
+        index = self._quantized_index()
+        fetch = list(dict.fromkeys(columns + ["text_embedding", "ocr_confidence", "asr_confidence"]))
+        k = limit * VECTOR_RESCORE_FACTOR
+        if min_confidence is not None:
+            k *= _POSTFILTER_OVERFETCH
+        while True:
+            candidate_ids = index.candidates(query_array, k, modalities=modalities, source_id=source_id)
+            rows = self.get_by_ids_arrow(candidate_ids, fetch)
+            keep = np.ones(rows.num_rows, dtype=bool)
+            if min_confidence is not None and rows.num_rows:
+                ocr = rows.column("ocr_confidence").to_numpy(zero_copy_only=False).astype(np.float64)
+                asr = rows.column("asr_confidence").to_numpy(zero_copy_only=False).astype(np.float64)
+                conf = np.where(np.isnan(ocr), asr, ocr)  # OCR if present, else ASR, else text-only (kept)
+                keep = np.isnan(conf) | (conf >= min_confidence)
+            if keep.sum() >= limit or len(candidate_ids) < k:
+                break
+            k *= _POSTFILTER_OVERFETCH
         
-        # Add similarity score (1 - distance for cosine on normalized vectors)
-        for r in results:
-            distance = r.get("_distance", 0)
-            # For normalized vectors, cosine distance is in [0, 2]
-            # 0 = identical, 2 = opposite
-            r["similarity"] = max(0, 1 - (distance / 2))
+        cos = vector_matrix(rows.column("text_embedding"), self.dim) @ query_array if rows.num_rows else np.empty(0)
+        # Same scale as LanceDB's L2 distance on normalized vectors
+        distance = 2.0 - 2.0 * cos.astype(np.float64)
+        order = [i for i in np.argsort(distance, kind="stable") if keep[i]][:limit]
         
-        return results
+        rows = rows.take(pa.array(order, type=pa.int64())).select(columns)
+        rows = rows.append_column("_distance", pa.array(distance[order], type=pa.float64()))
+        return _with_similarity(rows)
     
-    def get_by_id(self, chunk_id: str) -> Optional[dict]:
-        """Get a specific chunk by ID using direct filter."""
+    def get_by_id(self, chunk_id: str, columns: Optional[list[str]] = None) -> Optional[dict]:
+        """Get a specific chunk by ID using direct filter (RESULT_COLUMNS unless `columns`)."""
         if self.table is None:
             return None
         
         try:
-            results = self.table.search().where(f"chunk_id = '{chunk_id}'").limit(1).to_list()
+            results = (
+                self.table.search()
+                .where(eq("chunk_id", chunk_id))
+                .select(list(columns or RESULT_COLUMNS))
+                .limit(1)
+                .to_list()
+            )
             return results[0] if results else None
         except Exception as e:
             logger.error(f"get_by_id failed: {e}")
             return None
     
-    def get_by_source(self, source_id: str) -> list[dict]:
-        """Get all chunks from a source."""
+    def get_by_ids(self, chunk_ids: list[str], columns: Optional[list[str]] = None) -> list[dict]:
+        """Fetch several chunks in one filter scan (chunk_id IN (...))."""
+        return self.get_by_ids_arrow(chunk_ids, columns).to_pylist()
+    
+    def get_by_ids_arrow(self, chunk_ids: list[str], columns: Optional[list[str]] = None) -> pa.Table:
+        """get_by_ids() as an Arrow table of `columns` (default RESULT_COLUMNS)."""
+        columns = list(columns or RESULT_COLUMNS)
+        if self.table is None or not chunk_ids:
+            return pa.table({c: pa.array([], type=pa.null()) for c in columns})
+        
+        try:
+            return self.table.search().where(in_("chunk_id", chunk_ids)).select(columns).limit(len(chunk_ids)).to_arrow()
+        except Exception as e:
+            logger.error(f"get_by_ids failed: {e}")
+            return pa.table({c: pa.array([], type=pa.null()) for c in columns})
+    
+    def get_by_source(self, source_id: str, columns: Optional[list[str]] = None) -> list[dict]:
+        """Get all chunks from a source (RESULT_COLUMNS unless `columns`)."""
         if self.table is None:
             return []
         
         try:
-            return self.table.search().where(f"source_id = '{source_id}'").to_list()
+            return (
+                self.table.search()
+                .where(eq("source_id", source_id))
+                .select(list(columns or RESULT_COLUMNS))
+                .limit(max(self.table.count_rows(), 1))  # default limit is 10 rows
+                .to_list()
+            )
         except Exception as e:
             logger.error(f"get_by_source failed: {e}")
             return []
     
+    @_writer
     def delete_source(self, source_id: str) -> int:
         """Delete all chunks from a source. Returns actual count deleted."""
         if self.table is None:
@@ -216,7 +608,9 @@ class LanceDBClient:
             before_count = self.table.count_rows()
             
             # Delete
-            self.table.delete(f"source_id = '{source_id}'")
+            self.table.delete(eq("source_id", source_id))
+            self._invalidate_qindex()
+            self.stats.remove_source(source_id)
             
             # Count after delete
             after_count = self.table.count_rows()
@@ -228,53 +622,102 @@ class LanceDBClient:
             logger.error(f"delete_source failed: {e}")
             return 0
     
+    @_writer
+    def delete_source_from(self, source_id: str, timestamp: float) -> None:
+        """Delete a source's rows starting at or after `timestamp` (resume of a windowed ingest)."""
+        if self.table is None:
+            return
+        
+        where = and_(eq("source_id", source_id), ge("timestamp_start", float(timestamp)))
+        removed = self.table.search().where(where).select(STATS_COLUMNS).limit(max(self.table.count_rows(), 1)).to_arrow()
+        self.table.delete(where)
+        self._invalidate_qindex()
+        self.stats.remove(removed)
+    
+    @_writer
+    def mark_source_complete(self, source_id: str) -> None:
+        """Flip all partial rows of a source to complete (progressive ingest commit)."""
+        if self.table is None:
+            return
+        
+        self.table.update(
+            where=and_(eq("source_id", source_id), eq("status", STATUS_PARTIAL)),
+            values={"status": STATUS_COMPLETE},
+        )
+    
+    def scan(self, batch_size: int = 4096, columns: Optional[list[str]] = None) -> Iterator[pa.RecordBatch]:
+        """
+        Stream the whole table as Arrow record batches (bulk/offline jobs).
+        
+        Reads fragment by fragment and only the requested columns, so memory
+        stays at one batch whatever the table size.
+        """
+        if self.table is None:
+            return
+        
+        yield from self.table.to_lance().to_batches(columns=columns, batch_size=batch_size)
+    
+    @_writer
+    def replace_embeddings(self, rows: pa.RecordBatch, embeddings: np.ndarray) -> int:
+        """
+        Overwrite the text_embedding (and its quantized code and model) of
+        existing rows, matched on chunk_id.
+        
+        `rows` are full table rows (from scan()); row i gets embeddings[i].
+        """
+        if self.table is None or rows.num_rows == 0:
+            return 0
+        
+        updated = coerce(with_embeddings(pa.Table.from_batches([rows]), embeddings, self.model), self.table.schema)
+        (
+            self.table.merge_insert("chunk_id")
+            .when_matched_update_all()
+            .execute(updated)
+        )
+        self._invalidate_qindex()
+        return rows.num_rows
+    
+    def cutover(self, table_name: str, model: str, dim: int) -> None:
+        """
+        Switch queries and inserts to another table/embedding model.
+        
+        Persisted first (embedding_state), then swapped in memory; callers
+        hold write_lock so no insert lands in the old table afterwards.
+        """
+        with self.write_lock:
+            table = self.db.open_table(table_name)
+            set_active(table_name, model, dim)
+            self.table = table
+            self.table_name = table_name
+            self.model = model
+            self.dim = dim
+            self._invalidate_qindex()
+            self.ann_indexed = False
+        self.schedule_index_update()
+    
     def count(self) -> int:
-        """Get total row count."""
+        """Get total row count (O(1) once the corpus stats are built)."""
         if self.table is None:
             return 0
+        if self.stats.ready:
+            return self.stats.total_rows
         return self.table.count_rows()
     
     def get_modality_counts(self) -> dict[str, int]:
-        """Get count of chunks by modality (sampled for performance)."""
-        if self.table is None:
-            return {}
-        
-        try:
-            total = self.table.count_rows()
-            if total == 0:
-                return {}
-            
-            # For small tables, count all; for large tables, sample
-            if total <= 1000:
-                rows = self.table.search().limit(total).to_list()
-            else:
-                # Sample up to 1000 rows for estimate
-                rows = self.table.search().limit(1000).to_list()
-                logger.info(f"Sampling 1000/{total} rows for modality counts")
-            
-            counts = {}
-            for row in rows:
-                mod = row.get("modality", "unknown")
-                counts[mod] = counts.get(mod, 0) + 1
-            
-            # Scale up if sampling
-            if total > 1000:
-                scale = total / 1000
-                counts = {k: int(v * scale) for k, v in counts.items()}
-            
-            return counts
-        except Exception as e:
-            logger.error(f"get_modality_counts failed: {e}")
-            return {}
+        """Exact count of chunks by modality (from the corpus stats)."""
+        return self.stats.snapshot()["by_modality"]
 
 
 # Singleton instance
 _db_client: Optional[LanceDBClient] = None
+_db_client_lock = threading.Lock()
 
 
 def get_db() -> LanceDBClient:
-    """Get or create database client."""
+    """Get or create database client (safe to call from any thread)."""
     global _db_client
     if _db_client is None:
-        _db_client = LanceDBClient()
+        with _db_client_lock:
+            if _db_client is None:
+                _db_client = LanceDBClient()
     return _db_client
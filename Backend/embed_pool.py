@@ -0,0 +1,169 @@
+"""Multi-process text embedding pool for bulk work.
+
+A single embedding model in one process leaves most cores idle on bulk
+ingests: PyTorch intra-op parallelism scales poorly on small batches. The
+pool starts EMBED_POOL_WORKERS processes, each holding its own copy of the
+text backend (with EMBED_POOL_THREADS threads), and shards large batches
+across them.
+
+Results travel through shared memory instead of pickles: the parent
+allocates one (n, dim) float32 SharedMemory block and each worker writes
+its normalized vectors straight into its rows. Only texts and row offsets
+cross the process boundary.
+
+Used by ingestion.build_chunks for batches of at least EMBED_POOL_MIN_BATCH
+texts and by the offline re-embed (reembed.py).
+"""
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+from typing import Optional
+from loguru import logger
+import threading
+import numpy as np
+
+from config import (
+    EMBED_POOL_WORKERS,
+    EMBED_POOL_THREADS,
+    EMBED_POOL_SHARD_SIZE,
+)
+
+# Per-worker-process embedder, created by _init_worker
+_WORKER_EMBEDDER = None
+
+
+def _init_worker(backend_name: Optional[str], model_name: str, threads: int) -> None:
+    global _WORKER_EMBEDDER
+    from embedder import Embedder
+
+    if threads:
+        try:
+            import torch
+            torch.set_num_threads(threads)
+        except ImportError:
+            pass
+    _WORKER_EMBEDDER = Embedder(text_backend=backend_name, model_name=model_name)
+    _WORKER_EMBEDDER.text_backend  # load the model now, not on the first shard
+
+
+def _probe_dim() -> int:
+    return _WORKER_EMBEDDER.encode_texts(["probe"]).shape[1]
+
+
+def _encode_shard(shm_name: str, total_rows: int, dim: int, offset: int, texts: list[str]) -> int:
+    """Encode `texts` into rows [offset, offset + len(texts)) of the shared matrix."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        out = np.ndarray((total_rows, dim), dtype=np.float32, buffer=shm.buf)
+        out[offset:offset + len(texts)] = _WORKER_EMBEDDER.encode_texts(texts)
+        del out  # release the buffer export before closing
+    finally:
+        shm.close()
+    return len(texts)
+
+
+class EmbeddingPool:
+    """N worker processes, each with a model copy, sharing one output matrix."""
+
+    def __init__(
+        self,
+        workers: int = EMBED_POOL_WORKERS,
+        backend_name: Optional[str] = None,
+        model_name: Optional[str] = None,
+        threads: int = EMBED_POOL_THREADS,
+        shard_size: int = EMBED_POOL_SHARD_SIZE,
+    ):
+        from embedding_state import get_active
+
+        self.workers = workers
+        self.model_name = model_name or get_active()["model"]
+        self.shard_size = max(1, shard_size)
+        # spawn: forked copies of a process with a loaded torch model misbehave
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(backend_name, self.model_name, threads),
+        )
+        self.dim = self._executor.submit(_probe_dim).result()
+        # encode_texts calls in flight; close(drain=True) waits for them
+        self._calls = 0
+        self._closed = False
+        self._idle = threading.Condition()
+        logger.info(
+            f"Started embedding pool for {self.model_name}: "
+            f"{workers} workers x {threads or 'default'} threads"
+        )
+
+    def encode_texts(self, texts: list[str]) -> np.ndarray:
+        """Same contract as Embedder.encode_texts: (n, dim) float32, L2-normalized."""
+        n = len(texts)
+        if n == 0:
+            return np.empty((0, self.dim), dtype=np.float32)
+
+        with self._idle:
+            if self._closed:
+                raise RuntimeError(f"Embedding pool for {self.model_name} is closed")
+            self._calls += 1
+        shm = shared_memory.SharedMemory(create=True, size=n * self.dim * 4)
+        try:
+            futures = [
+                self._executor.submit(_encode_shard, shm.name, n, self.dim, offset, texts[offset:offset + self.shard_size])
+                for offset in range(0, n, self.shard_size)
+            ]
+            for future in futures:
+                future.result()
+
+            shared = np.ndarray((n, self.dim), dtype=np.float32, buffer=shm.buf)
+            result = shared.copy()  # one memcpy out of the segment before it is freed
+            del shared
+            return result
+        finally:
+            shm.close()
+            shm.unlink()
+            with self._idle:
+                self._calls -= 1
+                self._idle.notify_all()
+
+    def close(self, drain: bool = False) -> None:
+        """Stop the workers; with `drain`, let running encode_texts calls finish first."""
+        with self._idle:
+            self._closed = True
+            if drain:
+                self._idle.wait_for(lambda: self._calls == 0)
+        self._executor.shutdown(wait=True, cancel_futures=not drain)
+
+
+_pool: Optional[EmbeddingPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_embed_pool() -> Optional[EmbeddingPool]:
+    """The shared pool (active embedding model), or None when EMBED_POOL_WORKERS < 2."""
+    global _pool
+    if _pool is None and EMBED_POOL_WORKERS >= 2:
+        with _pool_lock:
+            if _pool is None:
+                _pool = EmbeddingPool()
+    return _pool
+
+
+def replace_embed_pool(pool: Optional[EmbeddingPool] = None) -> None:
+    """
+    Swap the shared pool for `pool` (None: recreated lazily on next use).
+
+    The old pool is closed after the calls already running on it finish, so
+    an ingest embedding a batch during a model cutover is not cancelled.
+    """
+    global _pool
+    with _pool_lock:
+        old, _pool = _pool, pool
+    if old is not None:
+        old.close(drain=True)
+
+
+def shutdown_embed_pool() -> None:
+    global _pool
+    with _pool_lock:
+        old, _pool = _pool, None
+    if old is not None:
+        old.close()
@@ -1,27 +1,269 @@
-"""Embedding generation for text and images."""
+"""Embedding generation for text and images.
+
+Text embeddings come from a selectable backend (TEXT_EMBEDDING_BACKEND):
+
+- torch: sentence-transformers on PyTorch (reference implementation)
+- onnx:  the same MiniLM model exported to ONNX and run with onnxruntime,
+         optionally with dynamic int8 weight quantization
+         (EMBED_ONNX_QUANTIZE) and a fixed intra-op thread count
+         (EMBED_ONNX_THREADS). The model is exported into EMBED_ONNX_DIR
+         on first use.
+
+ONNX vectors must stay within a cosine tolerance of the torch vectors for
+the same text: >= MIN_COSINE_FP32 for the fp32 export and >= MIN_COSINE_INT8
+for the int8 one. The tolerance is checked on a small probe set right after
+export and reported per backend by benchmarks/bench_embedder.py.
+"""
+from abc import ABC, abstractmethod
+from pathlib import Path
 from typing import Optional
+import asyncio
+import threading
 import numpy as np
 from loguru import logger
 
-from config import TEXT_EMBEDDING_MODEL, IMAGE_EMBEDDING_MODEL
+from config import (
+    TEXT_EMBEDDING_MODEL,
+    TEXT_EMBEDDING_DIM,
+    IMAGE_EMBEDDING_MODEL,
+    TEXT_EMBEDDING_BACKEND,
+    EMBED_ONNX_QUANTIZE,
+    EMBED_ONNX_THREADS,
+    EMBED_ONNX_DIR,
+    EMBED_BATCH_SIZE,
+    QUERY_BATCH_MAX_SIZE,
+    QUERY_BATCH_MAX_WAIT_MS,
+)
+
+MIN_COSINE_FP32 = 0.999
+MIN_COSINE_INT8 = 0.98
+MAX_SEQ_LENGTH = 256  # all-MiniLM-L6-v2 truncation length (as in sentence-transformers)
+
+# Sentences used to check an export against the torch model
+_PROBE_TEXTS = [
+    "The quarterly report shows revenue grew by twelve percent.",
+    "Slide 4: system architecture overview",
+    "so what we're going to do now is look at the second experiment",
+    "Invoice #4821 due 2024-03-01",
+    "LanceDB stores the embeddings used for semantic search.",
+]
+
+
+def _hub_id(model_name: str) -> str:
+    # sentence-transformers resolves bare names to the sentence-transformers org
+    return model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+
+
+class TextBackend(ABC):
+    """A text encoder returning raw (un-normalized) float32 vectors."""
+
+    name = "base"
+
+    def __init__(self, model_name: str = TEXT_EMBEDDING_MODEL):
+        self.model_name = model_name
+
+    @property
+    def model_version(self) -> str:
+        return self.model_name
+
+    @abstractmethod
+    def load(self) -> None:
+        """Load (and cache) the underlying model."""
+
+    @abstractmethod
+    def encode(self, texts: list[str]) -> np.ndarray:
+        """(len(texts), dim) float32 vectors, not normalized."""
+
+
+class TorchTextBackend(TextBackend):
+    """sentence-transformers SentenceTransformer on PyTorch."""
+
+    name = "torch"
+
+    def __init__(self, model_name: str = TEXT_EMBEDDING_MODEL):
+        super().__init__(model_name)
+        self._model = None
+
+    def load(self) -> None:
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            logger.info(f"Loading text model: {self.model_name}")
+            self._model = SentenceTransformer(self.model_name)
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        self.load()
+        return self._model.encode(texts, batch_size=EMBED_BATCH_SIZE, convert_to_numpy=True).astype(np.float32)
+
+
+class OnnxTextBackend(TextBackend):
+    """The MiniLM transformer exported to ONNX, mean-pooled like sentence-transformers."""
+
+    name = "onnx"
+
+    def __init__(
+        self,
+        model_name: str = TEXT_EMBEDDING_MODEL,
+        quantize: bool = EMBED_ONNX_QUANTIZE,
+        threads: int = EMBED_ONNX_THREADS,
+    ):
+        super().__init__(model_name)
+        self.quantize = quantize
+        self.threads = threads
+        self._session = None
+        self._tokenizer = None
+        self._input_names: list[str] = []
+
+    @property
+    def model_version(self) -> str:
+        return f"{self.model_name}:onnx-{'int8' if self.quantize else 'fp32'}"
+
+    @property
+    def tolerance(self) -> float:
+        return MIN_COSINE_INT8 if self.quantize else MIN_COSINE_FP32
+
+    @property
+    def model_path(self) -> Path:
+        suffix = "-int8" if self.quantize else ""
+        return EMBED_ONNX_DIR / f"{self.model_name.replace('/', '__')}{suffix}.onnx"
+
+    def load(self) -> None:
+        if self._session is not None:
+            return
+
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self._tokenizer = AutoTokenizer.from_pretrained(_hub_id(self.model_name))
+        exported = not self.model_path.exists()
+        if exported:
+            self._export()
+
+        options = ort.SessionOptions()
+        if self.threads:
+            options.intra_op_num_threads = self.threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        logger.info(f"Loading ONNX text model: {self.model_path.name} (threads={self.threads or 'default'})")
+        self._session = ort.InferenceSession(
+            str(self.model_path), options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = [i.name for i in self._session.get_inputs()]
+
+        if exported:
+            self._check_export()
+
+    def _export(self) -> None:
+        """Export the transformer to ONNX (and quantize it), then check it against torch."""
+        import torch
+        from transformers import AutoModel
+
+        EMBED_ONNX_DIR.mkdir(parents=True, exist_ok=True)
+        fp32_path = EMBED_ONNX_DIR / f"{self.model_name.replace('/', '__')}.onnx"
+
+        if not fp32_path.exists():
+            logger.info(f"Exporting {self.model_name} to ONNX")
+            model = AutoModel.from_pretrained(_hub_id(self.model_name)).eval()
+            dummy = self._tokenizer(["export probe"], return_tensors="pt")
+            names = ["input_ids", "attention_mask", "token_type_ids"]
+            axes = {n: {0: "batch", 1: "sequence"} for n in names}
+            axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+            tmp_path = fp32_path.with_suffix(".tmp")
+            with torch.no_grad():
+                torch.onnx.export(
+                    model,
+                    tuple(dummy[n] for n in names),
+                    str(tmp_path),
+                    input_names=names,
+                    output_names=["last_hidden_state"],
+                    dynamic_axes=axes,
+                    opset_version=14,
+                )
+            tmp_path.replace(fp32_path)
+
+        if self.quantize:
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+            logger.info("Quantizing ONNX text model to int8")
+            tmp_path = self.model_path.with_suffix(".tmp")
+            quantize_dynamic(str(fp32_path), str(tmp_path), weight_type=QuantType.QInt8)
+            tmp_path.replace(self.model_path)
+
+    def _check_export(self) -> None:
+        """Log the cosine agreement with the torch model; warn if outside tolerance."""
+        reference = TorchTextBackend(self.model_name).encode(_PROBE_TEXTS)
+        cosine = cosine_agreement(reference, self.encode(_PROBE_TEXTS))
+        if cosine < self.tolerance:
+            logger.warning(
+                f"ONNX export {self.model_path.name} deviates from torch: "
+                f"min cosine {cosine:.4f} < {self.tolerance}"
+            )
+        else:
+            logger.info(f"ONNX export {self.model_path.name}: min cosine vs torch {cosine:.5f}")
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        self.load()
+        out = np.empty((len(texts), 0), dtype=np.float32)
+        # Length-sorted batches keep padding (and wasted compute) small
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        for b in range(0, len(order), EMBED_BATCH_SIZE):
+            idx = order[b:b + EMBED_BATCH_SIZE]
+            tokens = self._tokenizer(
+                [texts[i] for i in idx],
+                padding=True,
+                truncation=True,
+                max_length=MAX_SEQ_LENGTH,
+                return_tensors="np",
+            )
+            feeds = {n: tokens[n].astype(np.int64) for n in self._input_names if n in tokens}
+            hidden = self._session.run(None, feeds)[0]
+
+            # Mean pooling over real tokens
+            mask = tokens["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+            if out.shape[1] == 0:
+                out = np.empty((len(texts), pooled.shape[1]), dtype=np.float32)
+            out[idx] = pooled
+        return out
+
+
+TEXT_BACKENDS = {
+    "torch": TorchTextBackend,
+    "onnx": OnnxTextBackend,
+}
+
+
+def get_text_backend(name: Optional[str] = None, model_name: Optional[str] = None) -> TextBackend:
+    """Instantiate a text backend by name (defaults to TEXT_EMBEDDING_BACKEND) for a model."""
+    name = name or TEXT_EMBEDDING_BACKEND
+    if name not in TEXT_BACKENDS:
+        raise ValueError(f"Unknown text embedding backend: {name!r} (choose from {list(TEXT_BACKENDS)})")
+    return TEXT_BACKENDS[name](model_name or TEXT_EMBEDDING_MODEL)
+
+
+def cosine_agreement(a: np.ndarray, b: np.ndarray) -> float:
+    """Minimum row-wise cosine similarity between two embedding matrices."""
+    a = a / np.clip(np.linalg.norm(a, axis=1, keepdims=True), 1e-12, None)
+    b = b / np.clip(np.linalg.norm(b, axis=1, keepdims=True), 1e-12, None)
+    return float((a * b).sum(axis=1).min())
 
 
 class Embedder:
    
     
-    def __init__(self):
-        self._text_model = None
+    def __init__(self, text_backend: Optional[str] = None, model_name: Optional[str] = None):
+        self._text_backend_name = text_backend
+        self.model_name = model_name or TEXT_EMBEDDING_MODEL
+        self._text_backend: Optional[TextBackend] = None
         self._clip_model = None
         self._clip_processor = None
     
     @property
-    def text_model(self):
-        """Lazy load text embedding model."""
-        if self._text_model is None:
-            from sentence_transformers import SentenceTransformer
-            logger.info(f"Loading text model: {TEXT_EMBEDDING_MODEL}")
-            self._text_model = SentenceTransformer(TEXT_EMBEDDING_MODEL)
-        return self._text_model
+    def text_backend(self) -> TextBackend:
+        """Lazy load text embedding backend."""
+        if self._text_backend is None:
+            backend = get_text_backend(self._text_backend_name, self.model_name)
+            backend.load()
+            self._text_backend = backend
+        return self._text_backend
     
     @property
     def clip_model(self):
@@ -42,24 +284,30 @@ class Embedder:
         """Generate normalized text embedding for cosine similarity."""
         if not text or not text.strip():
             return []
-        embedding = self.text_model.encode(text, convert_to_numpy=True)
-        # L2 normalize for cosine similarity
-        norm = np.linalg.norm(embedding)
-        if norm > 0:
-            embedding = embedding / norm
-        return embedding.tolist()
+        return self.encode_texts([text])[0].tolist()
     
     def embed_texts(self, texts: list[str]) -> list[list[float]]:
         """Batch embed texts with normalization."""
         texts = [t for t in texts if t and t.strip()]
         if not texts:
             return []
-        embeddings = self.text_model.encode(texts, convert_to_numpy=True)
-        # L2 normalize each embedding
+        return self.encode_texts(texts).tolist()
+    
+    def encode_texts(self, texts: list[str]) -> np.ndarray:
+        """
+        Batch embed texts into one C-contiguous float32 matrix (n, dim), L2-normalized.
+        
+        Ingestion keeps this matrix as is down to the Arrow insert, so vectors
+        never become Python floats. Every text must be non-empty.
+        """
+        if not texts:
+            return np.empty((0, TEXT_EMBEDDING_DIM), dtype=np.float32)
+        embeddings = np.ascontiguousarray(self.text_backend.encode(texts), dtype=np.float32)
+        # L2 normalize in place
         norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
-        norms = np.where(norms > 0, norms, 1)  # Avoid division by zero
-        embeddings = embeddings / norms
-        return embeddings.tolist()
+        norms[norms == 0] = 1  # Avoid division by zero
+        embeddings /= norms
+        return embeddings
     
     def embed_image(self, image) -> list[float]:
         """Generate image embedding using CLIP."""
@@ -92,11 +340,104 @@ class Embedder:
 
 # Singleton
 _embedder: Optional[Embedder] = None
+_embedder_lock = threading.Lock()
 
 
 def get_embedder() -> Embedder:
-    """Get or create embedder."""
+    """Get or create the embedder of the index's active embedding model."""
     global _embedder
     if _embedder is None:
-        _embedder = Embedder()
+        from db import get_db
+        model = get_db().model  # outside the lock: get_db() has its own
+        with _embedder_lock:
+            if _embedder is None:
+                _embedder = Embedder(model_name=model)
     return _embedder
+
+
+def set_embedder(embedder: Embedder) -> None:
+    """Swap the shared embedder (embedding model cutover)."""
+    global _embedder
+    with _embedder_lock:
+        _embedder = embedder
+
+
+class QueryEmbeddingBatcher:
+    """
+    Async micro-batcher for query embeddings.
+
+    Concurrent callers of embed() are collected for up to `max_wait_ms` or
+    `max_batch` texts, then encoded with one embed_texts() call in a worker
+    thread; each caller's future receives its own vector. Only one batch
+    runs at a time: queries arriving meanwhile form the next batch, so
+    batches grow with load instead of queueing single-text passes.
+    """
+
+    def __init__(
+        self,
+        embedder: Optional[Embedder] = None,
+        max_batch: int = QUERY_BATCH_MAX_SIZE,
+        max_wait_ms: float = QUERY_BATCH_MAX_WAIT_MS,
+    ):
+        self._embedder = embedder  # None: follow the shared embedder across model cutovers
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000.0
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running: Optional[asyncio.Task] = None
+
+    async def embed(self, text: str) -> list[float]:
+        """Embed one query text (normalized); [] for empty text."""
+        if not text or not text.strip():
+            return []
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._running is not None or not self._pending:
+            return  # picked up when the running batch finishes
+
+        batch = self._pending[:self.max_batch]
+        del self._pending[:self.max_batch]
+        self._running = asyncio.get_running_loop().create_task(self._run(batch))
+
+    async def _run(self, batch: list[tuple[str, asyncio.Future]]) -> None:
+        unique = list(dict.fromkeys(text for text, _ in batch))  # identical queries share a pass
+        try:
+            embedder = self._embedder or get_embedder()
+            vectors = await asyncio.to_thread(embedder.embed_texts, unique)
+            by_text = dict(zip(unique, vectors))
+            for text, future in batch:
+                if not future.done():
+                    future.set_result(by_text[text])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._running = None
+            if self._pending:
+                self._flush()
+
+
+_query_batcher: Optional[QueryEmbeddingBatcher] = None
+
+
+def get_query_batcher() -> QueryEmbeddingBatcher:
+    """Get or create the query embedding batcher."""
+    global _query_batcher
+    if _query_batcher is None:
+        _query_batcher = QueryEmbeddingBatcher()
+    return _query_batcher
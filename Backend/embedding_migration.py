@@ -0,0 +1,245 @@
+"""Zero-downtime switch to another text embedding model.
+
+Vectors from different models are not comparable, so a model change means
+re-embedding the whole table. An EmbeddingMigration does that into a
+shadow table (evidence__<model>) while the active table keeps serving
+queries and ingests:
+
+1. copy:     scan the active table in EMBED_MIGRATION_BATCH_SIZE batches,
+             re-embed text_content with the new model, append to the shadow
+2. catch-up: sync rows ingested, deleted or completed during the copy
+3. cutover:  repeat the sync under the client's write lock, then switch the
+             active table/model (embedding_state) and the query embedder
+
+The old table is kept so a cutover can be undone by pointing
+embedding_state.json back at it.
+"""
+from typing import Optional
+from loguru import logger
+import re
+import threading
+import time
+
+import pyarrow as pa
+
+from config import EMBED_MIGRATION_BATCH_SIZE, EMBED_POOL_WORKERS
+from embedding_state import DEFAULT_TABLE
+from filters import in_
+from schema import VECTOR_COLUMNS, coerce, evidence_schema
+
+IDLE = "idle"
+COPYING = "copying"
+CATCHING_UP = "catching_up"
+CUTOVER = "cutover"
+DONE = "done"
+FAILED = "failed"
+
+_SYNC_ID_BATCH = 500
+
+
+def shadow_table_name(model: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", model.rsplit("/", 1)[-1]).strip("_").lower()
+    return f"{DEFAULT_TABLE}__{slug}"
+
+
+class EmbeddingMigration:
+    """Re-embed the active table with `model` and cut over when caught up."""
+
+    def __init__(
+        self,
+        model: str,
+        backend_name: Optional[str] = None,
+        batch_size: int = EMBED_MIGRATION_BATCH_SIZE,
+        workers: int = EMBED_POOL_WORKERS,
+    ):
+        self.model = model
+        self.backend_name = backend_name
+        self.batch_size = max(1, batch_size)
+        self.workers = workers
+        self.table_name = shadow_table_name(model)
+        self.state = IDLE
+        self.total = 0
+        self.done = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self._encoder = None
+        self._shadow = None
+        self._shadow_ids: dict[str, str] = {}  # chunk_id -> status of the shadow rows
+        self._schema = None
+
+    def progress(self) -> dict:
+        elapsed = ((self.finished_at or time.time()) - self.started_at) if self.started_at else 0.0
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        remaining = max(self.total - self.done, 0)
+        return {
+            "state": self.state,
+            "model": self.model,
+            "table": self.table_name,
+            "total": self.total,
+            "done": self.done,
+            "rows_per_sec": round(rate, 1),
+            "eta_sec": round(remaining / rate, 1) if rate > 0 and self.state == COPYING else None,
+            "error": self.error,
+        }
+
+    def run(self) -> None:
+        """Run to completion (blocking); failures leave the active table untouched."""
+        from db import get_db
+        from embedder import set_embedder
+        from embed_pool import EmbeddingPool, replace_embed_pool
+
+        self.started_at = time.time()
+        db = get_db()
+        try:
+            self._encoder = self._make_encoder()
+            dim = self._encoder.encode_texts(["probe"]).shape[1]
+            self._schema = evidence_schema(dim)
+
+            self.state = COPYING
+            self._copy(db)
+
+            self.state = CATCHING_UP
+            self._sync(db)
+            query_embedder = self._query_embedder()
+
+            self.state = CUTOVER
+            with db.write_lock:
+                self._sync(db)
+                self._cutover(db, dim)
+                set_embedder(query_embedder)
+            # Ingests switch to a pool of the new model; the old one drains first
+            if isinstance(self._encoder, EmbeddingPool) and self.workers == EMBED_POOL_WORKERS:
+                pool, self._encoder = self._encoder, None
+                replace_embed_pool(pool)
+            else:
+                replace_embed_pool()  # recreated lazily with the new model
+
+            self.state = DONE
+            logger.info(f"Embedding migration to {self.model} done: {self.done} rows")
+        except Exception as e:
+            self.state = FAILED
+            self.error = str(e)
+            logger.error(f"Embedding migration to {self.model} failed: {e}")
+        finally:
+            self.finished_at = time.time()
+            if self._encoder is not None and hasattr(self._encoder, "close"):
+                self._encoder.close()
+
+    def _make_encoder(self):
+        if self.workers >= 2:
+            from embed_pool import EmbeddingPool
+            return EmbeddingPool(self.workers, self.backend_name, self.model)
+        from embedder import Embedder
+        return Embedder(text_backend=self.backend_name, model_name=self.model)
+
+    def _reembed(self, rows: pa.Table) -> pa.Table:
+        from db import with_embeddings
+
+        texts = [t or " " for t in rows.column("text_content").to_pylist()]
+        return with_embeddings(rows, self._encoder.encode_texts(texts), self.model)
+
+    def _write(self, db, rows: pa.Table) -> None:
+        rows = coerce(self._reembed(rows), self._schema)
+        if self._shadow is None:
+            self._shadow = db.db.create_table(self.table_name, rows, mode="overwrite")
+        else:
+            self._shadow.add(rows)
+        self._shadow_ids.update(zip(rows.column("chunk_id").to_pylist(), rows.column("status").to_pylist()))
+        self.done += rows.num_rows
+
+    def _copy(self, db) -> None:
+        if self.table_name in db.db.table_names():
+            logger.info(f"Dropping stale shadow table '{self.table_name}'")
+            db.db.drop_table(self.table_name)
+
+        self.total = db.count()
+        columns = None
+        if db.table is not None:
+            columns = [name for name in db.table.schema.names if name not in VECTOR_COLUMNS]
+        logger.info(f"Embedding migration to {self.model}: re-embedding {self.total} rows into '{self.table_name}'")
+
+        for batch in db.scan(batch_size=self.batch_size, columns=columns):
+            self._write(db, pa.Table.from_batches([batch]))
+
+    def _ids_and_status(self, table) -> dict[str, str]:
+        """chunk_id -> status, reading only those two columns."""
+        if table is None:
+            return {}
+        data = table.to_lance().to_table(columns=["chunk_id", "status"])
+        return dict(zip(data.column("chunk_id").to_pylist(), data.column("status").to_pylist()))
+
+    def _sync(self, db) -> None:
+        """
+        Apply inserts, deletes and status changes made to the active table since the copy.
+
+        The shadow side is tracked in memory, so only two columns of the
+        active table are read; the catch-up sync leaves the final one (under
+        the write lock) with just the last few writes to apply.
+        """
+        active = self._ids_and_status(db.table)
+        shadow = self._shadow_ids
+
+        added = [cid for cid in active if cid not in shadow]
+        deleted = [cid for cid in shadow if cid not in active]
+        changed = [cid for cid in active if cid in shadow and active[cid] != shadow[cid]]
+        if not (added or deleted or changed):
+            return
+        logger.info(f"Embedding migration sync: +{len(added)} -{len(deleted)} ~{len(changed)} rows")
+
+        self.total += len(added)
+        columns = [name for name in db.table.schema.names if name not in VECTOR_COLUMNS]
+        for i in range(0, len(added), _SYNC_ID_BATCH):
+            ids = added[i:i + _SYNC_ID_BATCH]
+            rows = db.table.search().where(in_("chunk_id", ids)).select(columns).limit(len(ids)).to_arrow()
+            self._write(db, rows)
+
+        for i in range(0, len(deleted), _SYNC_ID_BATCH):
+            self._shadow.delete(in_("chunk_id", deleted[i:i + _SYNC_ID_BATCH]))
+        for cid in deleted:
+            del self._shadow_ids[cid]
+
+        by_status: dict[str, list[str]] = {}
+        for cid in changed:
+            by_status.setdefault(active[cid], []).append(cid)
+        for status, ids in by_status.items():
+            for i in range(0, len(ids), _SYNC_ID_BATCH):
+                self._shadow.update(where=in_("chunk_id", ids[i:i + _SYNC_ID_BATCH]), values={"status": status})
+            self._shadow_ids.update(dict.fromkeys(ids, status))
+
+    def _query_embedder(self):
+        """In-process embedder for the new model, loaded before the cutover."""
+        from embedder import Embedder
+
+        if isinstance(self._encoder, Embedder):
+            return self._encoder
+        embedder = Embedder(text_backend=self.backend_name, model_name=self.model)
+        embedder.text_backend  # load now, not on the first query
+        return embedder
+
+    def _cutover(self, db, dim: int) -> None:
+        if self._shadow is None:
+            # Empty source table: nothing to copy, just switch the model
+            from embedding_state import set_active
+            set_active(db.table_name, self.model, dim)
+            db.model, db.dim = self.model, dim
+        else:
+            db.cutover(self.table_name, self.model, dim)
+
+
+_migration: Optional[EmbeddingMigration] = None
+_lock = threading.Lock()
+
+
+def start_migration(model: str, backend_name: Optional[str] = None) -> Optional[EmbeddingMigration]:
+    """Create the migration job, or None when one is already running."""
+    global _migration
+    with _lock:
+        if _migration is not None and _migration.state not in (DONE, FAILED):
+            return None
+        _migration = EmbeddingMigration(model, backend_name)
+        return _migration
+
+
+def get_migration() -> Optional[EmbeddingMigration]:
+    return _migration
@@ -0,0 +1,51 @@
+"""Which evidence table and text embedding model currently serve queries.
+
+The state lives next to the LanceDB data (embedding_state.json) so the
+active model survives restarts and is switched atomically (temp file +
+rename) at the end of an embedding migration (see embedding_migration).
+
+Without a state file the install predates versioning: the "evidence" table
+and the legacy MiniLM model are active.
+"""
+from typing import Optional
+from loguru import logger
+import json
+import os
+
+from config import LANCEDB_PATH, LEGACY_TEXT_EMBEDDING_MODEL, TEXT_EMBEDDING_DIM
+
+DEFAULT_TABLE = "evidence"
+
+_STATE_PATH = LANCEDB_PATH / "embedding_state.json"
+_state: Optional[dict] = None
+
+
+def get_active() -> dict:
+    """{"table", "model", "dim"} of the embedding space serving queries (cached)."""
+    global _state
+    if _state is None:
+        _state = {"table": DEFAULT_TABLE, "model": LEGACY_TEXT_EMBEDDING_MODEL, "dim": TEXT_EMBEDDING_DIM}
+        if _STATE_PATH.exists():
+            try:
+                with open(_STATE_PATH, "r", encoding="utf-8") as f:
+                    _state.update(json.load(f))
+            except Exception as e:
+                logger.error(f"Unreadable embedding state, using defaults: {e}")
+    return dict(_state)
+
+
+def has_state() -> bool:
+    return _STATE_PATH.exists()
+
+
+def set_active(table: str, model: str, dim: int, **extra) -> None:
+    """Persist a new active table/model atomically."""
+    global _state
+    state = {"table": table, "model": model, "dim": dim, **extra}
+    LANCEDB_PATH.mkdir(parents=True, exist_ok=True)
+    tmp_path = _STATE_PATH.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, _STATE_PATH)
+    _state = state
+    logger.info(f"Active embedding model: {model} ({dim}-d, table '{table}')")
@@ -0,0 +1,85 @@
+"""Safe SQL filter strings for LanceDB where() / delete() / update().
+
+LanceDB takes filters as SQL text without bind parameters, so every value
+goes through literal(): strings are single-quoted with embedded quotes
+doubled, numbers must be finite, booleans and None map to SQL keywords.
+Column names must be plain identifiers. Build filters from these helpers,
+never by formatting values into SQL by hand:
+
+    and_(in_("modality", ["text", "ocr"]), eq("source_id", source_id))
+"""
+from typing import Any, Iterable, Optional
+import math
+import re
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def column(name: str) -> str:
+    if not _IDENTIFIER.match(name):
+        raise ValueError(f"Invalid column name: {name!r}")
+    return name
+
+
+def literal(value: Any) -> str:
+    """SQL literal for a Python value."""
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            raise ValueError(f"Non-finite number in filter: {value!r}")
+        return repr(value)
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    raise TypeError(f"Unsupported filter value type: {type(value).__name__}")
+
+
+def eq(name: str, value: Any) -> str:
+    if value is None:
+        return is_null(name)
+    return f"{column(name)} = {literal(value)}"
+
+
+def ge(name: str, value: Any) -> str:
+    return f"{column(name)} >= {literal(value)}"
+
+
+def is_null(name: str) -> str:
+    return f"{column(name)} IS NULL"
+
+
+def is_not_null(name: str) -> str:
+    return f"{column(name)} IS NOT NULL"
+
+
+def in_(name: str, values: Iterable[Any]) -> str:
+    values = list(values)
+    if not values:
+        return "FALSE"
+    if len(values) == 1:
+        return eq(name, values[0])
+    return f"{column(name)} IN ({', '.join(literal(v) for v in values)})"
+
+
+def and_(*clauses: Optional[str]) -> Optional[str]:
+    """Conjunction of the non-empty clauses (None when there are none)."""
+    clauses = [c for c in clauses if c]
+    if not clauses:
+        return None
+    if len(clauses) == 1:
+        return clauses[0]
+    return " AND ".join(f"({c})" for c in clauses)
+
+
+def or_(*clauses: Optional[str]) -> Optional[str]:
+    """Disjunction of the non-empty clauses (None when there are none)."""
+    clauses = [c for c in clauses if c]
+    if not clauses:
+        return None
+    if len(clauses) == 1:
+        return clauses[0]
+    return " OR ".join(f"({c})" for c in clauses)
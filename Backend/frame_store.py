@@ -0,0 +1,147 @@
+"""Storage for video keyframe images.
+
+Ingestion keeps only a small WebP thumbnail per keyframe in FRAMES_DIR
+(FRAME_THUMB_WIDTH px wide), which is what evidence previews show. The
+full-resolution frame is rendered on demand from the source video in
+DATA_DIR by seeking to the keyframe timestamp, and kept in a bounded LRU
+disk cache (FRAME_CACHE_DIR, FRAME_CACHE_MAX_MB) so repeated views do not
+decode again. Least recently served frames are evicted first.
+
+Both thumbnails and cached full frames are named
+`{source_id}_frame_{ms:08d}`, so all images of a source can be removed
+together with its rows.
+"""
+from pathlib import Path
+from typing import Optional
+from loguru import logger
+import os
+import threading
+import cv2
+import numpy as np
+
+from config import (
+    DATA_DIR,
+    FRAMES_DIR,
+    FRAME_THUMB_WIDTH,
+    FRAME_THUMB_QUALITY,
+    FRAME_FULL_QUALITY,
+    FRAME_CACHE_DIR,
+    FRAME_CACHE_MAX_MB,
+    VIDEO_MAX_WIDTH,
+)
+
+_CACHE_LOCK = threading.Lock()
+
+
+def frame_stem(source_id: str, t: float) -> str:
+    """File stem of a keyframe; timestamps in ms keep frames of different windows apart."""
+    return f"{source_id}_frame_{round(t * 1000):08d}"
+
+
+def encode_thumbnail(frame_rgb: np.ndarray) -> bytes:
+    """Downscale an RGB frame to FRAME_THUMB_WIDTH and encode it as WebP."""
+    from ingestion.keyframes import downscale
+
+    small = downscale(cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2BGR), FRAME_THUMB_WIDTH)
+    ok, webp = cv2.imencode(".webp", small, [cv2.IMWRITE_WEBP_QUALITY, FRAME_THUMB_QUALITY])
+    if not ok:
+        raise RuntimeError("WebP encoding failed")
+    return webp.tobytes()
+
+
+def save_thumbnail(source_id: str, t: float, thumbnail: bytes) -> Path:
+    path = FRAMES_DIR / f"{frame_stem(source_id, t)}.webp"
+    path.write_bytes(thumbnail)
+    return path
+
+
+def _source_video(source_id: str) -> Optional[Path]:
+    # Uploads are saved as {source_id}{ext}
+    return next(DATA_DIR.glob(f"{source_id}.*"), None)
+
+
+def _render(video_path: Path, t: float) -> bytes:
+    """Decode the frame at `t` seconds and encode it as JPEG (at most VIDEO_MAX_WIDTH wide)."""
+    from ingestion.keyframes import downscale
+
+    cap = cv2.VideoCapture(str(video_path))
+    try:
+        if not cap.isOpened():
+            raise RuntimeError(f"OpenCV cannot open video: {video_path}")
+        cap.set(cv2.CAP_PROP_POS_MSEC, t * 1000.0)
+        ok, frame = cap.read()
+        if not ok:
+            raise RuntimeError(f"No frame at {t:.2f}s in {video_path.name}")
+    finally:
+        cap.release()
+
+    ok, jpeg = cv2.imencode(
+        ".jpg", downscale(frame, VIDEO_MAX_WIDTH), [cv2.IMWRITE_JPEG_QUALITY, FRAME_FULL_QUALITY]
+    )
+    if not ok:
+        raise RuntimeError("JPEG encoding failed")
+    return jpeg.tobytes()
+
+
+def _evict(max_bytes: int) -> None:
+    """Delete least recently used cached frames until the cache fits `max_bytes`."""
+    files = []
+    total = 0
+    for path in FRAME_CACHE_DIR.glob("*.jpg"):
+        st = path.stat()
+        files.append((st.st_mtime, st.st_size, path))
+        total += st.st_size
+
+    files.sort()  # oldest access first
+    for _, size, path in files:
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+
+
+def get_full_frame(source_id: str, t: float) -> Optional[Path]:
+    """
+    Path of the full-resolution frame at `t`, rendering it into the cache on a miss.
+
+    Returns None if the source video is gone.
+    """
+    path = FRAME_CACHE_DIR / f"{frame_stem(source_id, t)}.jpg"
+    with _CACHE_LOCK:
+        if path.exists():
+            os.utime(path)  # mark as recently used
+            return path
+
+    video_path = _source_video(source_id)
+    if video_path is None:
+        return None
+
+    data = _render(video_path, t)
+
+    with _CACHE_LOCK:
+        FRAME_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        _evict(FRAME_CACHE_MAX_MB * 1024 * 1024)
+    return path
+
+
+def delete_source_frames(source_id: str, from_time: float = 0.0) -> int:
+    """Remove thumbnails and cached full frames of a source at or after `from_time`."""
+    from_ms = round(from_time * 1000)
+    removed = 0
+    for directory in (FRAMES_DIR, FRAME_CACHE_DIR):
+        if not directory.exists():
+            continue
+        for path in directory.glob(f"{source_id}_frame_*"):
+            try:
+                ms = int(path.stem.rsplit("_", 1)[1])
+            except ValueError:
+                continue
+            if ms >= from_ms:
+                path.unlink(missing_ok=True)
+                removed += 1
+    if removed:
+        logger.info(f"Removed {removed} frame images of source {source_id}")
+    return removed
@@ -0,0 +1,163 @@
+"""Index lifecycle of the evidence table.
+
+Scalar indexes serve the filters: BTREE on the high-cardinality id
+columns (chunk_id, source_id) and BITMAP on the low-cardinality ones
+(modality, status). They are cheap, so they are created as soon as the
+table has rows.
+
+The ANN index serves vector search on text_embedding. Below
+ANN_INDEX_MIN_ROWS a flat scan is fast and exact, so no index is kept.
+Past it, an ANN_INDEX_TYPE index is trained. Rows inserted afterwards
+stay unindexed (LanceDB flat-scans just those rows and merges them into
+every result) until the next update:
+
+- few unindexed rows: table.optimize() adds them to the existing index,
+  keeping its trained centroids and codebooks
+- more than ANN_REBUILD_FRACTION of the indexed rows: the index is
+  retrained from scratch, so its partitions follow the data again
+
+Rows missing from scalar indexes are added by the same optimize().
+LanceDBClient runs update_indexes() in a background thread after inserts
+(see LanceDBClient.schedule_index_update). Recall and latency against exact
+search are measured by benchmarks/bench_ann.py.
+"""
+from typing import Optional
+from loguru import logger
+import math
+import time
+
+from config import ANN_INDEX_TYPE, ANN_INDEX_MIN_ROWS, ANN_REBUILD_FRACTION
+
+INDEX_NONE = "none"
+VECTOR_COLUMN = "text_embedding"
+METRIC = "L2"  # matches the flat search; on normalized vectors it ranks like cosine
+
+SCALAR_INDEXES = {
+    "chunk_id": "BTREE",
+    "source_id": "BTREE",
+    "modality": "BITMAP",
+    "status": "BITMAP",
+}
+
+NO_CHANGE = "no_change"
+BUILT = "built"
+REBUILT = "rebuilt"
+OPTIMIZED = "optimized"
+
+
+def index_params(index_type: str, num_rows: int, dim: int) -> dict:
+    """create_index() arguments sized for the table."""
+    if index_type == "IVF_PQ":
+        # ~sqrt(n) partitions; 8 dims per PQ sub-vector (must divide dim)
+        sub_vectors = max(1, dim // 8)
+        while dim % sub_vectors:
+            sub_vectors -= 1
+        return {
+            "num_partitions": max(1, min(4096, int(math.sqrt(num_rows)))),
+            "num_sub_vectors": sub_vectors,
+        }
+    if index_type == "IVF_HNSW_SQ":
+        # The HNSW graph does the fine search; partitions only bound its size
+        return {"num_partitions": max(1, num_rows // 1_000_000)}
+    raise ValueError(f"Unknown ANN index type: {index_type!r}")
+
+
+def _stats(table, index) -> Optional[dict]:
+    stats = table.index_stats(index.name)
+    if stats is None:
+        return None
+    return {
+        "name": index.name,
+        "index_type": str(index.index_type),
+        "indexed_rows": stats.num_indexed_rows,
+        "unindexed_rows": stats.num_unindexed_rows,
+    }
+
+
+def index_state(table) -> Optional[dict]:
+    """{"name", "index_type", "indexed_rows", "unindexed_rows"} of the vector index, or None."""
+    for index in table.list_indices():
+        if list(index.columns) == [VECTOR_COLUMN]:
+            return _stats(table, index)
+    return None
+
+
+def scalar_index_state(table) -> dict[str, dict]:
+    """Indexed column -> stats of its scalar index."""
+    states = {}
+    for index in table.list_indices():
+        columns = list(index.columns)
+        if len(columns) == 1 and columns[0] in SCALAR_INDEXES:
+            state = _stats(table, index)
+            if state is not None:
+                states[columns[0]] = state
+    return states
+
+
+def ensure_scalar_indexes(table) -> list[str]:
+    """Create the missing scalar indexes; returns the columns indexed now."""
+    existing = {list(index.columns)[0] for index in table.list_indices() if len(index.columns) == 1}
+    names = set(table.schema.names)
+    created = []
+    for name, index_type in SCALAR_INDEXES.items():
+        if name in existing or name not in names:
+            continue
+        table.create_scalar_index(name, index_type=index_type, replace=True)
+        created.append(name)
+    if created:
+        logger.info(f"Created scalar indexes on {created}")
+    return created
+
+
+def build_index(table, dim: int, index_type: str = ANN_INDEX_TYPE) -> None:
+    num_rows = table.count_rows()
+    params = index_params(index_type, num_rows, dim)
+    t0 = time.perf_counter()
+    table.create_index(
+        metric=METRIC,
+        vector_column_name=VECTOR_COLUMN,
+        index_type=index_type,
+        replace=True,
+        **params,
+    )
+    logger.info(f"Built {index_type} index over {num_rows} rows {params} in {time.perf_counter() - t0:.1f}s")
+
+
+def update_indexes(table, dim: int) -> str:
+    """Create scalar indexes, then build, extend or rebuild the vector index as the table requires."""
+    if table is None or table.count_rows() == 0:
+        return NO_CHANGE
+    ensure_scalar_indexes(table)
+    action = _update_vector_index(table, dim)
+
+    if action != OPTIMIZED:
+        # optimize() also brings the scalar indexes up to date
+        unindexed = sum(s["unindexed_rows"] for s in scalar_index_state(table).values())
+        if unindexed:
+            table.optimize()
+            action = OPTIMIZED
+    return action
+
+
+def _update_vector_index(table, dim: int) -> str:
+    if ANN_INDEX_TYPE == INDEX_NONE:
+        return NO_CHANGE
+
+    state = index_state(table)
+    if state is None:
+        if table.count_rows() < ANN_INDEX_MIN_ROWS:
+            return NO_CHANGE
+        build_index(table, dim)
+        return BUILT
+
+    unindexed = state["unindexed_rows"]
+    if unindexed == 0:
+        return NO_CHANGE
+    if unindexed > ANN_REBUILD_FRACTION * state["indexed_rows"]:
+        logger.info(f"{unindexed} unindexed rows vs {state['indexed_rows']} indexed, retraining the index")
+        build_index(table, dim)
+        return REBUILT
+
+    table.optimize()
+    logger.info(f"Added {unindexed} rows to the vector index")
+    return OPTIMIZED
@@ -2,9 +2,13 @@
 from pathlib import Path
 from typing import Tuple, Set
 from loguru import logger
+import asyncio
 import uuid
+import numpy as np
 
+from config import EMBED_POOL_MIN_BATCH
 from embedder import get_embedder
+from embed_pool import get_embed_pool
 
 
 # Supported file extensions
@@ -17,7 +21,8 @@ VIDEO_EXTENSIONS = {".mp4", ".mkv", ".avi", ".mov", ".webm"}
 async def ingest_file(
     file_path: Path,
     source_id: str,
-    original_filename: str
+    original_filename: str,
+    indexer=None,
 ) -> Tuple[list[dict], Set[str]]:
     """
     Ingest a file and return chunks with embeddings.
@@ -26,6 +31,11 @@ async def ingest_file(
         file_path: Path to saved file
         source_id: Unique source identifier
         original_filename: Original uploaded filename
+        indexer: Optional ProgressiveIndexer. When given, chunks are embedded and
+            appended to the evidence table batch by batch as parsers produce them
+            (audio/video stream per transcript window / frame batch), and the
+            returned chunk list is empty. Audio/video also checkpoint through
+            the indexer after every window and skip windows it already completed.
     
     Returns:
         Tuple of (list of chunks, set of modalities)
@@ -35,6 +45,9 @@ async def ingest_file(
     
     raw_chunks = []
     modalities = set()
+    on_chunks = indexer.add if indexer is not None else None
+    on_window = indexer.checkpoint_window if indexer is not None else None
+    start_window = indexer.resume_window if indexer is not None else 0
     
     # Route to appropriate parser
     if ext in DOCUMENT_EXTENSIONS:
@@ -51,22 +64,58 @@ async def ingest_file(
             
     elif ext in AUDIO_EXTENSIONS:
         from ingestion.audio import parse_audio
-        raw_chunks = await parse_audio(file_path)
+        raw_chunks = await parse_audio(
+            file_path, on_chunks=on_chunks, on_window=on_window, start_window=start_window
+        )
         modalities.add("audio_transcript")
         
     elif ext in VIDEO_EXTENSIONS:
         from ingestion.video import parse_video
-        raw_chunks = await parse_video(file_path, source_id)
+        raw_chunks = await parse_video(
+            file_path, source_id,
+            on_chunks=on_chunks, on_window=on_window, start_window=start_window,
+        )
         modalities.update(["video_frame", "audio_transcript"])
         
     else:
         raise ValueError(f"Unsupported file type: {ext}")
     
-    # Add metadata and embeddings
+    if indexer is not None:
+        # Parsers without streaming support hand back everything at once
+        if raw_chunks:
+            await indexer.add(raw_chunks)
+        logger.info(
+            f"Indexed {indexer.chunks_created} chunks progressively with modalities: {modalities}"
+        )
+        return [], modalities
+    
+    final_chunks, embeddings = await asyncio.to_thread(build_chunks, raw_chunks, source_id, original_filename, ext)
+    for chunk, embedding in zip(final_chunks, embeddings):
+        chunk["text_embedding"] = embedding  # row view of the batch matrix
+    
+    logger.info(f"Created {len(final_chunks)} chunks with modalities: {modalities}")
+    return final_chunks, modalities
+
+
+def build_chunks(
+    raw_chunks: list[dict],
+    source_id: str,
+    original_filename: str,
+    ext: str,
+    start_index: int = 0,
+) -> Tuple[list[dict], np.ndarray]:
+    """
+    Add metadata and embeddings to parser output.
+    
+    `start_index` offsets chunk IDs so batches of one source never collide.
+    
+    Returns the chunks and their text embeddings as one float32 matrix
+    (row i belongs to chunk i), ready for LanceDBClient.insert(chunks, embeddings).
+    """
     embedder = get_embedder()
     final_chunks = []
     
-    for i, chunk in enumerate(raw_chunks):
+    for i, chunk in enumerate(raw_chunks, start=start_index):
         chunk_id = f"{source_id}_{i:04d}"
         
         # Build final chunk
@@ -85,22 +134,30 @@ async def ingest_file(
             "timestamp_start": chunk.get("timestamp_start"),
             "timestamp_end": chunk.get("timestamp_end"),
             "bbox": chunk.get("bbox"),
+            "ocr_regions": chunk.get("ocr_regions"),
+            "audio_context": chunk.get("audio_context"),
             "ocr_confidence": chunk.get("ocr_confidence"),
             "asr_confidence": chunk.get("asr_confidence"),
             "avg_logprob": chunk.get("avg_logprob"),
         }
         
-        # Generate text embedding for unified search
         # All modalities get text embeddings (from text, OCR, vision description, transcripts)
-        if chunk.get("text_content"):
-            final_chunk["text_embedding"] = embedder.embed_text(chunk["text_content"])
+        if chunk.get("text_content") and chunk["text_content"].strip():
             final_chunks.append(final_chunk)
         else:
             # Skip chunks without text content to avoid empty embedding issues
             logger.warning(f"Chunk {chunk_id} has no text content, skipping")
     
-    logger.info(f"Created {len(final_chunks)} chunks with modalities: {modalities}")
-    return final_chunks, modalities
+    # Generate text embeddings for unified search, one batched encode
+    # (sharded over the embedding pool for large batches)
+    texts = [c["text_content"] for c in final_chunks]
+    pool = get_embed_pool() if len(texts) >= EMBED_POOL_MIN_BATCH else None
+    encoder = pool or embedder
+    embeddings = encoder.encode_texts(texts)
+    for c in final_chunks:
+        c["embedding_model"] = encoder.model_name
+    
+    return final_chunks, embeddings
 
 
 def get_source_type(ext: str) -> str:
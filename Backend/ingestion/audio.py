@@ -6,16 +6,26 @@ Fixes:
 3. no_speech_prob filtering
 4. Semantic re-chunking by sentences
 5. Ready-to-store format (no separate embedding needed)
+6. Pluggable ASR backends (openai-whisper or int8 CTranslate2 via faster-whisper)
+7. Audio piped from ffmpeg as float32 PCM (no temp WAV, single decode)
 """
+from abc import ABC, abstractmethod
 from pathlib import Path
+from typing import Optional
 from loguru import logger
+import asyncio
 import math
 import re
 
+from config import ASR_BACKEND, ASR_COMPUTE_TYPE, ASR_CPU_THREADS, ASR_BEAM_SIZE, ASR_CHUNK_SEC
+
 # Global model cache for reproducibility
 _WHISPER_MODEL = None
 WHISPER_MODEL_VERSION = "base"  # Versioned for auditability
 
+# Segments above this no_speech_prob are treated as silence/music/noise
+NO_SPEECH_THRESHOLD = 0.6
+
 
 def _get_whisper_model():
     """Load Whisper model once and cache it."""
@@ -34,6 +44,145 @@ def _get_whisper_model():
     return _WHISPER_MODEL
 
 
+class ASRBackend(ABC):
+    """
+    Common interface for speech-to-text backends.
+
+    transcribe() accepts a file path or a 16 kHz mono float32 numpy array and
+    returns Whisper-style segment dicts (text, start, end, avg_logprob,
+    no_speech_prob), so confidence scoring and re-chunking stay backend-agnostic.
+    """
+
+    name = "base"
+
+    def __init__(self, model_version: str = WHISPER_MODEL_VERSION):
+        self.model_version = model_version
+        self.decode_options: dict = {}
+
+    @abstractmethod
+    def load(self):
+        """Load (and cache) the underlying model."""
+
+    @abstractmethod
+    def transcribe(self, audio) -> list[dict]:
+        """Segment dicts of `audio` (file path or 16 kHz mono float32 array)."""
+
+    @staticmethod
+    def _segment(text, start, end, avg_logprob, no_speech_prob) -> dict:
+        return {
+            "text": (text or "").strip(),
+            "start": float(start or 0.0),
+            "end": float(end if end is not None else start or 0.0),
+            "avg_logprob": float(avg_logprob if avg_logprob is not None else -0.5),
+            "no_speech_prob": float(no_speech_prob or 0.0),
+        }
+
+
+class WhisperBackend(ASRBackend):
+    """Reference backend: openai-whisper (PyTorch, fp32 on CPU)."""
+
+    name = "whisper"
+
+    def __init__(self, model_version: str = WHISPER_MODEL_VERSION):
+        super().__init__(model_version)
+        self.decode_options = {"fp16": False}  # Fix: UserWarning on CPU
+
+    def load(self):
+        return _get_whisper_model()
+
+    def transcribe(self, audio) -> list[dict]:
+        model = self.load()
+        if isinstance(audio, Path):
+            audio = str(audio)
+        result = model.transcribe(audio, verbose=False, **self.decode_options)
+        return [
+            self._segment(
+                seg.get("text"),
+                seg.get("start"),
+                seg.get("end"),
+                seg.get("avg_logprob"),
+                seg.get("no_speech_prob"),
+            )
+            for seg in result.get("segments", [])
+        ]
+
+
+class FasterWhisperBackend(ASRBackend):
+    """CPU-optimized backend: CTranslate2 Whisper with int8 weights (faster-whisper)."""
+
+    name = "faster_whisper"
+
+    def __init__(self, model_version: str = WHISPER_MODEL_VERSION):
+        super().__init__(model_version)
+        self._model = None
+        self.decode_options = {
+            "compute_type": ASR_COMPUTE_TYPE,
+            "beam_size": ASR_BEAM_SIZE,
+        }
+
+    def load(self):
+        if self._model is None:
+            try:
+                from faster_whisper import WhisperModel
+            except ImportError:
+                logger.error("faster-whisper not installed")
+                raise
+            logger.info(
+                f"Loading faster-whisper model: {self.model_version} "
+                f"(compute_type={ASR_COMPUTE_TYPE}, cpu_threads={ASR_CPU_THREADS or 'auto'})"
+            )
+            self._model = WhisperModel(
+                self.model_version,
+                device="cpu",
+                compute_type=ASR_COMPUTE_TYPE,
+                cpu_threads=ASR_CPU_THREADS,
+            )
+            logger.info("faster-whisper model loaded and cached")
+        return self._model
+
+    def transcribe(self, audio) -> list[dict]:
+        model = self.load()
+        if isinstance(audio, Path):
+            audio = str(audio)
+        # Segments are yielded lazily; decoding happens while we iterate
+        segments, _info = model.transcribe(audio, beam_size=ASR_BEAM_SIZE)
+        return [
+            self._segment(seg.text, seg.start, seg.end, seg.avg_logprob, seg.no_speech_prob)
+            for seg in segments
+        ]
+
+
+ASR_BACKENDS = {
+    WhisperBackend.name: WhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+}
+
+_ASR_BACKEND: Optional[ASRBackend] = None
+
+
+def get_asr_backend(name: Optional[str] = None) -> ASRBackend:
+    """
+    Get the configured ASR backend (cached).
+
+    Passing an explicit name (e.g. from a benchmark) returns a fresh,
+    uncached instance of that backend.
+    """
+    global _ASR_BACKEND
+
+    if name is not None:
+        if name not in ASR_BACKENDS:
+            raise ValueError(f"Unknown ASR backend: {name}")
+        return ASR_BACKENDS[name]()
+
+    if _ASR_BACKEND is None:
+        backend_cls = ASR_BACKENDS.get(ASR_BACKEND)
+        if backend_cls is None:
+            logger.warning(f"Unknown ASR_BACKEND '{ASR_BACKEND}', falling back to whisper")
+            backend_cls = WhisperBackend
+        _ASR_BACKEND = backend_cls()
+    return _ASR_BACKEND
+
+
 def _calculate_confidence(avg_logprob: float, no_speech_prob: float) -> float:
     """
     Calculate proper confidence from Whisper outputs.
@@ -120,9 +269,110 @@ def _rechunk_by_sentences(segments: list[dict]) -> list[dict]:
     return chunks
 
 
-async def parse_audio(file_path: Path) -> list[dict]:
+def transcribe_segments(audio, content_hash: Optional[str] = None, **cache_scope) -> list[dict]:
+    """
+    Transcribe to raw segments, going through the persistent transcript cache.
+
+    Args:
+        audio: File path or 16 kHz mono float32 numpy array
+        content_hash: Hash identifying the audio content (computed if omitted)
+        cache_scope: Extra key parts, e.g. the clip range of a video's audio track
     """
-    Parse audio files using Whisper.
+    from ingestion.transcript_cache import (
+        file_sha256, pcm_sha256, transcript_cache_key, load_transcript, store_transcript,
+    )
+
+    backend = get_asr_backend()
+
+    if content_hash is None:
+        content_hash = file_sha256(audio) if isinstance(audio, Path) else pcm_sha256(audio)
+
+    key = transcript_cache_key(content_hash, backend, **cache_scope)
+    cached = load_transcript(key)
+    if cached is not None:
+        logger.info(f"Transcript cache hit ({len(cached)} segments, key {key[:12]})")
+        return cached
+
+    segments = backend.transcribe(audio)
+    store_transcript(key, segments, backend)
+    return segments
+
+
+def transcribe_file(
+    file_path: Path,
+    start: float = 0.0,
+    end: Optional[float] = None,
+    content_hash: Optional[str] = None,
+) -> list[dict]:
+    """
+    Transcribe the audio of any media file over [start, end).
+
+    Audio is decoded by ffmpeg straight into a float32 buffer and handed to
+    the ASR backend in memory. Ranges longer than ASR_CHUNK_SEC are decoded
+    and transcribed chunk by chunk to bound memory; each chunk is cached on
+    its own. Returned segment timestamps are absolute (seconds from file start).
+    """
+    from ingestion.media import load_pcm, probe_media
+    from ingestion.transcript_cache import file_sha256
+
+    if content_hash is None:
+        content_hash = file_sha256(file_path)
+    if end is None:
+        end = probe_media(file_path)["duration"]
+
+    segments = []
+    chunk_start = start
+    while chunk_start < end:
+        chunk_end = min(end, chunk_start + ASR_CHUNK_SEC)
+        scope = {"start": round(chunk_start, 3), "end": round(chunk_end, 3)}
+
+        chunk_segments = get_cached_segments(content_hash, **scope)
+        if chunk_segments is None:
+            pcm = load_pcm(file_path, chunk_start, chunk_end - chunk_start)
+            chunk_segments = transcribe_segments(pcm, content_hash=content_hash, **scope)
+
+        # Cached segments are relative to their chunk
+        for seg in chunk_segments:
+            segments.append({
+                **seg,
+                "start": seg["start"] + chunk_start,
+                "end": seg["end"] + chunk_start,
+            })
+        chunk_start = chunk_end
+
+    return segments
+
+
+def get_cached_segments(content_hash: str, **cache_scope) -> Optional[list[dict]]:
+    """Look up cached raw segments without transcribing (None on miss)."""
+    from ingestion.transcript_cache import transcript_cache_key, load_transcript
+
+    key = transcript_cache_key(content_hash, get_asr_backend(), **cache_scope)
+    return load_transcript(key)
+
+
+def segments_to_chunks(segments: list[dict]) -> list[dict]:
+    """Filter silent/noisy segments and re-chunk the rest by sentences."""
+    # Filter out segments with high no_speech_prob (silence/music/noise)
+    valid_segments = [
+        seg for seg in segments
+        if seg.get("no_speech_prob", 0.0) < NO_SPEECH_THRESHOLD
+    ]
+
+    logger.info(f"Filtered {len(segments) - len(valid_segments)} silent/noisy segments")
+
+    # Re-chunk by sentences for semantic meaning while keeping timings
+    return _rechunk_by_sentences(valid_segments)
+
+
+async def parse_audio(
+    file_path: Path,
+    on_chunks=None,
+    on_window=None,
+    start_window: int = 0,
+) -> list[dict]:
+    """
+    Parse audio files using the configured ASR backend.
 
     Returns ready-to-store chunks with:
     - Semantic segmentation (by sentences)
@@ -130,39 +380,53 @@ async def parse_audio(file_path: Path) -> list[dict]:
     - Silence/noise filtering (no_speech_prob)
     - Reproducible transcription (cached model)
     - Timestamps for alignment with video frames
+
+    The file is processed in INGEST_WINDOW_SEC windows. If `on_chunks` (async
+    callable) is given, each window's chunks are handed to it for progressive
+    indexing instead of being returned; `on_window(index, end)` is awaited
+    after every window and windows before `start_window` are skipped (resume).
     """
-    try:
-        model = _get_whisper_model()
+    from ingestion.media import probe_media, split_windows
+    from ingestion.transcript_cache import file_sha256
+
+    chunks = []
 
-        logger.info(f"Transcribing audio: {file_path}")
+    try:
+        backend = get_asr_backend()
 
-        # Transcribe
-        result = model.transcribe(
-            str(file_path),
-            verbose=False,
-            fp16=False, # Fix: UserWarning on CPU
-        )
+        logger.info(f"Transcribing audio: {file_path} (backend: {backend.name})")
 
-        segments = result.get("segments", [])
+        content_hash = file_sha256(file_path)
+        windows = split_windows(probe_media(file_path)["duration"])
 
-        # Filter out segments with high no_speech_prob (silence/music/noise)
-        NO_SPEECH_THRESHOLD = 0.6
-        valid_segments = [
-            seg for seg in segments
-            if seg.get("no_speech_prob", 0.0) < NO_SPEECH_THRESHOLD
-        ]
+        for window_index, (window_start, window_end) in enumerate(windows):
+            if window_index < start_window:
+                continue
 
-        logger.info(f"Filtered {len(segments) - len(valid_segments)} silent/noisy segments")
+            segments = await asyncio.to_thread(
+                transcribe_file, file_path, window_start, window_end, content_hash
+            )
+            window_chunks = segments_to_chunks(segments)
 
-        # Re-chunk by sentences for semantic meaning while keeping timings
-        chunks = _rechunk_by_sentences(valid_segments)
+            if on_chunks is not None:
+                await on_chunks(window_chunks)
+            else:
+                chunks.extend(window_chunks)
+            if on_window is not None:
+                await on_window(window_index, window_end)
 
-        logger.info(f"Transcribed {len(chunks)} semantic chunks (model: {WHISPER_MODEL_VERSION})")
-        return chunks
+        logger.info(
+            f"Transcribed {len(windows)} windows "
+            f"(backend: {backend.name}, model: {backend.model_version})"
+        )
 
     except ImportError:
-        logger.error("Whisper not installed")
+        logger.error("ASR backend not installed")
         return []
     except Exception as e:
         logger.error(f"Audio transcription failed: {e}")
-        return []
\ No newline at end of file
+        if on_chunks is not None:
+            raise
+        return []
+
+    return chunks
@@ -0,0 +1,102 @@
+"""Checkpoints for resumable ingestion jobs.
+
+A checkpoint is written when a job starts and again after every completed
+window of a long audio/video file. It records everything needed to pick
+the job up after a crash or restart: the saved upload, the next window to
+process and the chunk ID counter.
+
+A running job holds an exclusive claim on its checkpoint (an OS file lock,
+released automatically if the process dies). With several server workers
+only the worker holding the claim runs or resumes the job; the others see
+JobClaimed.
+"""
+from pathlib import Path
+from datetime import datetime
+from typing import Optional
+from loguru import logger
+import json
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from config import INGEST_CHECKPOINT_DIR
+
+
+def _checkpoint_path(source_id: str) -> Path:
+    return INGEST_CHECKPOINT_DIR / f"{source_id}.json"
+
+
+class JobClaimed(RuntimeError):
+    """The job is being run by another worker."""
+
+
+def _lock_path(source_id: str) -> Path:
+    return INGEST_CHECKPOINT_DIR / f"{source_id}.lock"
+
+
+def claim_job(source_id: str) -> int:
+    """
+    Take the exclusive claim on a job; returns the lock's file descriptor.
+
+    Raises JobClaimed if another process holds it.
+    """
+    INGEST_CHECKPOINT_DIR.mkdir(parents=True, exist_ok=True)
+    fd = os.open(_lock_path(source_id), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        os.close(fd)
+        raise JobClaimed(f"Ingest {source_id} is running in another worker")
+    return fd
+
+
+def release_job(source_id: str, fd: int) -> None:
+    """Release a claim; the lock file goes once the job has no checkpoint left."""
+    if not _checkpoint_path(source_id).exists():
+        _lock_path(source_id).unlink(missing_ok=True)
+    os.close(fd)  # closing drops the lock
+
+
+def save_checkpoint(source_id: str, state: dict) -> None:
+    """Persist job state atomically (write to temp file, then rename)."""
+    INGEST_CHECKPOINT_DIR.mkdir(parents=True, exist_ok=True)
+    path = _checkpoint_path(source_id)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({**state, "updated_at": datetime.utcnow().isoformat()}, f)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(source_id: str) -> Optional[dict]:
+    path = _checkpoint_path(source_id)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning(f"Unreadable checkpoint for {source_id}: {e}")
+        return None
+
+
+def clear_checkpoint(source_id: str) -> None:
+    _checkpoint_path(source_id).unlink(missing_ok=True)
+
+
+def pending_checkpoints() -> list[dict]:
+    """All checkpoints of jobs that never committed or aborted."""
+    if not INGEST_CHECKPOINT_DIR.exists():
+        return []
+    states = []
+    for path in sorted(INGEST_CHECKPOINT_DIR.glob("*.json")):
+        state = load_checkpoint(path.stem)
+        if state:
+            states.append(state)
+    return states
@@ -4,6 +4,22 @@ from loguru import logger
 
 from config import FRAMES_DIR
 
+_IMAGE_OCR_READER = None
+
+
+def _get_image_ocr_reader():
+    """
+    Load the image EasyOCR reader once and cache it.
+    English on GPU, as images were always read; video frames use their own
+    reader configured by VIDEO_OCR_LANGS and VIDEO_OCR_USE_GPU.
+    """
+    global _IMAGE_OCR_READER
+    if _IMAGE_OCR_READER is None:
+        import easyocr
+        logger.info("Loading EasyOCR reader for images (langs=['en'], gpu=True)")
+        _IMAGE_OCR_READER = easyocr.Reader(['en'], gpu=True)
+    return _IMAGE_OCR_READER
+
 
 async def parse_image(file_path: Path) -> list[dict]:
     """
@@ -96,10 +112,8 @@ async def get_vision_description(image_path: str) -> str:
 async def run_ocr(file_path: Path) -> list[dict]:
     """Run EasyOCR on image."""
     try:
-        import easyocr
-        
-        # Initialize reader (lazy load)
-        reader = easyocr.Reader(['en'], gpu=True)
+        # Loaded once, warmed up at startup
+        reader = _get_image_ocr_reader()
         
         results = reader.readtext(str(file_path))
         
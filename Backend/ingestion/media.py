@@ -0,0 +1,139 @@
+"""FFmpeg helpers: media probing and in-memory PCM decoding.
+
+Audio is decoded by a single ffmpeg subprocess straight to 16 kHz mono
+float32 on stdout and read into a numpy buffer, which ASR backends accept
+directly. No intermediate WAV is written and nothing decodes the audio twice.
+"""
+from pathlib import Path
+from typing import Optional
+import json
+import subprocess
+import tempfile
+import numpy as np
+
+from config import INGEST_WINDOW_SEC
+
+SAMPLE_RATE = 16000  # Whisper's expected input rate
+
+_READ_BLOCK = 1 << 20  # bytes read from ffmpeg's stdout at a time
+
+
+def probe_media(file_path: Path) -> dict:
+    """
+    Return duration (seconds) and which stream types a media file has.
+
+    Uses ffprobe, which only reads container headers. Files whose headers
+    carry no duration (e.g. MediaRecorder webm/ogg) are measured by reading
+    their packets to EOF; a file whose length still cannot be determined
+    raises, so its ingest fails instead of committing nothing.
+    """
+    out = subprocess.run(
+        [
+            "ffprobe", "-v", "error",
+            "-print_format", "json",
+            "-show_format", "-show_streams",
+            str(file_path),
+        ],
+        capture_output=True,
+        check=True,
+    )
+    info = json.loads(out.stdout or b"{}")
+    streams = info.get("streams", [])
+
+    duration = float(info.get("format", {}).get("duration") or 0.0)
+    if not duration:
+        duration = max((float(s.get("duration") or 0.0) for s in streams), default=0.0)
+    if not duration and streams:
+        duration = _packet_duration(file_path)
+        if not duration:
+            raise RuntimeError(f"Cannot determine the duration of {file_path.name}")
+
+    return {
+        "duration": duration,
+        "has_audio": any(s.get("codec_type") == "audio" for s in streams),
+        "has_video": any(s.get("codec_type") == "video" for s in streams),
+    }
+
+
+def _packet_duration(file_path: Path) -> float:
+    """Duration from the last packet timestamp: remuxes to the null muxer, decodes nothing."""
+    out = subprocess.run(
+        [
+            "ffmpeg", "-nostdin", "-v", "error",
+            "-i", str(file_path),
+            "-map", "0", "-c", "copy", "-f", "null", "-",
+            "-progress", "pipe:1",
+        ],
+        capture_output=True,
+        check=True,
+    )
+    out_time_us = 0
+    for line in out.stdout.decode(errors="replace").splitlines():
+        key, _, value = line.partition("=")
+        if key in ("out_time_us", "out_time_ms") and value.strip().isdigit():
+            # out_time_ms is in microseconds too (long-standing ffmpeg quirk)
+            out_time_us = max(out_time_us, int(value))
+    return out_time_us / 1e6
+
+
+def load_pcm(
+    file_path: Path,
+    start: float = 0.0,
+    duration: Optional[float] = None,
+) -> np.ndarray:
+    """
+    Decode [start, start + duration) of a file's audio to 16 kHz mono float32.
+
+    `-ss` is placed before `-i` so ffmpeg seeks in the input instead of
+    decoding and discarding everything before `start`.
+    """
+    cmd = ["ffmpeg", "-nostdin", "-v", "error"]
+    if start:
+        cmd += ["-ss", f"{start:.3f}"]
+    cmd += ["-i", str(file_path)]
+    if duration is not None:
+        cmd += ["-t", f"{duration:.3f}"]
+    cmd += ["-vn", "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "f32le", "-"]
+
+    expected = int((duration or 0) * SAMPLE_RATE * 4)
+    buffer = bytearray()
+    if expected:
+        buffer = bytearray(expected)  # preallocate, trimmed below
+    filled = 0
+
+    # stderr goes to a file: an unread pipe fills up on a chatty decode and
+    # blocks ffmpeg while we are still reading stdout
+    with tempfile.TemporaryFile() as stderr:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr)
+        try:
+            while True:
+                block = proc.stdout.read(_READ_BLOCK)
+                if not block:
+                    break
+                end = filled + len(block)
+                if end > len(buffer):
+                    buffer.extend(b"\0" * (end - len(buffer)))
+                buffer[filled:end] = block
+                filled = end
+            if proc.wait() != 0:
+                stderr.seek(0)
+                raise RuntimeError(f"ffmpeg failed: {stderr.read().decode(errors='replace').strip()}")
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+
+    # Whole samples only; frombuffer shares memory with the bytearray (no copy)
+    filled -= filled % 4
+    return np.frombuffer(memoryview(buffer)[:filled], dtype=np.float32)
+
+
+def split_windows(duration: float, window_sec: float = INGEST_WINDOW_SEC) -> list[tuple[float, float]]:
+    """Split [0, duration) into consecutive windows of at most `window_sec` seconds."""
+    windows = []
+    start = 0.0
+    while start < duration:
+        end = min(duration, start + window_sec)
+        windows.append((start, end))
+        start = end
+    return windows
@@ -0,0 +1,188 @@
+"""Progressive indexing for long-running ingests.
+
+Long audio/video parsers hand over chunk batches (a transcript window, a
+batch of keyframes) as soon as they are ready. Each batch is embedded and
+appended to the evidence table right away with status "partial", so the
+first minutes of a recording are searchable while the rest is processed.
+
+Job lifecycle:
+    start()  →  add(batch)* / checkpoint_window()*  →  commit()   rows flipped to "complete"
+                                                    →  abort()    all rows of the source removed
+
+A job that is interrupted (crash, restart) keeps its checkpoint and can be
+picked up with ProgressiveIndexer.resume(); windows completed before the
+interruption are not processed again. start() and resume() claim the job
+(see ingestion.checkpoint.claim_job) and release() gives it up, so only
+one server worker ever runs a given source.
+
+Batches are embedded on a worker thread and inserted through the single
+LanceDB writer thread (async_db), so the event loop keeps serving queries
+while a batch is embedded and written. commit(),
+abort() and resume() write too; async callers run them with run_write().
+"""
+from pathlib import Path
+from typing import Optional
+from loguru import logger
+import asyncio
+
+from config import INGEST_WINDOW_SEC
+from db import get_db, STATUS_PARTIAL
+from async_db import run_write
+from ingestion.checkpoint import save_checkpoint, load_checkpoint, clear_checkpoint, claim_job, release_job
+from interval_index import save_interval_index, load_interval_entries, delete_interval_index
+from frame_store import delete_source_frames
+
+
+class ProgressiveIndexer:
+    """Streams chunk batches of one source into LanceDB."""
+
+    def __init__(
+        self,
+        source_id: str,
+        original_filename: str,
+        ext: str,
+        file_path: Optional[Path] = None,
+        db=None,
+    ):
+        self.source_id = source_id
+        self.original_filename = original_filename
+        self.ext = ext
+        self.file_path = file_path
+        self.db = db or get_db()
+        self.next_index = 0  # chunk ID counter across batches
+        self.chunks_created = 0
+        self.batches = 0
+        self.resume_window = 0  # first window still to process
+        self.intervals: list[tuple[float, float, str]] = []  # (start, end, chunk_id) of timestamped rows
+        self._claim: Optional[int] = None  # lock fd while this process runs the job
+
+    def _save_checkpoint(self, next_window: int) -> None:
+        save_checkpoint(self.source_id, {
+            "source_id": self.source_id,
+            "original_filename": self.original_filename,
+            "ext": self.ext,
+            "file_path": str(self.file_path) if self.file_path else None,
+            "window_sec": INGEST_WINDOW_SEC,
+            "next_window": next_window,
+            "next_index": self.next_index,
+            "chunks_created": self.chunks_created,
+        })
+
+    def start(self) -> None:
+        """Claim the job and record it so it can be resumed if the process dies."""
+        self._claim = claim_job(self.source_id)
+        self._save_checkpoint(next_window=0)
+
+    def release(self) -> None:
+        """Give up the claim on the job (after commit, abort or cancellation)."""
+        if self._claim is not None:
+            release_job(self.source_id, self._claim)
+            self._claim = None
+
+    @classmethod
+    def resume(cls, source_id: str, db=None) -> Optional["ProgressiveIndexer"]:
+        """
+        Rebuild an interrupted job from its checkpoint.
+
+        Rows written after the last checkpoint (a half-finished window) are
+        removed, since that window will be processed again. Raises
+        JobClaimed if another worker is running the job.
+        """
+        claim = claim_job(source_id)
+        state = load_checkpoint(source_id)
+        if not state or not state.get("file_path") or not Path(state["file_path"]).exists():
+            release_job(source_id, claim)
+            return None
+
+        indexer = cls(
+            state["source_id"],
+            state["original_filename"],
+            state["ext"],
+            file_path=Path(state["file_path"]),
+            db=db,
+        )
+        indexer._claim = claim
+        indexer.resume_window = int(state.get("next_window", 0))
+        indexer.next_index = int(state.get("next_index", 0))
+        indexer.chunks_created = int(state.get("chunks_created", 0))
+
+        try:
+            if state.get("window_sec") != INGEST_WINDOW_SEC:
+                # Window boundaries moved; completed windows no longer line up
+                indexer.resume_window = 0
+            if indexer.resume_window == 0:
+                indexer.db.delete_source(source_id)
+                delete_interval_index(source_id)
+                delete_source_frames(source_id)
+                indexer.next_index = 0
+                indexer.chunks_created = 0
+            else:
+                resume_at = indexer.resume_window * INGEST_WINDOW_SEC
+                indexer.db.delete_source_from(source_id, resume_at)
+                delete_source_frames(source_id, from_time=resume_at)
+                indexer.intervals = [e for e in load_interval_entries(source_id) if e[0] < resume_at]
+        except Exception:
+            indexer.release()
+            raise
+
+        logger.info(
+            f"Resuming source {source_id} at window {indexer.resume_window} "
+            f"({indexer.chunks_created} rows already indexed)"
+        )
+        return indexer
+
+    async def add(self, raw_chunks: list[dict]) -> int:
+        """Embed a batch of parser chunks and append it as partial rows."""
+        from ingestion import build_chunks
+
+        if not raw_chunks:
+            return 0
+
+        # Embedding a batch takes seconds; keep it off the event loop
+        chunks, embeddings = await asyncio.to_thread(
+            build_chunks,
+            raw_chunks,
+            self.source_id,
+            self.original_filename,
+            self.ext,
+            start_index=self.next_index,
+        )
+        self.next_index += len(raw_chunks)
+
+        for chunk in chunks:
+            chunk["status"] = STATUS_PARTIAL
+            if chunk.get("timestamp_start") is not None:
+                start = float(chunk["timestamp_start"])
+                end = chunk.get("timestamp_end")
+                self.intervals.append((start, float(end) if end is not None else start, chunk["chunk_id"]))
+
+        inserted = await run_write(self.db.insert, chunks, embeddings)
+        self.chunks_created += inserted
+        self.batches += 1
+        logger.info(
+            f"Source {self.source_id}: batch {self.batches} indexed "
+            f"({inserted} rows, {self.chunks_created} total)"
+        )
+        return inserted
+
+    async def checkpoint_window(self, window_index: int, window_end: float) -> None:
+        """Called by windowed parsers once every chunk of a window has been added."""
+        save_interval_index(self.source_id, self.intervals)
+        self._save_checkpoint(next_window=window_index + 1)
+        logger.info(f"Source {self.source_id}: checkpoint after window {window_index} ({window_end:.0f}s)")
+
+    def commit(self) -> None:
+        """Mark every row of the source as complete."""
+        if self.intervals:
+            save_interval_index(self.source_id, self.intervals)
+        self.db.mark_source_complete(self.source_id)
+        clear_checkpoint(self.source_id)
+        logger.info(f"Source {self.source_id} committed ({self.chunks_created} rows)")
+
+    def abort(self) -> None:
+        """Remove the partial rows (and their frame images) written so far."""
+        deleted = self.db.delete_source(self.source_id)
+        delete_interval_index(self.source_id)
+        delete_source_frames(self.source_id)
+        clear_checkpoint(self.source_id)
+        logger.warning(f"Source {self.source_id} aborted, removed {deleted} partial rows")
@@ -0,0 +1,93 @@
+"""Persistent cache of raw ASR segments.
+
+Entries are keyed by (audio content hash, ASR backend, model version, decode
+options), so re-ingesting the same podcast or video skips transcription.
+The raw segment list is stored rather than final chunks, which lets
+re-chunking and confidence re-scoring be replayed without re-transcribing:
+
+    segments_to_chunks(load_transcript(key))
+"""
+from pathlib import Path
+from datetime import datetime
+from typing import Optional
+from loguru import logger
+import hashlib
+import json
+import os
+
+from config import TRANSCRIPT_CACHE_DIR, TRANSCRIPT_CACHE_ENABLED
+
+
+def file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Hash a file's bytes in streaming fashion."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def pcm_sha256(samples) -> str:
+    """Hash decoded PCM samples (numpy array)."""
+    return hashlib.sha256(samples.tobytes()).hexdigest()
+
+
+def transcript_cache_key(content_hash: str, backend, **extra) -> str:
+    """
+    Build a cache key from the audio content and everything that changes ASR output.
+
+    `extra` carries caller-specific scope such as the clip range of a video track.
+    """
+    key_parts = {
+        "content": content_hash,
+        "backend": backend.name,
+        "model": backend.model_version,
+        "options": backend.decode_options,
+        "extra": extra,
+    }
+    blob = json.dumps(key_parts, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _entry_path(key: str) -> Path:
+    return TRANSCRIPT_CACHE_DIR / f"{key}.json"
+
+
+def load_transcript(key: str) -> Optional[list[dict]]:
+    """Return cached raw segments for a key, or None on miss."""
+    if not TRANSCRIPT_CACHE_ENABLED:
+        return None
+
+    path = _entry_path(key)
+    if not path.exists():
+        return None
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)["segments"]
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable transcript cache entry {path.name}: {e}")
+        return None
+
+
+def store_transcript(key: str, segments: list[dict], backend) -> None:
+    """Persist raw segments atomically (write to temp file, then rename)."""
+    if not TRANSCRIPT_CACHE_ENABLED:
+        return
+
+    try:
+        TRANSCRIPT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        path = _entry_path(key)
+        tmp_path = path.with_suffix(".tmp")
+        entry = {
+            "backend": backend.name,
+            "model": backend.model_version,
+            "options": backend.decode_options,
+            "created_at": datetime.utcnow().isoformat(),
+            "segments": segments,
+        }
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning(f"Failed to write transcript cache entry: {e}")
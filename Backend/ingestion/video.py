@@ -1,20 +1,22 @@
 _EASYOCR_READER = None
-"""Video parser using MoviePy for frames and Whisper for audio."""
+"""Video parser using OpenCV for frames and Whisper for audio."""
 from pathlib import Path
 from loguru import logger
-import cv2
+import asyncio
+import json
 
 from config import (
-    FRAMES_DIR,
     MAX_VIDEO_DURATION_SEC,
-    VIDEO_FRAME_RATE,
+    VIDEO_HARD_MAX_DURATION_SEC,
     MAX_KEYFRAMES,
-    VIDEO_MAX_WIDTH,
+    VIDEO_FRAME_AUDIO_CONTEXT_SEC,
     VIDEO_OCR_LANGS,
     VIDEO_OCR_USE_GPU,
     VIDEO_OCR_MIN_CONFIDENCE,
+    VIDEO_INDEX_BATCH_FRAMES,
 )
-from ingestion.audio import parse_audio
+from interval_index import IntervalIndex
+from frame_store import save_thumbnail
 
 def _get_easyocr_reader():
     """
@@ -35,105 +37,172 @@ def _get_easyocr_reader():
     return _EASYOCR_READER
 
 
-async def parse_video(file_path: Path, source_id: str) -> list[dict]:
+async def parse_video(
+    file_path: Path,
+    source_id: str,
+    on_chunks=None,
+    on_window=None,
+    start_window: int = 0,
+) -> list[dict]:
     """
     Parse video files.
 
     - Extract audio → transcribe with Whisper
-    - Extract keyframes at intervals
+    - Select scene-change keyframes in one sequential decode pass
     - Run OCR on frames
     - Attach aligned audio transcript to frame windows
+
+    The video is processed in INGEST_WINDOW_SEC windows so memory stays
+    bounded for hour-long recordings. Within a window the audio (ASR) and
+    visual (decode + OCR) branches run concurrently in worker threads;
+    alignment is a join step once both have finished, so wall time is
+    roughly that of the slower branch.
+
+    MAX_VIDEO_DURATION_SEC is a soft budget: longer videos are processed in
+    full, with MAX_KEYFRAMES per budget-length of video. Only
+    VIDEO_HARD_MAX_DURATION_SEC (if set) truncates.
+
+    If `on_chunks` (async callable) is given, each window's transcript and
+    each batch of VIDEO_INDEX_BATCH_FRAMES frames are handed to it as soon as
+    they complete (progressive indexing) instead of being returned. Failures
+    are then re-raised so the caller can abort the job. `on_window(index, end)`
+    is awaited after every window; windows before `start_window` are skipped
+    (resume after a checkpoint).
     """
-    try:
-        from moviepy import VideoFileClip
-    except ImportError:
-        try:
-        # MoviePy v1.x fallback
-            from moviepy.editor import VideoFileClip
-        except Exception:
-          logger.error("MoviePy not installed (or import path changed)")
-          return []
+    from ingestion.media import probe_media, split_windows
+    from ingestion.transcript_cache import file_sha256
 
     chunks = []
 
     try:
         logger.info(f"Processing video: {file_path}")
-        clip = VideoFileClip(str(file_path))
+        media = probe_media(file_path)
+
+        duration = media["duration"]
+        if VIDEO_HARD_MAX_DURATION_SEC and duration > VIDEO_HARD_MAX_DURATION_SEC:
+            logger.warning(f"Video truncated: {duration:.1f}s → {VIDEO_HARD_MAX_DURATION_SEC}s")
+            duration = float(VIDEO_HARD_MAX_DURATION_SEC)
+        elif duration > MAX_VIDEO_DURATION_SEC:
+            logger.warning(
+                f"Video exceeds duration budget ({duration:.1f}s > {MAX_VIDEO_DURATION_SEC}s), "
+                f"processing in full"
+            )
 
-        # Cap duration
-        duration = min(clip.duration, MAX_VIDEO_DURATION_SEC)
-        if clip.duration > MAX_VIDEO_DURATION_SEC:
-            logger.warning(f"Video truncated: {clip.duration:.1f}s → {duration:.1f}s")
+        # Keyframe budget scales with length beyond the duration budget
+        total_budget = MAX_KEYFRAMES * max(1.0, duration / MAX_VIDEO_DURATION_SEC)
+        # Transcript cache key for every window of this file
+        content_hash = file_sha256(file_path) if media["has_audio"] else None
 
-        # 1. Extract and transcribe audio (with timestamps)
-        audio_chunks = await extract_and_transcribe_audio(clip, file_path, duration)
-        chunks.extend(audio_chunks)
+        windows = split_windows(duration)
+        for window_index, (window_start, window_end) in enumerate(windows):
+            if window_index < start_window:
+                continue
 
-        # 2. Extract keyframes, with audio alignment per time window
-        frame_chunks = await extract_keyframes(
-            clip, file_path, source_id, duration, audio_chunks=audio_chunks
-        )
-        chunks.extend(frame_chunks)
+            budget = max(1, round(total_budget * (window_end - window_start) / duration))
+            logger.info(
+                f"Video window {window_index + 1}/{len(windows)}: "
+                f"{window_start:.0f}s-{window_end:.0f}s (keyframe budget {budget})"
+            )
+            window_chunks = await _process_window(
+                file_path, source_id, window_start, window_end, budget,
+                content_hash, on_chunks,
+            )
+            chunks.extend(window_chunks)
 
-        clip.close()
+            if on_window is not None:
+                await on_window(window_index, window_end)
 
-        logger.info(
-            f"Video processed: {len(chunks)} chunks "
-            f"({len(audio_chunks)} audio, {len(frame_chunks)} frame regions)"
-        )
+        logger.info(f"Video processed: {len(windows)} windows, {duration:.1f}s")
         return chunks
 
     except Exception as e:
         logger.error(f"Video processing failed: {e}")
+        if on_chunks is not None:
+            raise
         return []
 
 
-async def extract_and_transcribe_audio(clip, file_path: Path, duration: float) -> list[dict]:
-    """Extract audio track and transcribe."""
-    import tempfile
+async def _process_window(
+    file_path: Path,
+    source_id: str,
+    start: float,
+    end: float,
+    budget: int,
+    content_hash: str | None,
+    on_chunks=None,
+) -> list[dict]:
+    """Run both branches over [start, end), join them, and emit the window's chunks."""
+    chunks = []
+
+    # 1. Start both branches: ASR on one side, decode + OCR on the other
+    audio_task = asyncio.create_task(
+        extract_and_transcribe_audio(file_path, start, end, content_hash)
+    )
+    visual_task = asyncio.create_task(extract_keyframes(file_path, start, end, budget))
+
+    try:
+        audio_chunks = await audio_task
+        # The transcript is searchable while frames are still being processed
+        if on_chunks is not None:
+            await on_chunks(audio_chunks)
+        else:
+            chunks.extend(audio_chunks)
+
+        keyframes = await visual_task
+    finally:
+        if not visual_task.done():
+            visual_task.cancel()
+
+    # 2. Join: align keyframes with the transcript and build frame chunks
+    frame_chunks = []
+    for i, keyframe_chunks in enumerate(
+        align_keyframes(keyframes, source_id, end, audio_chunks), start=1
+    ):
+        frame_chunks.extend(keyframe_chunks)
+        if on_chunks is not None and i % VIDEO_INDEX_BATCH_FRAMES == 0:
+            await on_chunks(frame_chunks)
+            frame_chunks = []
+
+    if on_chunks is not None:
+        if frame_chunks:
+            await on_chunks(frame_chunks)
+    else:
+        chunks.extend(frame_chunks)
+
+    return chunks
+
+
+async def extract_and_transcribe_audio(
+    file_path: Path, start: float, end: float, content_hash: str | None
+) -> list[dict]:
+    """Transcribe [start, end) of the audio track in a worker thread."""
+    return await asyncio.to_thread(_transcribe_audio_track, file_path, start, end, content_hash)
+
+
+def _transcribe_audio_track(
+    file_path: Path, start: float, end: float, content_hash: str | None
+) -> list[dict]:
+    """
+    Transcribe [start, end) of the video's audio track.
+
+    ffmpeg pipes PCM straight into the ASR backend; on a transcript cache hit
+    (keyed by the video file) nothing is decoded at all. `content_hash` is
+    None when the video has no audio track.
+    """
+    from ingestion.audio import transcribe_file, segments_to_chunks
     
-    if clip.audio is None:
+    if content_hash is None:
         logger.info("No audio track in video")
         return []
     
     try:
-        # Export audio to temp file
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-            temp_path = Path(f.name)
-        
-        # Only process up to duration limit
-        audio = clip.audio
-        if hasattr(audio, "subclipped"):
-            audio_clip = audio.subclipped(0, duration)
-        elif hasattr(audio, "subclip"):
-            audio_clip = audio.subclip(0, duration)
-        else:
-            raise RuntimeError("MoviePy audio clip has no subclip/subclipped method")
-        try:
-            audio_clip.write_audiofile(
-                str(temp_path),
-                fps=16000,
-                logger=None,
-            )
-        except TypeError:
-            # MoviePy v1 fallback
-            audio_clip.write_audiofile(
-                str(temp_path),
-                fps=16000,
-                verbose=False,
-                logger=None,
-            )    
-        
-        # Transcribe
-        chunks = await parse_audio(temp_path)
+        segments = transcribe_file(file_path, start=start, end=end, content_hash=content_hash)
+        chunks = segments_to_chunks(segments)
         
         # Update modality
         for chunk in chunks:
             chunk["modality"] = "audio_transcript"
         
-        # Clean up
-        temp_path.unlink(missing_ok=True)
-        
         return chunks
         
     except Exception as e:
@@ -142,137 +211,180 @@ async def extract_and_transcribe_audio(clip, file_path: Path, duration: float) -
 
 
 def _collect_audio_text_for_window(
-    audio_chunks: list[dict] | None, start: float, end: float
+    audio_index: IntervalIndex | None, start: float, end: float
 ) -> str:
     """
     Collect audio transcript text that overlaps the given [start, end] time window.
     """
-    if not audio_chunks:
+    if not audio_index:
         return ""
 
     texts = []
-    for c in audio_chunks:
-        a_start = float(c.get("timestamp_start") or 0.0)
-        a_end = float(c.get("timestamp_end") or a_start)
-        if a_end >= start and a_start <= end:
-            t = c.get("text_content")
-            if t:
-                texts.append(t.strip())
+    for c in audio_index.overlapping(start, end):
+        t = c.get("text_content")
+        if t:
+            texts.append(t.strip())
 
-    return " ".join(texts)        
+    return " ".join(texts)
 
 
 async def extract_keyframes(
-    clip,
-    file_path: Path,
-    source_id: str,
-    duration: float,
-    audio_chunks: list[dict] | None = None,
+    file_path: Path, start: float, end: float, budget: int
 ) -> list[dict]:
-    """Extract keyframes at regular intervals and attach OCR + aligned audio text."""
-    from PIL import Image
-    import numpy as np
-
-    chunks = []
+    """
+    Visual branch: select scene-change keyframes in [start, end) and OCR them,
+    in a worker thread.
+
+    Keyframes are chosen by content (see ingestion.keyframes) with `budget`
+    spread across the whole range. Frames come from
+    one sequential decode pass and are OCR'd in memory; each record keeps a
+    WebP thumbnail so it can be written to FRAMES_DIR later, only if it
+    becomes evidence.
+    """
+    return await asyncio.to_thread(_collect_keyframes, file_path, start, end, budget)
 
-    # Calculate frame times
-    interval = 1 / VIDEO_FRAME_RATE  # e.g., 2 seconds
-    frame_times = []
-    t = 0.0
-    while t < duration and len(frame_times) < MAX_KEYFRAMES:
-        frame_times.append(t)
-        t += interval
 
-    logger.info(f"Extracting {len(frame_times)} frames")
+def _collect_keyframes(file_path: Path, start: float, end: float, budget: int) -> list[dict]:
+    from ingestion.keyframes import iter_keyframes
+    from frame_store import encode_thumbnail
 
-    for i, t in enumerate(frame_times):
+    keyframes = []
+    for keyframe, frame in iter_keyframes(file_path, start, end, budget):
+        t = keyframe["time"]
         try:
-            # Get frame at time t
-            frame = clip.get_frame(t)  # numpy array (H, W, C)
-
-            # Resize if needed
+            # Run OCR on the in-memory frame → regions with bbox + confidence
             h, w = frame.shape[:2]
-            if w > VIDEO_MAX_WIDTH:
-                scale = VIDEO_MAX_WIDTH / w
-                new_w = int(w * scale)
-                new_h = int(h * scale)
-                frame = cv2.resize(frame, (new_w, new_h))
-                h, w = new_h, new_w  # update to resized dims
-
-            # Convert to PIL for saving
-            from PIL import Image  # already imported above, but safe
-            pil_image = Image.fromarray(frame.astype(np.uint8))
-
-            # Save frame
-            frame_filename = f"{source_id}_frame_{i:03d}.jpg"
-            frame_path = FRAMES_DIR / frame_filename
-            pil_image.save(frame_path, quality=85)
-
-            # Run OCR on frame → returns multiple regions with bbox + confidence
-            ocr_regions = await run_frame_ocr(frame_path, width=w, height=h)
-
-            # Collect audio transcript overlapping this frame window
-            window_start = t
-            window_end = t + interval
-            audio_text = _collect_audio_text_for_window(
-                audio_chunks, window_start, window_end
-            )
+            keyframe["ocr_regions"] = run_frame_ocr(frame, width=w, height=h)
 
-            # If no OCR regions, still create a visual-only chunk with audio text (if any)
-            if not ocr_regions:
-                combined_text = audio_text.strip()
-                chunk = {
-                    "image_path": str(frame_path),
-                    "modality": "video_frame",
-                    "timestamp_start": window_start,
-                    "timestamp_end": window_end,
-                }
-                if combined_text:
-                    chunk["text_content"] = combined_text
-                chunks.append(chunk)
-                continue
+            # Only a small thumbnail is kept; full frames are re-rendered on demand
+            keyframe["thumbnail"] = encode_thumbnail(frame)
+        except Exception as e:
+            logger.warning(f"Failed to process frame at {t:.1f}s: {e}")
+            continue
+        keyframes.append(keyframe)
+
+    return keyframes
 
-            # Create a chunk per OCR region, with bbox + confidence + (optional) audio text
-            for region in ocr_regions:
-                region_text = region.get("text", "").strip()
-                if not region_text:
-                    continue
-
-                combined_text_parts = []
-                if audio_text:
-                    combined_text_parts.append(audio_text.strip())
-                combined_text_parts.append(region_text)
-                combined_text = " ".join(combined_text_parts).strip()
-
-                chunk = {
-                    "image_path": str(frame_path),
-                    "modality": "video_frame",
-                    "timestamp_start": window_start,
-                    "timestamp_end": window_end,
-                    "bbox": region.get("bbox"),
-                    "ocr_confidence": region.get("confidence"),
-                }
 
-                if combined_text:
-                    chunk["text_content"] = combined_text
+def align_keyframes(
+    keyframes: list[dict],
+    source_id: str,
+    end: float,
+    audio_chunks: list[dict] | None,
+):
+    """
+    Join step: give each keyframe its span and aligned transcript.
 
-                chunks.append(chunk)
+    A keyframe's span runs up to the next keyframe (or `end`, the end of the
+    window).
+    Yields the chunk list of each keyframe in time order (one chunk per
+    frame, or none if the frame carries no text). The transcript is indexed
+    once per window, so each frame's lookup is a binary search.
+    """
+    audio_index = IntervalIndex.from_chunks(audio_chunks or [])
+    for i, keyframe in enumerate(keyframes):
+        span_end = keyframes[i + 1]["time"] if i + 1 < len(keyframes) else end
+        chunk = _frame_chunk(keyframe, span_end, source_id, audio_index)
+        yield [chunk] if chunk else []
 
-        except Exception as e:
-            logger.warning(f"Failed to extract frame at {t}s: {e}")
-            continue
 
-    return chunks
+def _reading_order(regions: list[dict]) -> list[list[dict]]:
+    """
+    Group OCR regions into text lines, top to bottom, each line left to right.
+
+    Regions whose vertical centers are within half a median region height
+    belong to the same line.
+    """
+    if not regions:
+        return []
+
+    heights = sorted(r["bbox"][3] - r["bbox"][1] for r in regions)
+    tolerance = heights[len(heights) // 2] / 2
+
+    lines: list[list[dict]] = []
+    line_center = None
+    for region in sorted(regions, key=lambda r: (r["bbox"][1] + r["bbox"][3]) / 2):
+        center = (region["bbox"][1] + region["bbox"][3]) / 2
+        if line_center is None or center - line_center > tolerance:
+            lines.append([])
+            line_center = center
+        lines[-1].append(region)
 
+    return [sorted(line, key=lambda r: r["bbox"][0]) for line in lines]
 
-async def run_frame_ocr(frame_path: Path, width: int, height: int) -> list[dict]:
+
+def _frame_chunk(
+    keyframe: dict,
+    span_end: float,
+    source_id: str,
+    audio_index: IntervalIndex | None,
+) -> dict | None:
+    """
+    Build the single evidence record for one keyframe whose span is now known.
+
+    All OCR text goes into text_content in reading order; the individual
+    regions (text, bbox, confidence) are kept as JSON in `ocr_regions` so
+    citations can still point at one region. The overlapping transcript is
+    stored once in `audio_context`. bbox is the union of all regions and
+    ocr_confidence their mean.
+
+    The frame thumbnail is saved only if the record carries text, since
+    text-less chunks are never indexed (see frame_store).
+    """
+    window_start = keyframe["time"]
+    window_end = span_end
+
+    # Collect audio transcript overlapping this keyframe's span
+    audio_text = _collect_audio_text_for_window(
+        audio_index,
+        window_start,
+        min(window_end, window_start + VIDEO_FRAME_AUDIO_CONTEXT_SEC),
+    ).strip()
+
+    regions = [r for r in keyframe["ocr_regions"] if r.get("text", "").strip()]
+    lines = _reading_order(regions)
+    ordered = [region for line in lines for region in line]
+    ocr_text = "\n".join(" ".join(r["text"].strip() for r in line) for line in lines)
+
+    text_content = "\n\n".join(p for p in (ocr_text, audio_text) if p)
+    if not text_content:
+        return None
+
+    frame_path = save_thumbnail(source_id, window_start, keyframe["thumbnail"])
+
+    chunk = {
+        "image_path": str(frame_path),
+        "modality": "video_frame",
+        "timestamp_start": window_start,
+        "timestamp_end": window_end,
+        "text_content": text_content,
+        "audio_context": audio_text or None,
+    }
+
+    if ordered:
+        chunk["ocr_regions"] = json.dumps([
+            {"text": r["text"].strip(), "bbox": r["bbox"], "confidence": r["confidence"]}
+            for r in ordered
+        ])
+        chunk["bbox"] = [
+            min(r["bbox"][0] for r in ordered),
+            min(r["bbox"][1] for r in ordered),
+            max(r["bbox"][2] for r in ordered),
+            max(r["bbox"][3] for r in ordered),
+        ]
+        chunk["ocr_confidence"] = sum(r["confidence"] for r in ordered) / len(ordered)
+
+    return chunk
+
+
+def run_frame_ocr(frame, width: int, height: int) -> list[dict]:
     """
-    Run OCR on a video frame and return region-level results with
-    normalized bounding boxes and confidence.
+    Run OCR on a video frame (RGB numpy array or image path) and return
+    region-level results with normalized bounding boxes and confidence.
     """
     try:
         reader = _get_easyocr_reader()
-        results = reader.readtext(str(frame_path))
+        results = reader.readtext(str(frame) if isinstance(frame, Path) else frame)
 
         ocr_results: list[dict] = []
         for bbox, text, confidence in results:
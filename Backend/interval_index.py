@@ -0,0 +1,138 @@
+"""Sorted interval index over timestamped evidence.
+
+Audio transcript chunks and video frames carry [timestamp_start,
+timestamp_end] spans. The index keeps one source's spans sorted by start
+together with a running maximum of the ends, so "which chunks overlap
+[t0, t1]?" is answered by a binary search plus a short backward walk
+instead of a scan over every chunk:
+
+    i = bisect_right(starts, t1)       # spans starting after t1 cannot overlap
+    walk back from i - 1 while max_end[j] >= t0
+
+One index per source is built while the source is ingested and persisted
+as JSON in INTERVAL_INDEX_DIR; retrieval uses it to find the transcript and
+frames co-occurring with a hit without filter scans over the table.
+"""
+from bisect import bisect_right
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Optional
+from loguru import logger
+import json
+import os
+import threading
+
+from config import INTERVAL_INDEX_DIR
+
+_CACHE_SIZE = 64  # loaded per-source indexes kept in memory
+_CACHE: "OrderedDict[str, IntervalIndex]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()  # readers, ingest and deletes run on different threads
+_generation = 0  # bumped by every save/delete; a load that overlapped one is not cached
+
+
+class IntervalIndex:
+    """Immutable overlap index over (start, end, payload) entries."""
+
+    def __init__(self, entries: Iterable[tuple[float, float, object]] = ()):
+        self.entries = sorted(entries, key=lambda e: (e[0], e[1]))
+        self.starts = [e[0] for e in self.entries]
+        self.max_end = []
+        running = float("-inf")
+        for _, end, _ in self.entries:
+            running = max(running, end)
+            self.max_end.append(running)
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[dict], payload_key: Optional[str] = None) -> "IntervalIndex":
+        """
+        Index timestamped chunks; chunks without a timestamp are skipped.
+
+        The payload is the chunk itself, or `chunk[payload_key]` if given.
+        """
+        entries = []
+        for c in chunks:
+            if c.get("timestamp_start") is None:
+                continue
+            start = float(c["timestamp_start"])
+            end = float(c.get("timestamp_end") if c.get("timestamp_end") is not None else start)
+            entries.append((start, end, c[payload_key] if payload_key else c))
+        return cls(entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def overlapping(self, start: float, end: float) -> list:
+        """Payloads of all entries with entry_start <= end and entry_end >= start, in time order."""
+        hits = []
+        i = bisect_right(self.starts, end) - 1
+        while i >= 0 and self.max_end[i] >= start:
+            s, e, payload = self.entries[i]
+            if e >= start:
+                hits.append(payload)
+            i -= 1
+        hits.reverse()
+        return hits
+
+
+# === Persistence (one index per source) ===
+
+def _index_path(source_id: str) -> Path:
+    return INTERVAL_INDEX_DIR / f"{source_id}.json"
+
+
+def save_interval_index(source_id: str, entries: list[tuple[float, float, str]]) -> None:
+    """Persist a source's (start, end, chunk_id) entries atomically."""
+    INTERVAL_INDEX_DIR.mkdir(parents=True, exist_ok=True)
+    path = _index_path(source_id)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump([list(e) for e in entries], f)
+    os.replace(tmp_path, path)
+    _forget(source_id)
+
+
+def _forget(source_id: str) -> None:
+    global _generation
+    with _CACHE_LOCK:
+        _CACHE.pop(source_id, None)
+        _generation += 1
+
+
+def load_interval_entries(source_id: str) -> list[tuple[float, float, str]]:
+    """Raw (start, end, chunk_id) entries of a source, [] if it has no index."""
+    path = _index_path(source_id)
+    if not path.exists():
+        return []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return [(float(s), float(e), cid) for s, e, cid in json.load(f)]
+    except Exception as e:
+        logger.warning(f"Unreadable interval index for {source_id}: {e}")
+        return []
+
+
+def get_interval_index(source_id: str) -> Optional[IntervalIndex]:
+    """Load (LRU-cached) the chunk_id interval index of a source, None if it has none."""
+    with _CACHE_LOCK:
+        index = _CACHE.get(source_id)
+        if index is not None:
+            _CACHE.move_to_end(source_id)
+            return index
+        generation = _generation
+
+    # Read and build outside the lock
+    entries = load_interval_entries(source_id)
+    if not entries:
+        return None
+    index = IntervalIndex(entries)
+    with _CACHE_LOCK:
+        if _generation == generation:
+            _CACHE[source_id] = index
+            if len(_CACHE) > _CACHE_SIZE:
+                _CACHE.popitem(last=False)
+    return index
+
+
+def delete_interval_index(source_id: str) -> None:
+    _index_path(source_id).unlink(missing_ok=True)
+    _forget(source_id)
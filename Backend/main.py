@@ -2,35 +2,72 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
 from pathlib import Path
 from loguru import logger
 from typing import Optional
 from datetime import datetime
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from routes import router as auth_router
+import asyncio
 import uuid
 import sys
 
-from config import DATA_DIR, FRAMES_DIR, OPENROUTER_API_KEY
+from config import DATA_DIR, FRAMES_DIR, OPENROUTER_API_KEY, INGEST_AUTO_RESUME
 from models import (
     QueryRequest, QueryResponse, 
     IngestResponse, EvidenceResponse,
-    Citation
+    Citation, EmbeddingMigrationRequest
 )
 from db import get_db
+from async_db import get_async_db, run_read, run_write, shutdown_async_db
 from llm import get_llm
-from embedder import get_embedder
+from embedder import get_query_batcher
 
 # Configure logging
 logger.remove()
 logger.add(sys.stderr, level="INFO")
 
+# Sources with an ingest job running in this process
+_ACTIVE_INGESTS: set[str] = set()
+# Strong references to fire-and-forget tasks
+_BACKGROUND_TASKS: set[asyncio.Task] = set()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup/shutdown hooks."""
+    from warmup import warm_up
+    from maintenance import maintenance_loop
+    
+    # Open the index once, off the event loop, before anything else uses it
+    await asyncio.to_thread(get_async_db)
+    
+    # Models load in the background; /ready reports when they are done
+    warmup_task = asyncio.create_task(warm_up())
+    _BACKGROUND_TASKS.add(warmup_task)
+    warmup_task.add_done_callback(_BACKGROUND_TASKS.discard)
+    
+    # Compaction, version cleanup and index updates when idle or fragmented
+    maintenance_task = asyncio.create_task(maintenance_loop())
+    
+    if INGEST_AUTO_RESUME:
+        _resume_pending_ingests()
+    yield
+    maintenance_task.cancel()
+    # Queued writes (ingest batches, orphan deletes) finish before exit
+    shutdown_async_db()
+    from embed_pool import shutdown_embed_pool
+    shutdown_embed_pool()
+
+
 # Create app
 app = FastAPI(
     title="CHAKRAVYUH",
     description="Multimodal RAG with Universal Evidence Citing",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS
@@ -65,9 +102,14 @@ async def root():
         "description": "Multimodal RAG with Universal Evidence Citing",
         "endpoints": {
             "health": "/health",
+            "ready": "/ready",
+            "stats": "/stats",
             "ingest": "POST /ingest",
+            "resume_ingest": "POST /ingest/{source_id}/resume",
             "query": "POST /query",
             "evidence": "GET /evidence/{chunk_id}",
+            "evidence_frame": "GET /evidence/{chunk_id}/frame",
+            "embedding_migration": "POST/GET /embedding/migrate",
             "export": "POST /export/obsidian",
             "docs": "/docs"
         }
@@ -79,7 +121,7 @@ async def root():
 @app.get("/health")
 async def health():
     """Health check endpoint."""
-    db = get_db()
+    db = get_async_db().client
     
     # Check OpenRouter
     llm_ok = OPENROUTER_API_KEY is not None and len(OPENROUTER_API_KEY) > 10
@@ -87,61 +129,188 @@ async def health():
     return {
         "status": "ok",
         "db_rows": db.count(),
+        "ann_indexed": db.ann_indexed,
         "openrouter_configured": llm_ok,
     }
 
 
+@app.get("/ready")
+async def ready():
+    """Readiness: per-model warm-up state and load time (503 until all are ready)."""
+    from warmup import readiness
+    
+    is_ready, models = readiness()
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={"ready": is_ready, "models": models},
+    )
+
+
+@app.get("/stats")
+async def stats():
+    """Corpus counts by modality/source type, storage fragments and versions, indexes and the last maintenance run."""
+    from maintenance import table_stats, last_run
+    
+    db = get_async_db().client
+    storage = await run_read(table_stats, db.table)
+    index_stats = await get_async_db().index_stats()
+    return {
+        "table": db.table_name,
+        "rows": db.count(),
+        "corpus": db.stats.snapshot(),
+        **storage,
+        "indexes": index_stats,
+        "maintenance": last_run(),
+    }
+
+
+@app.get("/stats/sources/{source_id}")
+async def source_stats(source_id: str):
+    """Exact row/byte counts of one source, by modality."""
+    source = get_async_db().client.stats.source(source_id)
+    if source is None:
+        raise HTTPException(status_code=404, detail="Source not found")
+    return {"source_id": source_id, **source}
+
+
 # === Ingest ===
 
+async def _run_ingest(indexer) -> set[str]:
+    """
+    Run (or resume) an ingest job to completion.
+
+    A failing job is aborted: its partial rows and the uploaded file are
+    removed. A cancelled job (server shutdown) keeps its checkpoint so it
+    can be resumed. The job's claim is released either way.
+    """
+    from ingestion import ingest_file
+    
+    _ACTIVE_INGESTS.add(indexer.source_id)
+    try:
+        _, modalities = await ingest_file(
+            indexer.file_path, indexer.source_id, indexer.original_filename, indexer=indexer
+        )
+        await run_write(indexer.commit)
+        return modalities
+    except Exception as e:
+        logger.error(f"Ingestion failed: {e!r}")
+        # Remove partial rows and the failed file
+        await run_write(indexer.abort)
+        if indexer.file_path.exists():
+            indexer.file_path.unlink()
+        raise
+    finally:
+        indexer.release()
+        _ACTIVE_INGESTS.discard(indexer.source_id)
+
+
+def _resume_pending_ingests():
+    """Restart jobs interrupted by a crash or restart, in the background."""
+    from ingestion.checkpoint import pending_checkpoints, JobClaimed
+    from ingestion.progressive import ProgressiveIndexer
+    
+    async def _resume(source_id: str):
+        # resume() deletes the unfinished window's rows: a write
+        try:
+            indexer = await run_write(ProgressiveIndexer.resume, source_id)
+        except JobClaimed:
+            logger.info(f"Ingest {source_id} is resumed by another worker")
+            return
+        if indexer is None:
+            logger.warning(f"Cannot resume ingest {source_id}: upload missing")
+            return
+        try:
+            await _run_ingest(indexer)
+        except Exception:
+            pass  # already logged and aborted
+    
+    for state in pending_checkpoints():
+        task = asyncio.create_task(_resume(state["source_id"]))
+        _BACKGROUND_TASKS.add(task)
+        task.add_done_callback(_BACKGROUND_TASKS.discard)
+
+
 @app.post("/ingest", response_model=IngestResponse)
 async def ingest(file: UploadFile = File(...)):
     """Ingest a document, image, audio, or video file."""
     # Import here to avoid circular imports
-    from ingestion import ingest_file
+    from ingestion import VIDEO_EXTENSIONS
+    from ingestion.progressive import ProgressiveIndexer
+    from config import MAX_VIDEO_SIZE_MB, VIDEO_HARD_MAX_SIZE_MB
     
     # Generate source ID
     source_id = str(uuid.uuid4())[:8]
     
-    # Save uploaded file
+    # Save uploaded file, streaming to disk so large videos never sit in memory
     file_ext = Path(file.filename).suffix.lower()
     save_path = DATA_DIR / f"{source_id}{file_ext}"
+    is_video = file_ext in VIDEO_EXTENSIONS
     
-    content = await file.read()
-    
-    # Check file size for videos
-    if file_ext in [".mp4", ".mkv", ".avi", ".mov", ".webm"]:
-        from config import MAX_VIDEO_SIZE_MB
-        size_mb = len(content) / (1024 * 1024)
-        if size_mb > MAX_VIDEO_SIZE_MB:
-            raise HTTPException(
-                status_code=413,
-                detail=f"Video file too large: {size_mb:.1f}MB (max {MAX_VIDEO_SIZE_MB}MB)"
-            )
-    
+    size = 0
     with open(save_path, "wb") as f:
-        f.write(content)
+        while block := await file.read(1 << 20):
+            size += len(block)
+            # Only the (optional) hard limit rejects; MAX_VIDEO_SIZE_MB is a soft budget
+            if is_video and VIDEO_HARD_MAX_SIZE_MB and size > VIDEO_HARD_MAX_SIZE_MB * 1024 * 1024:
+                f.close()
+                save_path.unlink(missing_ok=True)
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Video file too large (max {VIDEO_HARD_MAX_SIZE_MB}MB)"
+                )
+            f.write(block)
+    
+    size_mb = size / (1024 * 1024)
+    if is_video and size_mb > MAX_VIDEO_SIZE_MB:
+        logger.warning(
+            f"Video exceeds size budget ({size_mb:.1f}MB > {MAX_VIDEO_SIZE_MB}MB), processing in windows"
+        )
     
     logger.info(f"Saved file: {save_path}")
     
-    # Process file
+    # Process file, indexing batches progressively as parsers complete them
+    indexer = ProgressiveIndexer(source_id, file.filename, file_ext, file_path=save_path)
+    indexer.start()
     try:
-        chunks, modalities = await ingest_file(save_path, source_id, file.filename)
+        modalities = await _run_ingest(indexer)
     except Exception as e:
-        logger.error(f"Ingestion failed: {e}")
-        # Cleanup failed file
-        if save_path.exists():
-            save_path.unlink()
         raise HTTPException(status_code=500, detail=str(e))
     
-    # Store in LanceDB
-    db = get_db()
-    db.insert(chunks)
-    
     return IngestResponse(
         status="success",
         source_id=source_id,
         filename=file.filename,
-        chunks_created=len(chunks),
+        chunks_created=indexer.chunks_created,
+        modalities=list(modalities)
+    )
+
+
+@app.post("/ingest/{source_id}/resume", response_model=IngestResponse)
+async def resume_ingest(source_id: str):
+    """Resume an interrupted ingest from its last checkpoint."""
+    from ingestion.checkpoint import JobClaimed
+    from ingestion.progressive import ProgressiveIndexer
+    
+    if source_id in _ACTIVE_INGESTS:
+        raise HTTPException(status_code=409, detail="Ingest already running")
+    
+    try:
+        indexer = await run_write(ProgressiveIndexer.resume, source_id)
+    except JobClaimed:
+        raise HTTPException(status_code=409, detail="Ingest already running")
+    if indexer is None:
+        raise HTTPException(status_code=404, detail="No resumable ingest for this source")
+    
+    try:
+        modalities = await _run_ingest(indexer)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return IngestResponse(
+        status="success",
+        source_id=source_id,
+        filename=indexer.original_filename,
+        chunks_created=indexer.chunks_created,
         modalities=list(modalities)
     )
 
@@ -151,7 +320,7 @@ async def ingest(file: UploadFile = File(...)):
 @app.post("/query", response_model=QueryResponse)
 async def query(request: QueryRequest):
     """Query the knowledge base with two-layer retrieval."""
-    from retrieval import retrieve
+    from retrieval import retrieve, parse_regions, best_region
     from reasoning import calculate_uncertainty, should_refuse, get_refusal_reason
     
     llm = get_llm()
@@ -159,11 +328,21 @@ async def query(request: QueryRequest):
     # Two-layer retrieval:
     # Layer 1: Vector similarity search
     # Layer 2: Modality + confidence re-ranking
-    results = retrieve(
+    # Concurrent queries share one batched encode
+    query_embedding = await get_query_batcher().embed(request.query)
+    
+    # Search and rerank on the read pool; never waits for a running insert
+    results = await run_read(
+        retrieve,
         request.query,
+        query_embedding=query_embedding,
         limit=request.max_results,
         modalities=request.modalities,
-        rerank=True  # Enable modality-aware re-ranking
+        rerank=True,  # Enable modality-aware re-ranking
+        include_cooccurring=request.include_cooccurring,
+        nprobes=request.nprobes,
+        refine_factor=request.refine_factor,
+        include_vectors=True,  # modality agreement in calculate_uncertainty
     )
     
     if not results:
@@ -214,6 +393,12 @@ async def query(request: QueryRequest):
         meta_str = ", ".join(meta)
         text = r.get("text_content", "")[:500]
         context_parts.append(f"[{i+1}] ({meta_str}): {text}")
+        
+        # Transcript/frames from the same moment, when requested
+        for c in r.get("cooccurring", []):
+            c_ts = f"{c['timestamp_start']:.1f}s" if c.get("timestamp_start") is not None else ""
+            c_text = (c.get("text_content") or "")[:200]
+            context_parts.append(f"    [{i+1}, same moment] ({c.get('modality')}, {c_ts}): {c_text}")
 
     context = "\n\n".join(context_parts)
     
@@ -238,6 +423,13 @@ async def query(request: QueryRequest):
             location["line_start"] = r["line_start"]
             location["line_end"] = r.get("line_end")
         
+        # Video frames: point at the OCR region that matches the query
+        regions = parse_regions(r)
+        region_idx = best_region(regions, request.query)
+        if region_idx is not None:
+            location["region_index"] = region_idx
+            location["bbox"] = regions[region_idx]["bbox"]
+        
         # Check if this chunk has conflicts
         conflict_ids = []
         for c in conflicts:
@@ -254,7 +446,8 @@ async def query(request: QueryRequest):
             location=location,
             text_snippet=r.get("text_content", "")[:200],
             confidence=r.get("similarity", 0.5),  # Use pre-computed similarity
-            conflicts_with=conflict_ids
+            conflicts_with=conflict_ids,
+            cooccurring=[c.get("chunk_id", "") for c in r.get("cooccurring", [])],
         ))
     
     
@@ -273,10 +466,11 @@ async def query(request: QueryRequest):
 # === Evidence ===
 
 @app.get("/evidence/{chunk_id}", response_model=EvidenceResponse)
-async def get_evidence(chunk_id: str):
-    """Get raw evidence for a chunk."""
-    db = get_db()
-    chunk = db.get_by_id(chunk_id)
+async def get_evidence(chunk_id: str, region: Optional[int] = None):
+    """Get raw evidence for a chunk (optionally focused on one OCR region of a frame)."""
+    from retrieval import parse_regions
+    
+    chunk = await get_async_db().get_by_id(chunk_id)
     
     if not chunk:
         raise HTTPException(status_code=404, detail="Evidence not found")
@@ -291,9 +485,19 @@ async def get_evidence(chunk_id: str):
     if chunk.get("bbox"):
         location["bbox"] = chunk["bbox"]
     
+    regions = parse_regions(chunk)
+    if region is not None:
+        if not 0 <= region < len(regions):
+            raise HTTPException(status_code=404, detail="Region not found")
+        location["region_index"] = region
+        location["bbox"] = regions[region]["bbox"]
+    
     # Determine content URL
+    full_frame_url = None
     if chunk.get("image_path"):
         content_url = f"/frames/{Path(chunk['image_path']).name}"
+        if chunk.get("modality") == "video_frame" and chunk["image_path"].endswith(".webp"):
+            full_frame_url = f"/evidence/{chunk_id}/frame"
     else:
         # For documents, point to the source file
         content_url = f"/files/{chunk.get('source_id', '')}{Path(chunk.get('source_file', '')).suffix}"
@@ -304,10 +508,68 @@ async def get_evidence(chunk_id: str):
         modality=chunk.get("modality", "unknown"),
         content_url=content_url,
         location=location,
-        text_content=chunk.get("text_content")
+        text_content=chunk.get("text_content"),
+        regions=regions or None,
+        full_frame_url=full_frame_url,
     )
 
 
+@app.get("/evidence/{chunk_id}/frame")
+async def get_evidence_frame(chunk_id: str):
+    """Full-resolution video frame of an evidence chunk, rendered from the source video on first request."""
+    from frame_store import get_full_frame
+    
+    chunk = await get_async_db().get_by_id(chunk_id)
+    
+    if not chunk or chunk.get("modality") != "video_frame" or chunk.get("timestamp_start") is None:
+        raise HTTPException(status_code=404, detail="Frame not found")
+    
+    try:
+        path = await asyncio.to_thread(get_full_frame, chunk["source_id"], chunk["timestamp_start"])
+    except Exception as e:
+        logger.error(f"Frame rendering failed for {chunk_id}: {e}")
+        raise HTTPException(status_code=500, detail="Frame rendering failed")
+    
+    if path is None:
+        raise HTTPException(status_code=404, detail="Source video no longer available")
+    
+    return FileResponse(path, media_type="image/jpeg")
+
+
+# === Embedding model migration ===
+
+@app.post("/embedding/migrate", status_code=202)
+async def start_embedding_migration(request: EmbeddingMigrationRequest):
+    """Re-embed the index with another model in a shadow table; queries switch over when it is done."""
+    from embedding_migration import start_migration
+    
+    db = get_db()
+    if request.model == db.model:
+        raise HTTPException(status_code=400, detail=f"{request.model} is already the active model")
+    
+    migration = start_migration(request.model, request.backend)
+    if migration is None:
+        raise HTTPException(status_code=409, detail="An embedding migration is already running")
+    
+    task = asyncio.create_task(asyncio.to_thread(migration.run))
+    _BACKGROUND_TASKS.add(task)
+    task.add_done_callback(_BACKGROUND_TASKS.discard)
+    return migration.progress()
+
+
+@app.get("/embedding/migrate")
+async def embedding_migration_status():
+    """Active embedding model and progress of the last migration."""
+    from embedding_migration import get_migration
+    
+    db = get_db()
+    migration = get_migration()
+    return {
+        "active": {"model": db.model, "dim": db.dim, "table": db.table_name},
+        "migration": migration.progress() if migration else None,
+    }
+
+
 # === Export ===
 
 from fastapi.responses import Response
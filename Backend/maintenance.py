@@ -0,0 +1,131 @@
+"""Background maintenance of the evidence table.
+
+Every insert commits at least one new fragment, and every delete or
+status update leaves deletion files and another table version. Without
+maintenance a long-running install ends up with thousands of small
+fragments, and search slows down as it opens them all.
+
+The lifespan hook starts maintenance_loop(). Every MAINTENANCE_CHECK_SEC
+it reads the fragment statistics and runs maintenance when:
+
+- the table has MAINTENANCE_MAX_FRAGMENTS fragments or more, even while
+  busy, or
+- nothing was searched or written for MAINTENANCE_IDLE_SEC and there is
+  work to do: several small fragments or deleted rows
+
+and the table changed since the last run. optimize() leaves deletions
+below its threshold in place and cannot merge fragments that are already
+large, so the same statistics can persist after a run; rerunning on an
+unchanged table would repeat that work every check.
+
+A run brings the scalar and ANN indexes up to date (indexes.update_indexes,
+which decides about retraining), then compacts the fragments with
+table.optimize(). The same call folds any remaining rows into the indexes
+and removes versions older than MAINTENANCE_RETAIN_VERSIONS_HOURS.
+
+GET /stats reports the fragment and version counts and the last run.
+"""
+from datetime import timedelta
+from typing import Optional
+from loguru import logger
+import asyncio
+import time
+
+from config import (
+    MAINTENANCE_CHECK_SEC,
+    MAINTENANCE_IDLE_SEC,
+    MAINTENANCE_MAX_FRAGMENTS,
+    MAINTENANCE_SMALL_FRAGMENT_ROWS,
+    MAINTENANCE_RETAIN_VERSIONS_HOURS,
+)
+import indexes
+
+# Summary of the last maintenance run (see run_maintenance)
+_LAST_RUN: Optional[dict] = None
+
+
+def table_stats(table) -> dict:
+    """Fragment, deleted-row and version counts of a LanceDB table."""
+    if table is None:
+        return {"fragments": 0, "small_fragments": 0, "deleted_rows": 0, "versions": 0, "version": None}
+
+    fragments = table.to_lance().get_fragments()
+    small = deleted = 0
+    for fragment in fragments:
+        meta = fragment.metadata
+        if meta.physical_rows < MAINTENANCE_SMALL_FRAGMENT_ROWS:
+            small += 1
+        if meta.deletion_file is not None:
+            deleted += meta.deletion_file.num_deleted_rows
+    return {
+        "fragments": len(fragments),
+        "small_fragments": small,
+        "deleted_rows": deleted,
+        "versions": len(table.list_versions()),
+        "version": table.version,
+    }
+
+
+def maintenance_reason(stats: dict, idle_sec: float, last: Optional[dict] = None) -> Optional[str]:
+    """Why the table should be maintained now, or None (`last`: the previous run)."""
+    if last and last.get("after") and last["after"]["version"] == stats["version"]:
+        return None  # nothing written since the last run
+    if stats["fragments"] >= MAINTENANCE_MAX_FRAGMENTS:
+        return "fragments"
+    if idle_sec >= MAINTENANCE_IDLE_SEC and (stats["small_fragments"] >= 2 or stats["deleted_rows"] > 0):
+        return "idle"
+    return None
+
+
+def run_maintenance(db, reason: str = "manual") -> dict:
+    """Update indexes, compact and clean up the active table (blocking)."""
+    global _LAST_RUN
+    t0 = time.perf_counter()
+    run = {"reason": reason, "started_at": time.time(), "duration_sec": None, "error": None}
+
+    with db.maintenance_lock:
+        table = db.table
+        if table is None:
+            return run
+        before = table_stats(table)
+        try:
+            indexes.update_indexes(table, db.dim)
+            table.optimize(cleanup_older_than=timedelta(hours=MAINTENANCE_RETAIN_VERSIONS_HOURS))
+            db.ann_indexed = indexes.index_state(table) is not None
+        except Exception as e:
+            run["error"] = str(e)
+            logger.error(f"Table maintenance failed: {e}")
+        after = table_stats(table)
+
+    run["duration_sec"] = round(time.perf_counter() - t0, 2)
+    run["before"] = before
+    run["after"] = after
+    logger.info(
+        f"Table maintenance ({reason}) in {run['duration_sec']}s: "
+        f"fragments {before['fragments']} -> {after['fragments']}, "
+        f"versions {before['versions']} -> {after['versions']}"
+    )
+    _LAST_RUN = run
+    return run
+
+
+def last_run() -> Optional[dict]:
+    return _LAST_RUN
+
+
+async def maintenance_loop() -> None:
+    """Check the active table every MAINTENANCE_CHECK_SEC and maintain it when due."""
+    from db import get_db
+
+    if MAINTENANCE_CHECK_SEC <= 0:
+        return
+    while True:
+        await asyncio.sleep(MAINTENANCE_CHECK_SEC)
+        try:
+            db = get_db()
+            stats = await asyncio.to_thread(table_stats, db.table)
+            reason = maintenance_reason(stats, time.monotonic() - db.last_activity, _LAST_RUN)
+            if reason:
+                await asyncio.to_thread(run_maintenance, db, reason)
+        except Exception as e:
+            logger.error(f"Maintenance check failed: {e}")
@@ -28,11 +28,16 @@ class EvidenceChunk(BaseModel):
     timestamp_start: Optional[float] = None     # Audio, Video (seconds)
     timestamp_end: Optional[float] = None
     bbox: Optional[list[float]] = None          # [x1, y1, x2, y2] normalized 0-1
+    ocr_regions: Optional[str] = None           # Video frame: JSON [{text, bbox, confidence}] in reading order
+    audio_context: Optional[str] = None         # Video frame: transcript overlapping the frame span
     
     # Confidence from extraction
     ocr_confidence: Optional[float] = None      # EasyOCR confidence
     asr_confidence: Optional[float] = None      # Whisper avg_logprob converted
     
+    # Ingestion lifecycle
+    status: Optional[str] = None                # partial (progressive ingest running) | complete
+    
     # Will be set after embedding
     text_embedding: Optional[list[float]] = None
     image_embedding: Optional[list[float]] = None
@@ -59,6 +64,15 @@ class QueryRequest(BaseModel):
     query: str
     modalities: Optional[list[str]] = None  # Filter by modality
     max_results: int = 5
+    include_cooccurring: bool = False  # Attach transcript/frames from the same moment to A/V hits
+    nprobes: Optional[int] = None        # ANN partitions searched (default ANN_NPROBES)
+    refine_factor: Optional[int] = None  # ANN candidates re-ranked exactly, x limit (default ANN_REFINE_FACTOR)
+
+
+class EmbeddingMigrationRequest(BaseModel):
+    """Start re-embedding the index with another text embedding model."""
+    model: str                      # sentence-transformers model name
+    backend: Optional[str] = None   # torch / onnx (default: TEXT_EMBEDDING_BACKEND)
 
 
 class Citation(BaseModel):
@@ -71,6 +85,7 @@ class Citation(BaseModel):
     text_snippet: str
     confidence: float
     conflicts_with: list[str] = []
+    cooccurring: list[str] = []  # chunk IDs of transcript/frames overlapping this hit in time
 
 
 class QueryResponse(BaseModel):
@@ -91,9 +106,11 @@ class EvidenceResponse(BaseModel):
     chunk_id: str
     source_file: str
     modality: str
-    content_url: str  # URL to fetch the actual file
+    content_url: str  # URL to fetch the actual file (thumbnail for video frames)
+    full_frame_url: Optional[str] = None  # Video frames: full-resolution frame, rendered on demand
     location: dict
     text_content: Optional[str] = None
+    regions: Optional[list[dict]] = None  # Video frame OCR regions in reading order
 
 
 class ConflictResponse(BaseModel):
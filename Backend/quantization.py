@@ -0,0 +1,149 @@
+"""Quantized copies of text embeddings for a cheap first-pass search.
+
+With VECTOR_QUANTIZATION set, every row also stores a compact code of its
+normalized embedding in `text_embedding_q`:
+
+- int8:   float32 scale + dim x int8 (per-vector max-abs scaling), 388 bytes for 384-d
+- binary: sign bits packed into dim / 8 bytes, compared by Hamming distance
+
+The codes of the whole table live in memory in a QuantizedIndex (about 4x
+or 32x smaller than the float32 vectors). A query scans the codes, keeps
+limit * VECTOR_RESCORE_FACTOR candidates, and only those rows' full
+float32 vectors are read to rescore them exactly. Recall against exact
+search is measured by benchmarks/bench_quantization.py.
+"""
+from typing import Optional
+import numpy as np
+
+from config import TEXT_EMBEDDING_DIM
+
+QUANT_NONE = "none"
+QUANT_INT8 = "int8"
+QUANT_BINARY = "binary"
+
+_SCAN_BLOCK = 65536  # rows converted to float32 at a time when scoring int8 codes
+
+
+def code_size(mode: str, dim: int = TEXT_EMBEDDING_DIM) -> int:
+    if mode == QUANT_INT8:
+        return 4 + dim
+    if mode == QUANT_BINARY:
+        return (dim + 7) // 8
+    raise ValueError(f"Unknown quantization mode: {mode!r}")
+
+
+def quantize(embeddings: np.ndarray, mode: str) -> np.ndarray:
+    """Encode an (n, dim) float32 matrix into an (n, code_size) uint8 matrix."""
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if mode == QUANT_INT8:
+        max_abs = np.abs(embeddings).max(axis=1, keepdims=True)
+        scale = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+        q = np.clip(np.rint(embeddings / scale), -127, 127).astype(np.int8)
+        return np.hstack([scale.view(np.uint8), q.view(np.uint8)])
+    if mode == QUANT_BINARY:
+        return np.packbits(embeddings > 0, axis=1)
+    raise ValueError(f"Unknown quantization mode: {mode!r}")
+
+
+if hasattr(np, "bitwise_count"):
+    def _popcount(x: np.ndarray) -> np.ndarray:
+        return np.bitwise_count(x)
+else:
+    _POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _popcount(x: np.ndarray) -> np.ndarray:
+        return _POPCOUNT[x]
+
+
+def approximate_scores(codes: np.ndarray, query: np.ndarray, mode: str) -> np.ndarray:
+    """Approximate similarity (higher = closer) of every code to a float32 query."""
+    query = np.asarray(query, dtype=np.float32)
+    if mode == QUANT_INT8:
+        scales = codes[:, :4].copy().view(np.float32).ravel()
+        values = codes[:, 4:].view(np.int8)
+        scores = np.empty(len(codes), dtype=np.float32)
+        for b in range(0, len(codes), _SCAN_BLOCK):
+            block = values[b:b + _SCAN_BLOCK].astype(np.float32)
+            scores[b:b + _SCAN_BLOCK] = (block @ query) * scales[b:b + _SCAN_BLOCK]
+        return scores
+    if mode == QUANT_BINARY:
+        q_bits = quantize(query[None, :], QUANT_BINARY)[0]
+        hamming = _popcount(np.bitwise_xor(codes, q_bits)).sum(axis=1, dtype=np.int32)
+        return (len(query) - 2 * hamming).astype(np.float32)
+    raise ValueError(f"Unknown quantization mode: {mode!r}")
+
+
+class QuantizedIndex:
+    """
+    In-memory codes of the evidence table plus the columns needed to pre-filter.
+
+    Immutable: extended() returns a new index, so a search running on one
+    never sees its arrays half-updated by a concurrent insert.
+    """
+
+    def __init__(
+        self,
+        mode: str,
+        dim: int = TEXT_EMBEDDING_DIM,
+        chunk_ids=(),
+        modalities=(),
+        source_ids=(),
+        codes: Optional[np.ndarray] = None,
+    ):
+        self.mode = mode
+        self.dim = dim
+        if codes is None:
+            codes = np.empty((0, code_size(mode, dim)), dtype=np.uint8)
+        self.codes = np.asarray(codes, dtype=np.uint8)
+        self.chunk_ids = _object_array(chunk_ids)
+        self.modalities = _object_array(modalities)
+        self.source_ids = _object_array(source_ids)
+        if not len(self.codes) == len(self.chunk_ids) == len(self.modalities) == len(self.source_ids):
+            raise ValueError("codes, chunk_ids, modalities and source_ids differ in length")
+
+    def __len__(self) -> int:
+        return len(self.chunk_ids)
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes
+
+    def extended(self, chunk_ids, modalities, source_ids, codes: np.ndarray) -> "QuantizedIndex":
+        """A new index with these rows appended."""
+        return QuantizedIndex(
+            self.mode,
+            self.dim,
+            np.concatenate([self.chunk_ids, _object_array(chunk_ids)]),
+            np.concatenate([self.modalities, _object_array(modalities)]),
+            np.concatenate([self.source_ids, _object_array(source_ids)]),
+            np.vstack([self.codes, np.asarray(codes, dtype=np.uint8)]),
+        )
+
+    def candidates(
+        self,
+        query: np.ndarray,
+        k: int,
+        modalities: Optional[list[str]] = None,
+        source_id: Optional[str] = None,
+    ) -> list[str]:
+        """chunk_ids of the k best codes for the query (after modality/source filters)."""
+        if not len(self):
+            return []
+
+        scores = approximate_scores(self.codes, query, self.mode)
+        if modalities:
+            scores[~np.isin(self.modalities, modalities)] = -np.inf
+        if source_id:
+            scores[self.source_ids != source_id] = -np.inf
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.isfinite(scores[top])]
+        top = top[np.argsort(-scores[top])]
+        return self.chunk_ids[top].tolist()
+
+
+def _object_array(values) -> np.ndarray:
+    array = np.empty(len(values), dtype=object)
+    array[:] = list(values)
+    return array
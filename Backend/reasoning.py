@@ -82,24 +82,19 @@ def calc_modality_agreement(chunks: list[dict]) -> float:
     else:
         diversity_bonus = 0.0
     
-    # Collect embeddings (unified text embeddings only)
-    embeddings = []
-    for c in chunks:
-        if c.get("text_embedding"):
-            embeddings.append(np.array(c["text_embedding"]))
+    # Collect embeddings (unified text embeddings only; numpy rows or lists)
+    embeddings = [c["text_embedding"] for c in chunks if c.get("text_embedding") is not None and len(c["text_embedding"])]
     
     if len(embeddings) < 2:
         return 0.5 + diversity_bonus
     
-    # Pairwise cosine similarity
-    similarities = []
-    for i in range(len(embeddings)):
-        for j in range(i + 1, len(embeddings)):
-            a, b = embeddings[i], embeddings[j]
-            cos_sim = np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b) + 1e-8)
-            similarities.append(max(0.0, cos_sim))  # Clamp negative
+    # Pairwise cosine similarity, one matrix product
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    matrix = matrix / (np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-8)
+    pairs = np.triu_indices(len(matrix), k=1)
+    similarities = np.maximum(0.0, (matrix @ matrix.T)[pairs])  # Clamp negative
     
-    avg_similarity = sum(similarities) / len(similarities)
+    avg_similarity = float(similarities.mean())
     scaled = max(0.0, min(1.0, avg_similarity))
     final = min(1.0, scaled * 0.8 + diversity_bonus)
     
@@ -0,0 +1,54 @@
+"""Offline re-embedding of the whole evidence table.
+
+Recomputes text_embedding for every row from its text_content with the
+current text backend, sharded across the embedding pool, and writes the
+vectors back in place (matched on chunk_id). Run with the API stopped or
+idle, e.g. after switching TEXT_EMBEDDING_BACKEND:
+
+    python reembed.py --workers 8 --batch-size 4096
+"""
+import argparse
+import time
+from loguru import logger
+
+from db import get_db
+from embed_pool import EmbeddingPool
+from embedder import get_embedder
+
+
+def reembed_all(workers: int, batch_size: int) -> int:
+    db = get_db()
+    total = db.count()
+    if total == 0:
+        logger.info("Evidence table is empty, nothing to re-embed")
+        return 0
+
+    pool = EmbeddingPool(workers=workers) if workers >= 2 else None
+    encoder = pool or get_embedder()
+    done = 0
+    t0 = time.perf_counter()
+    try:
+        for batch in db.scan(batch_size=batch_size):
+            texts = [t if t and t.strip() else " " for t in batch.column("text_content").to_pylist()]
+            done += db.replace_embeddings(batch, encoder.encode_texts(texts))
+            rate = done / (time.perf_counter() - t0)
+            logger.info(f"Re-embedded {done}/{total} rows ({rate:.0f} rows/s)")
+    finally:
+        if pool is not None:
+            pool.close()
+    return done
+
+
+def main():
+    from config import EMBED_POOL_WORKERS
+
+    parser = argparse.ArgumentParser(description="Re-embed every row of the evidence table.")
+    parser.add_argument("--workers", type=int, default=max(EMBED_POOL_WORKERS, 2), help="embedding processes")
+    parser.add_argument("--batch-size", type=int, default=4096, help="rows read and written per batch")
+    args = parser.parse_args()
+
+    reembed_all(args.workers, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,8 +11,18 @@ Modality Reliability Hierarchy:
 5. video_frame (frame OCR/caption)
 """
 from typing import Optional
-from db import get_db
+import json
+import re
+import threading
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from db import get_db, RESULT_COLUMNS, vector_matrix
+from filters import eq
+from async_db import submit_write
 from embedder import get_embedder
+from interval_index import get_interval_index, delete_interval_index
+from frame_store import delete_source_frames
 from loguru import logger
 
 
@@ -28,6 +38,12 @@ MODALITY_WEIGHTS = {
     "unknown": 0.3,
 }
 
+MAX_COOCCURRING = 6  # co-occurring chunks attached to one hit
+
+# Orphan sources whose delete is queued on the writer but has not run yet
+_PENDING_ORPHANS: set[str] = set()
+_pending_lock = threading.Lock()
+
 
 def get_modality_weight(modality: str) -> float:
     """Get base reliability weight for a modality."""
@@ -117,11 +133,66 @@ def rerank_results(
     return results[:limit]
 
 
+def rerank_table(
+    results: pa.Table,
+    limit: int = 5,
+    vector_weight: float = 0.5,
+    modality_weight: float = 0.3,
+    confidence_weight: float = 0.2,
+) -> pa.Table:
+    """
+    rerank_results() over an Arrow table of hits, vectorized.
+
+    Same score as calculate_final_score; adds a `final_score` column and
+    keeps the `limit` best rows.
+    """
+    if results.num_rows == 0:
+        return results
+    
+    sim = results.column("similarity").to_numpy(zero_copy_only=False)
+    weights = np.array(
+        [get_modality_weight(m) for m in results.column("modality").to_pylist()], dtype=np.float64
+    )
+    # OCR confidence if available, else ASR, else 1.0 for clean text
+    conf = pc.coalesce(
+        results.column("ocr_confidence"), results.column("asr_confidence"), pa.scalar(1.0)
+    ).to_numpy(zero_copy_only=False)
+    
+    final = np.minimum(1.0, sim * vector_weight + weights * modality_weight + conf * confidence_weight)
+    order = np.argsort(-final, kind="stable")[:limit]
+    results = results.append_column("final_score", pa.array(final, type=pa.float64()))
+    return results.take(pa.array(order, type=pa.int64()))
+
+
+def to_records(results: pa.Table, dim: Optional[int] = None) -> list[dict]:
+    """
+    Rows of an Arrow result table as dicts, for the API edge.
+
+    A text_embedding column becomes a float32 row view of one (n, dim)
+    matrix per row instead of a Python list of floats.
+    """
+    vectors = None
+    if "text_embedding" in results.column_names:
+        if results.num_rows:
+            vectors = vector_matrix(results.column("text_embedding"), dim or get_db().dim)
+        results = results.drop(["text_embedding"])
+    records = results.to_pylist()
+    if vectors is not None:
+        for record, vector in zip(records, vectors):
+            record["text_embedding"] = vector
+    return records
+
+
 def retrieve(
     query: str,
     limit: int = 5,
     modalities: Optional[list[str]] = None,
     rerank: bool = True,
+    include_cooccurring: bool = False,
+    query_embedding: Optional[list[float]] = None,
+    nprobes: Optional[int] = None,
+    refine_factor: Optional[int] = None,
+    include_vectors: bool = False,
 ) -> list[dict]:
     """
     Two-layer retrieval with optional re-ranking.
@@ -129,88 +200,193 @@ def retrieve(
     Layer 1: Vector similarity search (retrieves 2x limit for re-ranking)
     Layer 2: Modality + confidence re-ranking (if enabled)
     
+    Both layers work on Arrow columns (see retrieve_table); dicts are built
+    once for the final hits.
+    
     Args:
         query: Search query text
         limit: Maximum number of final results
         modalities: Filter by modality types
         rerank: Whether to apply layer 2 re-ranking
+        include_cooccurring: Attach transcript/frames overlapping each
+            timestamped hit as `cooccurring` (see attach_cooccurring)
+        query_embedding: Precomputed query vector (e.g. from the query
+            micro-batcher); embedded here if not given
+        nprobes, refine_factor: ANN search knobs (see LanceDBClient.search)
+        include_vectors: Also return each hit's text_embedding (a numpy
+            row), e.g. for the modality agreement score
     
     Returns:
         List of evidence chunks with final scores
     """
+    results = retrieve_table(
+        query,
+        limit=limit,
+        modalities=modalities,
+        rerank=rerank,
+        query_embedding=query_embedding,
+        nprobes=nprobes,
+        refine_factor=refine_factor,
+        include_vectors=include_vectors,
+    )
+    if results.num_rows == 0:
+        return []
+    
+    records = to_records(results)
+    if include_cooccurring:
+        attach_cooccurring(records)
+    
+    return records
+
+
+def retrieve_table(
+    query: str,
+    limit: int = 5,
+    modalities: Optional[list[str]] = None,
+    rerank: bool = True,
+    query_embedding: Optional[list[float]] = None,
+    nprobes: Optional[int] = None,
+    refine_factor: Optional[int] = None,
+    include_vectors: bool = False,
+) -> pa.Table:
+    """retrieve() without the dict conversion: the final hits as an Arrow table."""
     db = get_db()
-    embedder = get_embedder()
     
     # Embed query
-    query_embedding = embedder.embed_text(query)
+    if query_embedding is None:
+        query_embedding = get_embedder().embed_text(query)
     
-    if not query_embedding:
-        return []
+    if query_embedding is None or len(query_embedding) == 0:
+        return pa.table({})
     
     # Layer 1: Vector search (get more candidates for re-ranking)
     search_limit = limit * 2 if rerank else limit
-    results = db.search(
+    columns = RESULT_COLUMNS + ["text_embedding"] if include_vectors else RESULT_COLUMNS
+    results = db.search_arrow(
         query_embedding, 
         limit=search_limit, 
-        modalities=modalities
+        modalities=modalities,
+        nprobes=nprobes,
+        refine_factor=refine_factor,
+        columns=columns,
     )
     
-    if not results:
-        return []
+    if results.num_rows == 0:
+        return results
     
     # Layer 2: Re-rank by modality + confidence
     if rerank:
-        results = rerank_results(results, limit=limit)
-        logger.info(f"Re-ranked {len(results)} results by modality + confidence")
+        results = rerank_table(results, limit=limit)
+        logger.info(f"Re-ranked {results.num_rows} results by modality + confidence")
     
     # --- Lazy Cleanup: Check if source files exist ---
     from config import DATA_DIR
-    from pathlib import Path
     
-    valid_results = []
-    checked_sources = {}  # source_id -> exists (bool)
-    
-    for r in results:
-        source_id = r.get("source_id")
+    missing = []
+    for source_id in pc.unique(results.column("source_id")).to_pylist():
         if not source_id:
-            valid_results.append(r)
             continue
-            
-        if source_id not in checked_sources:
-            # Check if any file starts with source_id in DATA_DIR
-            # Ingest saves files as {source_id}.{ext}
-            found = False
-            try:
-                # fast glob check
-                if any(DATA_DIR.glob(f"{source_id}.*")):
-                    found = True
-            except Exception as e:
-                logger.error(f"Error checking file existence for {source_id}: {e}")
-                found = True # fail safe, keep it
-            
-            checked_sources[source_id] = found
-            
-            if not found:
-                logger.warning(f"Source file for {source_id} missing. Deleting from DB.")
-                # Fire and forget delete (or await if async, but this is sync context currently)
-                # LanceDB delete is sync
-                try:
-                    db.delete_source(source_id)
-                except Exception as e:
-                    logger.error(f"Failed to delete orphan source {source_id}: {e}")
-
-        if checked_sources[source_id]:
-            valid_results.append(r)
-            
-    results = valid_results
+        # Check if any file starts with source_id in DATA_DIR
+        # Ingest saves files as {source_id}.{ext}
+        try:
+            # fast glob check
+            if any(DATA_DIR.glob(f"{source_id}.*")):
+                continue
+        except Exception as e:
+            logger.error(f"Error checking file existence for {source_id}: {e}")
+            continue  # fail safe, keep it
+        
+        missing.append(source_id)
+        with _pending_lock:
+            if source_id in _PENDING_ORPHANS:
+                continue  # already queued by another query
+            _PENDING_ORPHANS.add(source_id)
+        logger.warning(f"Source file for {source_id} missing. Deleting from DB.")
+        # Queued on the writer thread; the query does not wait for the delete
+        submit_write(_delete_orphan, db, source_id)
     
-    if not results:
-        return []
+    if missing:
+        results = results.filter(pc.invert(pc.is_in(results.column("source_id"), value_set=pa.array(missing))))
     # -------------------------------------------------
-
+    
     return results
 
 
+def _delete_orphan(db, source_id: str) -> None:
+    try:
+        db.delete_source(source_id)
+        delete_interval_index(source_id)
+        delete_source_frames(source_id)
+    except Exception as e:
+        logger.error(f"Failed to delete orphan source {source_id}: {e}")
+    finally:
+        with _pending_lock:
+            _PENDING_ORPHANS.discard(source_id)
+
+
+def attach_cooccurring(results: list[dict]) -> None:
+    """
+    Attach the chunks co-occurring in time with each audio/video hit.
+
+    Overlapping chunk IDs come from each source's interval index; the rows
+    of all hits are then fetched with a single bulk lookup. Each hit gets a
+    `cooccurring` list in time order (the hit itself and other hits excluded).
+    """
+    hit_ids = {r.get("chunk_id") for r in results}
+    wanted: dict[str, list[str]] = {}
+
+    for r in results:
+        if r.get("timestamp_start") is None or not r.get("source_id"):
+            continue
+        index = get_interval_index(r["source_id"])
+        if index is None:
+            continue
+        start = float(r["timestamp_start"])
+        end = float(r["timestamp_end"]) if r.get("timestamp_end") is not None else start
+        ids = [cid for cid in index.overlapping(start, end) if cid not in hit_ids]
+        wanted[r["chunk_id"]] = ids[:MAX_COOCCURRING]
+
+    all_ids = sorted({cid for ids in wanted.values() for cid in ids})
+    if not all_ids:
+        return
+
+    db = get_db()
+    rows = {row["chunk_id"]: row for row in db.get_by_ids(all_ids)}
+
+    for r in results:
+        ids = wanted.get(r.get("chunk_id"))
+        if ids:
+            r["cooccurring"] = [rows[cid] for cid in ids if cid in rows]
+
+
+def parse_regions(chunk: dict) -> list[dict]:
+    """Decode a video frame's OCR regions (text, bbox, confidence) in reading order."""
+    raw = chunk.get("ocr_regions")
+    if not raw:
+        return []
+    try:
+        return json.loads(raw)
+    except (TypeError, ValueError):
+        return []
+
+
+def best_region(regions: list[dict], query: str) -> Optional[int]:
+    """
+    Pick the OCR region a citation should point at.
+
+    Scores regions by how many query words they contain (ties go to the more
+    confident region); returns None if no region shares a word with the query.
+    """
+    query_words = set(re.findall(r"\w+", query.lower()))
+    best_idx, best_key = None, (0, 0.0)
+    for i, region in enumerate(regions):
+        overlap = len(query_words & set(re.findall(r"\w+", region.get("text", "").lower())))
+        key = (overlap, region.get("confidence") or 0.0)
+        if overlap and key > best_key:
+            best_idx, best_key = i, key
+    return best_idx
+
+
 def retrieve_by_source(source_id: str) -> list[dict]:
     """Get all chunks from a specific source."""
     db = get_db()
@@ -224,11 +400,8 @@ def retrieve_by_modality(modality: str, limit: int = 20) -> list[dict]:
     if db.table is None:
         return []
     
-    # Sanitize modality to prevent injection
-    safe_modality = modality.replace("'", "''")
-    
     try:
-        results = db.table.search().where(f"modality = '{safe_modality}'").limit(limit).to_list()
+        results = db.table.search().where(eq("modality", modality)).select(RESULT_COLUMNS).limit(limit).to_list()
         return results
     except Exception:
         return []
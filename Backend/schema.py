@@ -0,0 +1,201 @@
+"""Versioned Arrow schema of the evidence table.
+
+New tables are created with evidence_schema() instead of a schema inferred
+from the first batch. Every insert is coerced to the table's schema
+(coerce): columns are reordered and cast, and absent nullable columns are
+filled with nulls. A batch that cannot be coerced raises SchemaError and
+the table is left untouched.
+
+Tables created by older releases are brought up to SCHEMA_VERSION in
+place (migrate):
+
+- columns added in later versions are appended with a backfill default
+  (MIGRATIONS), without rewriting existing data files; values derived
+  from other columns are then filled in by BACKFILLS
+- columns whose type was mis-inferred (e.g. null-typed because the first
+  batch had no value) are re-added or cast with the declared type; a
+  column that still differs raises SchemaError, since no insert would fit
+
+A table's version is the last version whose columns it has, so it needs
+no separate bookkeeping.
+"""
+from loguru import logger
+import pyarrow as pa
+
+from config import LEGACY_TEXT_EMBEDDING_MODEL
+
+SCHEMA_VERSION = 4
+
+# Row lifecycle for progressive ingestion
+STATUS_PARTIAL = "partial"
+STATUS_COMPLETE = "complete"
+
+# Metadata columns, in order: name, Arrow type, nullable
+METADATA_FIELDS = [
+    ("chunk_id", pa.string(), False),
+    ("source_id", pa.string(), False),
+    ("source_file", pa.string(), False),
+    ("source_type", pa.string(), False),
+    ("text_content", pa.string(), False),
+    ("modality", pa.string(), False),
+    ("page_number", pa.int64(), True),
+    ("timestamp_start", pa.float64(), True),
+    ("timestamp_end", pa.float64(), True),
+    ("line_start", pa.int64(), True),
+    ("line_end", pa.int64(), True),
+    ("bbox", pa.list_(pa.float64()), True),
+    ("ocr_regions", pa.string(), True),
+    ("audio_context", pa.string(), True),
+    ("image_path", pa.string(), True),
+    ("ocr_confidence", pa.float64(), True),
+    ("asr_confidence", pa.float64(), True),
+    ("avg_logprob", pa.float64(), True),
+    ("status", pa.string(), False),
+]
+
+# Defaults for metadata columns a chunk may lack
+METADATA_DEFAULTS = {
+    "chunk_id": "",
+    "source_id": "",
+    "source_file": "",
+    "source_type": "unknown",
+    "text_content": "",
+    "modality": "unknown",
+    "status": STATUS_COMPLETE,
+}
+
+# Columns derived from the embedding (rebuilt when a row is re-embedded)
+VECTOR_COLUMNS = ["text_embedding", "text_embedding_q", "embedding_model"]
+
+# version -> columns it added: name -> SQL default used to backfill older tables
+MIGRATIONS = {
+    2: {
+        "status": f"'{STATUS_COMPLETE}'",
+        "ocr_regions": "CAST(NULL AS string)",
+        "audio_context": "CAST(NULL AS string)",
+    },
+    3: {
+        "text_embedding_q": "CAST(NULL AS binary)",
+        "embedding_model": f"'{LEGACY_TEXT_EMBEDDING_MODEL}'",
+    },
+    4: {
+        "source_type": "'unknown'",
+    },
+}
+
+# version -> function filling its columns of an older table with derived values
+# (after they were added with the defaults above)
+BACKFILLS = {
+    4: lambda table: _backfill_source_type(table),
+}
+
+
+class SchemaError(ValueError):
+    """A batch or table that cannot be made to fit the evidence schema."""
+
+
+def evidence_schema(dim: int) -> pa.Schema:
+    """The evidence table schema for `dim`-dimensional text embeddings."""
+    fields = [pa.field(name, type_, nullable=nullable) for name, type_, nullable in METADATA_FIELDS]
+    fields += [
+        pa.field("text_embedding", pa.list_(pa.float32(), dim), nullable=False),
+        pa.field("text_embedding_q", pa.binary(), nullable=True),
+        pa.field("embedding_model", pa.string(), nullable=False),
+    ]
+    return pa.schema(fields, metadata={"schema_version": str(SCHEMA_VERSION)})
+
+
+def table_version(schema: pa.Schema) -> int:
+    names = set(schema.names)
+    version = 1
+    for v in sorted(MIGRATIONS):
+        if not set(MIGRATIONS[v]) <= names:
+            break
+        version = v
+    return version
+
+
+def coerce(data: pa.Table, schema: pa.Schema) -> pa.Table:
+    """Reorder and cast `data` to `schema`, filling absent nullable columns with nulls."""
+    columns = []
+    for field in schema:
+        if field.name in data.column_names:
+            column = data.column(field.name)
+            if column.type != field.type:
+                try:
+                    column = column.cast(field.type)
+                except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+                    raise SchemaError(f"Column {field.name!r}: cannot cast {column.type} to {field.type}: {e}") from e
+        elif field.nullable:
+            column = pa.nulls(data.num_rows, type=field.type)
+        else:
+            raise SchemaError(f"Missing required column {field.name!r}")
+        if not field.nullable and column.null_count:
+            raise SchemaError(f"Column {field.name!r} has {column.null_count} nulls but is not nullable")
+        columns.append(column)
+
+    extra = set(data.column_names) - set(schema.names)
+    if extra:
+        logger.warning(f"Dropping columns not in the table schema: {sorted(extra)}")
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def migrate(table, dim: int) -> None:
+    """Bring an existing LanceDB table up to SCHEMA_VERSION in place."""
+    from_version = table_version(table.schema)
+
+    existing = set(table.schema.names)
+    missing = {}
+    for version in sorted(MIGRATIONS):
+        missing.update({name: default for name, default in MIGRATIONS[version].items() if name not in existing})
+    if missing:
+        logger.info(f"Schema v{from_version} -> v{SCHEMA_VERSION}: adding columns {list(missing)}")
+        table.add_columns(missing)
+        for version in sorted(BACKFILLS):
+            if set(MIGRATIONS[version]) & set(missing):
+                BACKFILLS[version](table)
+
+    target = evidence_schema(dim)
+    for field in target:
+        if field.name not in existing:
+            continue
+        current = table.schema.field(field.name).type
+        if current == field.type or field.name == "text_embedding":
+            continue
+        if pa.types.is_null(current):
+            # All values are null: re-adding the column loses nothing
+            logger.info(f"Retyping null column {field.name!r} as {field.type}")
+            table.drop_columns([field.name])
+            table.add_columns(pa.field(field.name, field.type))
+        else:
+            logger.info(f"Casting column {field.name!r} from {current} to {field.type}")
+            try:
+                table.alter_columns({"path": field.name, "data_type": field.type})
+            except Exception as e:
+                logger.error(f"Cannot cast column {field.name!r} from {current} to {field.type}: {e}")
+
+    wrong = {
+        field.name: table.schema.field(field.name).type
+        for field in target
+        if field.name in table.schema.names
+        and field.name != "text_embedding"
+        and table.schema.field(field.name).type != field.type
+    }
+    if wrong:
+        raise SchemaError(f"Columns left with the wrong type after migration: {wrong}")
+
+
+def _backfill_source_type(table) -> None:
+    """source_type from source_file's extension (what ingestion.get_source_type gives new rows)."""
+    from filters import literal, or_
+    from ingestion import (
+        DOCUMENT_EXTENSIONS, IMAGE_EXTENSIONS, AUDIO_EXTENSIONS, VIDEO_EXTENSIONS, get_source_type,
+    )
+
+    # Lance SQL has no CASE, so one update per source type
+    by_type: dict[str, list[str]] = {}
+    for ext in sorted(DOCUMENT_EXTENSIONS | IMAGE_EXTENSIONS | AUDIO_EXTENSIONS | VIDEO_EXTENSIONS):
+        by_type.setdefault(get_source_type(ext), []).append(ext)
+    for source_type, extensions in by_type.items():
+        where = or_(*(f"lower(source_file) LIKE {literal('%' + ext)}" for ext in extensions))
+        table.update(where=where, values={"source_type": source_type})
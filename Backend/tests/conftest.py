@@ -0,0 +1,19 @@
+"""Make the Backend modules importable as top-level modules, as the app does."""
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+
+@pytest.fixture
+def lance_client(tmp_path, monkeypatch):
+    """A LanceDBClient on an empty index in tmp_path (active model from config)."""
+    pytest.importorskip("lancedb")
+    import db
+    import embedding_state
+
+    monkeypatch.setattr(embedding_state, "_STATE_PATH", tmp_path / "embedding_state.json")
+    monkeypatch.setattr(embedding_state, "_state", None)
+    return db.LanceDBClient(tmp_path / "lancedb")
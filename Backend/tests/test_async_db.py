@@ -0,0 +1,95 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import async_db
+from async_db import run_read, run_write, shutdown_async_db, submit_write
+
+
+@pytest.fixture(autouse=True)
+def _fresh_executors():
+    shutdown_async_db()
+    yield
+    shutdown_async_db()
+
+
+def _recorder():
+    running, overlaps, order = [0], [], []
+    lock = threading.Lock()
+
+    def write(i):
+        with lock:
+            running[0] += 1
+            overlaps.append(running[0])
+        time.sleep(0.01)
+        with lock:
+            order.append(i)
+            running[0] -= 1
+        return i
+
+    return write, overlaps, order
+
+
+def test_run_write_runs_one_at_a_time_in_submission_order():
+    write, overlaps, order = _recorder()
+
+    async def main():
+        return await asyncio.gather(*(run_write(write, i) for i in range(8)))
+
+    assert asyncio.run(main()) == list(range(8))
+    assert max(overlaps) == 1
+    assert order == list(range(8))
+
+
+def test_submit_write_shares_the_writer_with_run_write():
+    write, overlaps, order = _recorder()
+
+    async def main():
+        futures = [submit_write(write, i) for i in range(4)]
+        last = await run_write(write, 4)
+        return [f.result() for f in futures] + [last]
+
+    assert asyncio.run(main()) == list(range(5))
+    assert max(overlaps) == 1
+    assert order == list(range(5))
+
+
+def test_reads_do_not_wait_for_writes():
+    release = threading.Event()
+
+    async def main():
+        blocked = asyncio.ensure_future(run_write(release.wait, 5))
+        read = await asyncio.wait_for(run_read(lambda: "read"), timeout=2)
+        release.set()
+        await blocked
+        return read
+
+    assert asyncio.run(main()) == "read"
+
+
+def test_writer_is_created_once_across_threads():
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        writers = set(pool.map(lambda _: async_db._writer(), range(64)))
+    assert len(writers) == 1
+
+
+def test_get_db_builds_one_client_across_threads(monkeypatch):
+    import db
+
+    built = []
+
+    class SlowClient:
+        def __init__(self):
+            time.sleep(0.02)
+            built.append(self)
+
+    monkeypatch.setattr(db, "LanceDBClient", SlowClient)
+    monkeypatch.setattr(db, "_db_client", None)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        clients = set(pool.map(lambda _: id(db.get_db()), range(16)))
+
+    assert len(built) == 1
+    assert clients == {id(built[0])}
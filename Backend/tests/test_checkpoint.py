@@ -0,0 +1,63 @@
+import pytest
+
+from ingestion import checkpoint
+from ingestion.checkpoint import (
+    JobClaimed,
+    claim_job,
+    clear_checkpoint,
+    load_checkpoint,
+    pending_checkpoints,
+    release_job,
+    save_checkpoint,
+)
+
+
+@pytest.fixture(autouse=True)
+def _checkpoint_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpoint, "INGEST_CHECKPOINT_DIR", tmp_path)
+    return tmp_path
+
+
+def test_save_and_load_roundtrip():
+    state = {"source_id": "a", "next_window": 3, "next_chunk": 41, "file_path": "/data/a.mp4"}
+    save_checkpoint("a", state)
+
+    loaded = load_checkpoint("a")
+    assert {k: loaded[k] for k in state} == state
+    assert "updated_at" in loaded
+
+    # Later windows overwrite the earlier state
+    save_checkpoint("a", {**state, "next_window": 4})
+    assert load_checkpoint("a")["next_window"] == 4
+
+
+def test_pending_lists_uncleared_jobs(_checkpoint_dir):
+    save_checkpoint("a", {"source_id": "a"})
+    save_checkpoint("b", {"source_id": "b"})
+    (_checkpoint_dir / "broken.json").write_text("{not json")
+    clear_checkpoint("a")
+
+    assert [s["source_id"] for s in pending_checkpoints()] == ["b"]
+    assert load_checkpoint("a") is None
+    assert load_checkpoint("broken") is None
+
+
+def test_second_claim_is_refused_until_release():
+    fd = claim_job("a")
+    with pytest.raises(JobClaimed):
+        claim_job("a")
+    fd_b = claim_job("b")  # other jobs are independent
+
+    release_job("a", fd)
+    release_job("b", fd_b)
+    release_job("a", claim_job("a"))
+
+
+def test_release_keeps_the_lock_file_while_a_checkpoint_remains(_checkpoint_dir):
+    save_checkpoint("a", {"source_id": "a"})
+    release_job("a", claim_job("a"))
+    assert (_checkpoint_dir / "a.lock").exists()
+
+    clear_checkpoint("a")
+    release_job("a", claim_job("a"))
+    assert not (_checkpoint_dir / "a.lock").exists()
@@ -0,0 +1,105 @@
+import pyarrow as pa
+import pytest
+
+from corpus_stats import CorpusStats
+
+
+def _rows(source_id, modalities, texts, source_type="audio"):
+    n = len(modalities)
+    return pa.table({
+        "source_id": [source_id] * n,
+        "modality": modalities,
+        "source_type": [source_type] * n,
+        "text_content": texts,
+        "chunk_id": [f"{source_id}-{i}" for i in range(n)],
+    })
+
+
+def test_add_counts_rows_bytes_and_modalities():
+    stats = CorpusStats()
+    stats.add(_rows("a", ["ocr", "ocr", "audio_transcript"], ["ab", "é", None]))
+    stats.add(_rows("b", ["text"], ["hello"], source_type="txt"))
+
+    snap = stats.snapshot()
+    assert snap["total_rows"] == 4
+    assert snap["text_bytes"] == 2 + 2 + 0 + 5  # UTF-8 bytes; null text counts 0
+    assert snap["sources"] == 2
+    assert snap["by_modality"] == {"ocr": 2, "audio_transcript": 1, "text": 1}
+    assert snap["by_source_type"] == {"audio": 3, "txt": 1}
+    assert stats.source("a") == {
+        "rows": 3, "text_bytes": 4, "source_type": "audio",
+        "modalities": {"ocr": 2, "audio_transcript": 1},
+    }
+    assert stats.source("missing") is None
+
+
+def test_remove_source():
+    stats = CorpusStats()
+    stats.add(_rows("a", ["ocr", "text"], ["x", "y"]))
+    stats.add(_rows("b", ["text"], ["z"], source_type="txt"))
+
+    stats.remove_source("a")
+    stats.remove_source("a")  # unknown source: no-op
+
+    snap = stats.snapshot()
+    assert snap["total_rows"] == 1
+    assert snap["sources"] == 1
+    assert snap["by_modality"] == {"text": 1}
+    assert snap["by_source_type"] == {"txt": 1}
+
+
+def test_partial_remove_prunes_empty_entries():
+    stats = CorpusStats()
+    rows = _rows("a", ["audio_transcript", "video_frame", "video_frame"], ["aa", "b", "c"], source_type="video")
+    stats.add(rows)
+
+    stats.remove(rows.slice(1, 2))  # both frames
+    assert stats.source("a")["modalities"] == {"audio_transcript": 1}
+    assert stats.snapshot()["by_modality"] == {"audio_transcript": 1}
+
+    stats.remove(rows.slice(0, 1))
+    snap = stats.snapshot()
+    assert snap["sources"] == 0
+    assert snap["total_rows"] == 0
+    assert snap["by_modality"] == {}
+    assert snap["by_source_type"] == {}
+
+
+def test_build_without_table():
+    stats = CorpusStats()
+    assert not stats.snapshot()["ready"]
+    stats.build(None)
+    snap = stats.snapshot()
+    assert snap["ready"] and snap["total_rows"] == 0 and snap["built_at"] is not None
+
+
+def test_build_matches_incremental_counts(tmp_path):
+    lancedb = pytest.importorskip("lancedb")
+
+    rows = pa.concat_tables([
+        _rows("a", ["ocr", "text", "text"], ["one", "two", "three"]),
+        _rows("b", ["audio_transcript"], ["four"], source_type="txt"),
+    ])
+    table = lancedb.connect(str(tmp_path)).create_table("evidence", rows)
+
+    incremental = CorpusStats()
+    incremental.add(rows)
+    built = CorpusStats()
+    built.build(table)
+
+    for key in ("total_rows", "text_bytes", "sources", "by_modality", "by_source_type"):
+        assert built.snapshot()[key] == incremental.snapshot()[key]
+    assert built.source("a") == incremental.source("a")
+
+
+def test_build_table_without_source_type(tmp_path):
+    lancedb = pytest.importorskip("lancedb")
+
+    # Pre-v4 table: rows still land in a group
+    rows = _rows("a", ["text", "text"], ["x", "y"]).drop(["source_type"])
+    table = lancedb.connect(str(tmp_path)).create_table("evidence", rows)
+
+    stats = CorpusStats()
+    stats.build(table)
+    assert stats.snapshot()["total_rows"] == 2
+    assert stats.source("a")["rows"] == 2
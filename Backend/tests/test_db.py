@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("lancedb")
+
+import db as dbm
+from config import TEXT_EMBEDDING_DIM
+
+
+@pytest.fixture
+def client(lance_client, monkeypatch):
+    monkeypatch.setattr(dbm, "VECTOR_QUANTIZATION", "int8")
+    return lance_client
+
+
+def _chunks(client, n, **fields):
+    return [
+        {
+            "chunk_id": f"c{i}", "source_id": "s", "source_file": "scan.png", "source_type": "image",
+            "text_content": f"text {i}", "modality": "ocr", "embedding_model": client.model, **fields,
+        }
+        for i in range(n)
+    ]
+
+
+def _normalized(n, seed=0):
+    vectors = np.random.default_rng(seed).standard_normal((n, TEXT_EMBEDDING_DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_quantized_search_returns_limit_hits_under_selective_min_confidence(client):
+    n, limit = 500, 5
+    vectors = _normalized(n)
+    query = vectors[0]
+    # Only the rows least similar to the query pass the filter
+    confident = set(np.argsort(vectors @ query)[:limit].tolist())
+    chunks = _chunks(client, n)
+    for i, chunk in enumerate(chunks):
+        chunk["ocr_confidence"] = 0.9 if i in confident else 0.1
+    client.insert(chunks, vectors)
+
+    hits = client.search(query.tolist(), limit=limit, min_confidence=0.5)
+
+    assert len(hits) == limit
+    assert {hit["chunk_id"] for hit in hits} == {f"c{i}" for i in confident}
+
+
+def test_quantized_search_without_filter(client):
+    vectors = _normalized(50, seed=1)
+    client.insert(_chunks(client, 50), vectors)
+
+    hits = client.search(vectors[7].tolist(), limit=3)
+
+    assert len(hits) == 3
+    assert hits[0]["chunk_id"] == "c7"
@@ -0,0 +1,115 @@
+import threading
+
+import numpy as np
+import pytest
+
+import embedder
+from config import TEXT_EMBEDDING_DIM
+from embedding_migration import DONE, EmbeddingMigration, shadow_table_name
+from filters import eq
+from schema import evidence_schema
+
+NEW_DIM = 8
+
+
+class FakeEncoder:
+    """Deterministic stand-in for the new model: one vector per text length."""
+
+    def encode_texts(self, texts):
+        return np.array([[len(t)] + [1.0] * (NEW_DIM - 1) for t in texts], dtype=np.float32)
+
+
+def _chunks(db, ids, status="complete"):
+    return [
+        {
+            "chunk_id": cid, "source_id": "s", "source_file": "talk.mp3", "source_type": "audio",
+            "text_content": f"text of {cid}", "modality": "audio_transcript", "status": status,
+            "embedding_model": db.model,
+        }
+        for cid in ids
+    ]
+
+
+def _insert(db, ids, status="complete"):
+    db.insert(_chunks(db, ids, status), np.full((len(ids), TEXT_EMBEDDING_DIM), 0.1, dtype=np.float32))
+
+
+@pytest.fixture
+def migration(lance_client, monkeypatch):
+    import db
+
+    monkeypatch.setattr(db, "_db_client", lance_client)  # run() migrates get_db()
+    monkeypatch.setattr(embedder, "_embedder", None)  # ... and swaps the shared query embedder
+    m = EmbeddingMigration("acme/new-model", workers=1)
+    monkeypatch.setattr(m, "_make_encoder", FakeEncoder)
+    monkeypatch.setattr(m, "_query_embedder", lambda: "query-embedder")
+    return m
+
+
+def test_sync_applies_writes_made_during_the_copy(lance_client, migration):
+    db = lance_client
+    _insert(db, ["a", "b", "c"])
+    _insert(db, ["p"], status="partial")
+
+    migration._encoder = FakeEncoder()
+    migration._schema = evidence_schema(NEW_DIM)
+    migration._copy(db)
+    assert migration.done == 4
+
+    # Writes racing the copy: an insert, a delete and a commit
+    _insert(db, ["d"])
+    db.table.delete(eq("chunk_id", "b"))
+    db.mark_source_complete("s")
+    migration._sync(db)
+
+    shadow = migration._shadow.to_arrow()
+    statuses = dict(zip(shadow.column("chunk_id").to_pylist(), shadow.column("status").to_pylist()))
+    assert statuses == {"a": "complete", "c": "complete", "d": "complete", "p": "complete"}
+    assert shadow.schema.field("text_embedding").type.list_size == NEW_DIM
+    assert set(shadow.column("embedding_model").to_pylist()) == {"acme/new-model"}
+    assert migration._shadow_ids == statuses
+
+
+def test_run_syncs_and_cuts_over_under_the_write_lock(lance_client, migration, monkeypatch):
+    db = lance_client
+    _insert(db, ["a", "b"])
+    held = []
+
+    sync = migration._sync
+    syncs = []
+
+    def counted_sync(db_):
+        sync(db_)
+        syncs.append(db_)
+
+    def query_embedder():
+        # Lands after the catch-up sync: only the final sync can pick it up
+        _insert(db, ["late"])
+        return "query-embedder"
+
+    cutover = migration._cutover
+
+    def cutover_and_probe(db_, dim):
+        def try_write_lock():
+            acquired = db_.write_lock.acquire(blocking=False)
+            if acquired:
+                db_.write_lock.release()
+            held.append(not acquired)
+
+        probe = threading.Thread(target=try_write_lock)
+        probe.start()
+        probe.join()
+        cutover(db_, dim)
+
+    monkeypatch.setattr(migration, "_sync", counted_sync)
+    monkeypatch.setattr(migration, "_query_embedder", query_embedder)
+    monkeypatch.setattr(migration, "_cutover", cutover_and_probe)
+
+    migration.run()
+
+    assert migration.state == DONE, migration.error
+    assert len(syncs) == 2  # catch-up, then the final one under the lock
+    assert held == [True]
+    assert (db.table_name, db.model, db.dim) == (shadow_table_name("acme/new-model"), "acme/new-model", NEW_DIM)
+    assert sorted(db.table.to_arrow().column("chunk_id").to_pylist()) == ["a", "b", "late"]
+    assert embedder._embedder == "query-embedder"
@@ -0,0 +1,68 @@
+import pytest
+
+from filters import and_, column, eq, ge, in_, is_not_null, is_null, literal, or_
+
+
+def test_literal_strings_are_quoted_and_escaped():
+    assert literal("abc") == "'abc'"
+    assert literal("it's") == "'it''s'"
+    assert literal("x' OR '1'='1") == "'x'' OR ''1''=''1'"
+    assert literal("") == "''"
+
+
+def test_literal_scalars():
+    assert literal(None) == "NULL"
+    assert literal(True) == "TRUE"
+    assert literal(False) == "FALSE"
+    assert literal(42) == "42"
+    assert literal(0.5) == "0.5"
+
+
+@pytest.mark.parametrize("value", [float("nan"), float("inf"), float("-inf")])
+def test_literal_rejects_non_finite(value):
+    with pytest.raises(ValueError):
+        literal(value)
+
+
+@pytest.mark.parametrize("value", [b"bytes", [1], {"a": 1}, object()])
+def test_literal_rejects_other_types(value):
+    with pytest.raises(TypeError):
+        literal(value)
+
+
+@pytest.mark.parametrize("name", ["source_id", "_x", "Col2"])
+def test_column_accepts_identifiers(name):
+    assert column(name) == name
+
+
+@pytest.mark.parametrize("name", ["", "1col", "a b", "a;b", "a'--", "a.b", "a-b"])
+def test_column_rejects_anything_else(name):
+    with pytest.raises(ValueError):
+        column(name)
+
+
+def test_comparisons():
+    assert eq("source_id", "a'b") == "source_id = 'a''b'"
+    assert eq("source_id", None) == "source_id IS NULL"
+    assert ge("timestamp_start", 1.5) == "timestamp_start >= 1.5"
+    assert is_null("bbox") == "bbox IS NULL"
+    assert is_not_null("bbox") == "bbox IS NOT NULL"
+    with pytest.raises(ValueError):
+        eq("bad name", 1)
+
+
+def test_in():
+    assert in_("modality", []) == "FALSE"
+    assert in_("modality", ["ocr"]) == "modality = 'ocr'"
+    assert in_("modality", ("ocr", "text")) == "modality IN ('ocr', 'text')"
+    assert in_("modality", iter(["o'k", "x"])) == "modality IN ('o''k', 'x')"
+
+
+def test_and_or_skip_empty_clauses():
+    assert and_() is None
+    assert and_(None, "") is None
+    assert and_("a = 1") == "a = 1"
+    assert and_("a = 1", None, "b = 2") == "(a = 1) AND (b = 2)"
+    assert or_(None) is None
+    assert or_("a = 1", "b = 2") == "(a = 1) OR (b = 2)"
+    assert and_(or_("a = 1", "b = 2"), "c = 3") == "((a = 1) OR (b = 2)) AND (c = 3)"
@@ -0,0 +1,114 @@
+import random
+
+import interval_index
+from interval_index import (
+    IntervalIndex,
+    delete_interval_index,
+    get_interval_index,
+    load_interval_entries,
+    save_interval_index,
+)
+
+
+def _brute_force(entries, start, end):
+    return [p for s, e, p in sorted(entries, key=lambda x: (x[0], x[1])) if s <= end and e >= start]
+
+
+def test_overlapping_matches_brute_force():
+    rng = random.Random(0)
+    entries = []
+    for i in range(300):
+        s = rng.uniform(0, 1000)
+        entries.append((s, s + rng.uniform(0, 50), f"c{i}"))
+    index = IntervalIndex(entries)
+
+    for _ in range(200):
+        t0 = rng.uniform(-10, 1010)
+        t1 = t0 + rng.uniform(0, 30)
+        assert index.overlapping(t0, t1) == _brute_force(entries, t0, t1)
+
+
+def test_long_span_found_behind_short_ones():
+    # The running max of the ends keeps the walk going past short spans
+    index = IntervalIndex([(0.0, 100.0, "long"), (10.0, 11.0, "a"), (20.0, 21.0, "b")])
+    assert index.overlapping(50.0, 60.0) == ["long"]
+
+
+def test_boundaries_are_inclusive():
+    index = IntervalIndex([(5.0, 10.0, "x")])
+    assert index.overlapping(10.0, 12.0) == ["x"]
+    assert index.overlapping(0.0, 5.0) == ["x"]
+    assert index.overlapping(10.1, 12.0) == []
+
+
+def test_empty_index():
+    assert IntervalIndex().overlapping(0.0, 1.0) == []
+    assert len(IntervalIndex()) == 0
+
+
+def test_from_chunks_skips_untimed_and_defaults_end():
+    chunks = [
+        {"chunk_id": "a", "timestamp_start": 1.0, "timestamp_end": 2.0},
+        {"chunk_id": "b", "timestamp_start": 3.0, "timestamp_end": None},
+        {"chunk_id": "c"},
+    ]
+    index = IntervalIndex.from_chunks(chunks, payload_key="chunk_id")
+    assert len(index) == 2
+    assert index.overlapping(3.0, 3.0) == ["b"]
+    assert index.overlapping(0.0, 10.0) == ["a", "b"]
+
+
+def test_persistence_roundtrip(tmp_path, monkeypatch):
+    monkeypatch.setattr(interval_index, "INTERVAL_INDEX_DIR", tmp_path)
+    entries = [(0.0, 5.0, "a"), (4.0, 8.0, "b")]
+
+    save_interval_index("src", entries)
+    assert load_interval_entries("src") == entries
+    assert get_interval_index("src").overlapping(4.5, 4.5) == ["a", "b"]
+
+    # Saving again replaces the cached index
+    save_interval_index("src", entries[:1])
+    assert get_interval_index("src").overlapping(4.5, 4.5) == ["a"]
+
+    delete_interval_index("src")
+    assert get_interval_index("src") is None
+    assert load_interval_entries("src") == []
+
+
+def test_unreadable_index_is_empty(tmp_path, monkeypatch):
+    monkeypatch.setattr(interval_index, "INTERVAL_INDEX_DIR", tmp_path)
+    (tmp_path / "bad.json").write_text("{not json")
+    assert load_interval_entries("bad") == []
+
+
+def test_load_overlapping_a_save_is_not_cached(tmp_path, monkeypatch):
+    monkeypatch.setattr(interval_index, "INTERVAL_INDEX_DIR", tmp_path)
+    save_interval_index("src", [(0.0, 5.0, "old")])
+    load = interval_index.load_interval_entries
+
+    def load_then_save(source_id):
+        entries = load(source_id)
+        save_interval_index(source_id, [(0.0, 5.0, "new")])  # lands while the old entries are in flight
+        return entries
+
+    monkeypatch.setattr(interval_index, "load_interval_entries", load_then_save)
+    assert get_interval_index("src").overlapping(1.0, 1.0) == ["old"]
+
+    monkeypatch.setattr(interval_index, "load_interval_entries", load)
+    assert get_interval_index("src").overlapping(1.0, 1.0) == ["new"]
+
+
+def test_concurrent_lookups_keep_the_cache_bounded(tmp_path, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    monkeypatch.setattr(interval_index, "INTERVAL_INDEX_DIR", tmp_path)
+    monkeypatch.setattr(interval_index, "_CACHE_SIZE", 4)
+    monkeypatch.setattr(interval_index, "_CACHE", type(interval_index._CACHE)())
+    for i in range(16):
+        save_interval_index(f"s{i}", [(0.0, 1.0, f"c{i}")])
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        found = list(pool.map(lambda i: get_interval_index(f"s{i % 16}").overlapping(0.5, 0.5), range(400)))
+
+    assert found == [[f"c{i % 16}"] for i in range(400)]
+    assert len(interval_index._CACHE) <= 4
@@ -0,0 +1,99 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+import frame_store
+import interval_index
+from config import INGEST_WINDOW_SEC, TEXT_EMBEDDING_DIM
+from ingestion import checkpoint
+from ingestion.checkpoint import JobClaimed, load_checkpoint
+from ingestion.progressive import ProgressiveIndexer
+
+
+@pytest.fixture
+def indexer(lance_client, tmp_path, monkeypatch):
+    import ingestion
+
+    for module, name in [
+        (checkpoint, "INGEST_CHECKPOINT_DIR"),
+        (interval_index, "INTERVAL_INDEX_DIR"),
+        (frame_store, "FRAMES_DIR"),
+        (frame_store, "FRAME_CACHE_DIR"),
+    ]:
+        (tmp_path / name).mkdir()
+        monkeypatch.setattr(module, name, tmp_path / name)
+
+    def build_chunks(raw_chunks, source_id, filename, ext, start_index=0):
+        # Parser chunks as ingestion would store them, without loading a model
+        chunks = [
+            {
+                **raw, "chunk_id": f"{source_id}_{start_index + i}", "source_id": source_id,
+                "source_file": filename, "source_type": "video", "embedding_model": lance_client.model,
+            }
+            for i, raw in enumerate(raw_chunks)
+        ]
+        return chunks, np.full((len(chunks), TEXT_EMBEDDING_DIM), 0.05, dtype=np.float32)
+
+    monkeypatch.setattr(ingestion, "build_chunks", build_chunks)
+    indexer = ProgressiveIndexer("vid", "talk.mp4", ".mp4", file_path=tmp_path / "talk.mp4", db=lance_client)
+    (tmp_path / "talk.mp4").write_bytes(b"")
+    indexer.start()
+    yield indexer
+    indexer.release()
+
+
+def _window(start):
+    return [
+        {"text_content": f"said at {start}", "modality": "audio_transcript", "timestamp_start": start, "timestamp_end": start + 5.0},
+        {"text_content": f"shown at {start}", "modality": "video_frame", "timestamp_start": start + 1.0},
+    ]
+
+
+def _statuses(db, source_id):
+    return sorted(row["status"] for row in db.get_by_source(source_id, ["status"]))
+
+
+def test_commit_marks_rows_complete(indexer):
+    asyncio.run(indexer.add(_window(0.0)))
+    asyncio.run(indexer.add(_window(30.0)))
+    assert _statuses(indexer.db, "vid") == ["partial"] * 4
+
+    indexer.commit()
+
+    assert _statuses(indexer.db, "vid") == ["complete"] * 4
+    assert load_checkpoint("vid") is None
+    assert interval_index.get_interval_index("vid").overlapping(31.0, 31.0) == ["vid_2", "vid_3"]
+
+
+def test_abort_removes_partial_rows_frames_and_index(indexer, tmp_path):
+    asyncio.run(indexer.add(_window(0.0)))
+    asyncio.run(indexer.checkpoint_window(0, INGEST_WINDOW_SEC))
+    frame_store.save_thumbnail("vid", 1.0, b"webp")
+    frame_store.save_thumbnail("other", 1.0, b"webp")
+
+    indexer.abort()
+
+    assert indexer.db.get_by_source("vid") == []
+    assert load_checkpoint("vid") is None
+    assert interval_index.get_interval_index("vid") is None
+    assert [p.name for p in (tmp_path / "FRAMES_DIR").iterdir()] == [f"{frame_store.frame_stem('other', 1.0)}.webp"]
+
+
+def test_resume_drops_the_unfinished_window(indexer):
+    asyncio.run(indexer.add(_window(0.0)))
+    asyncio.run(indexer.checkpoint_window(0, INGEST_WINDOW_SEC))
+    asyncio.run(indexer.add(_window(INGEST_WINDOW_SEC)))  # interrupted before its checkpoint
+
+    with pytest.raises(JobClaimed):
+        ProgressiveIndexer.resume("vid", db=indexer.db)
+    indexer.release()
+
+    resumed = ProgressiveIndexer.resume("vid", db=indexer.db)
+    try:
+        assert resumed.resume_window == 1
+        assert resumed.next_index == 2
+        assert sorted(r["chunk_id"] for r in indexer.db.get_by_source("vid", ["chunk_id"])) == ["vid_0", "vid_1"]
+        assert [cid for _, _, cid in resumed.intervals] == ["vid_0", "vid_1"]
+    finally:
+        resumed.release()
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from quantization import (
+    QUANT_BINARY,
+    QUANT_INT8,
+    QuantizedIndex,
+    approximate_scores,
+    code_size,
+    quantize,
+)
+
+DIM = 64
+
+
+def _normalized(n, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_code_size():
+    assert code_size(QUANT_INT8, 384) == 388
+    assert code_size(QUANT_BINARY, 384) == 48
+    assert code_size(QUANT_BINARY, 10) == 2
+    with pytest.raises(ValueError):
+        code_size("fp16", 384)
+
+
+@pytest.mark.parametrize("mode", [QUANT_INT8, QUANT_BINARY])
+def test_quantize_shape(mode):
+    codes = quantize(_normalized(5), mode)
+    assert codes.dtype == np.uint8
+    assert codes.shape == (5, code_size(mode, DIM))
+
+
+def test_int8_scores_track_exact_dot_product():
+    vectors = _normalized(200)
+    query = _normalized(1, seed=1)[0]
+    approx = approximate_scores(quantize(vectors, QUANT_INT8), query, QUANT_INT8)
+    np.testing.assert_allclose(approx, vectors @ query, atol=0.02)
+
+
+def test_int8_zero_vector():
+    codes = quantize(np.zeros((1, DIM), dtype=np.float32), QUANT_INT8)
+    assert approximate_scores(codes, _normalized(1)[0], QUANT_INT8)[0] == 0.0
+
+
+def test_binary_scores_are_dim_minus_twice_hamming():
+    vectors = _normalized(50)
+    query = _normalized(1, seed=1)[0]
+    scores = approximate_scores(quantize(vectors, QUANT_BINARY), query, QUANT_BINARY)
+    hamming = ((vectors > 0) != (query > 0)).sum(axis=1)
+    np.testing.assert_array_equal(scores, DIM - 2 * hamming)
+
+
+@pytest.mark.parametrize("mode", [QUANT_INT8, QUANT_BINARY])
+def test_candidates_find_the_query_itself(mode):
+    vectors = _normalized(100)
+    ids = [f"c{i}" for i in range(100)]
+    index = QuantizedIndex(mode, DIM, ids, ["text"] * 100, ["s"] * 100, quantize(vectors, mode))
+    assert index.candidates(vectors[42], 5)[0] == "c42"
+
+
+def test_candidates_filters():
+    vectors = _normalized(6)
+    index = QuantizedIndex(
+        QUANT_INT8, DIM,
+        ["a", "b", "c", "d", "e", "f"],
+        ["text", "ocr", "text", "ocr", "text", "ocr"],
+        ["s1", "s1", "s1", "s2", "s2", "s2"],
+        quantize(vectors, QUANT_INT8),
+    )
+    assert set(index.candidates(vectors[0], 10, modalities=["ocr"])) == {"b", "d", "f"}
+    assert set(index.candidates(vectors[0], 10, source_id="s2")) == {"d", "e", "f"}
+    assert index.candidates(vectors[0], 10, modalities=["ocr"], source_id="s1") == ["b"]
+    assert index.candidates(vectors[0], 10, modalities=["audio"]) == []
+
+
+def test_empty_index():
+    index = QuantizedIndex(QUANT_BINARY, DIM)
+    assert len(index) == 0
+    assert index.candidates(_normalized(1)[0], 5) == []
+
+
+def test_extended_returns_a_new_index():
+    vectors = _normalized(3)
+    codes = quantize(vectors, QUANT_INT8)
+    first = QuantizedIndex(QUANT_INT8, DIM, ["a"], ["text"], ["s"], codes[:1])
+    second = first.extended(["b", "c"], ["text", "ocr"], ["s", "s"], codes[1:])
+
+    assert len(first) == 1 and first.codes.shape == (1, code_size(QUANT_INT8, DIM))
+    assert len(second) == 3 and second.codes.shape == (3, code_size(QUANT_INT8, DIM))
+    assert second.candidates(vectors[2], 1) == ["c"]
+
+
+def test_mismatched_lengths_rejected():
+    with pytest.raises(ValueError):
+        QuantizedIndex(QUANT_INT8, DIM, ["a", "b"], ["text"], ["s"], quantize(_normalized(1), QUANT_INT8))
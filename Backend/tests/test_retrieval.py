@@ -0,0 +1,71 @@
+import numpy as np
+import pyarrow as pa
+
+from retrieval import rerank_results, rerank_table, to_records
+
+
+def _hits():
+    return pa.table({
+        "chunk_id": ["doc", "ocr", "asr", "frame", "unknown"],
+        "modality": ["document", "ocr", "audio_transcript", "video_frame", "something_new"],
+        "ocr_confidence": pa.array([None, 0.3, None, 0.9, None], type=pa.float64()),
+        "asr_confidence": pa.array([None, None, 0.8, 0.1, None], type=pa.float64()),
+        "similarity": pa.array([0.5, 0.95, 0.7, 0.9, 0.6], type=pa.float64()),
+    })
+
+
+def test_rerank_table_matches_rerank_results():
+    hits = _hits()
+    expected = rerank_results(hits.to_pylist(), limit=5)
+    ranked = rerank_table(hits, limit=5)
+
+    assert ranked.column("chunk_id").to_pylist() == [r["chunk_id"] for r in expected]
+    np.testing.assert_allclose(
+        ranked.column("final_score").to_numpy(), [r["final_score"] for r in expected]
+    )
+
+
+def test_rerank_table_scores():
+    ranked = {r["chunk_id"]: r["final_score"] for r in rerank_table(_hits(), limit=5).to_pylist()}
+    # document: clean text, confidence 1.0
+    assert ranked["doc"] == 0.5 * 0.5 + 0.3 * 1.0 + 0.2 * 1.0
+    # OCR confidence wins over ASR when both are set
+    assert np.isclose(ranked["frame"], 0.9 * 0.5 + 0.3 * 0.4 + 0.2 * 0.9)
+    # unknown modalities get the "unknown" weight
+    assert np.isclose(ranked["unknown"], 0.6 * 0.5 + 0.3 * 0.3 + 0.2 * 1.0)
+
+
+def test_rerank_table_limit_and_cap():
+    hits = pa.table({
+        "chunk_id": ["a", "b", "c"],
+        "modality": ["document"] * 3,
+        "ocr_confidence": pa.nulls(3, pa.float64()),
+        "asr_confidence": pa.nulls(3, pa.float64()),
+        "similarity": pa.array([1.0, 0.2, 0.9], type=pa.float64()),
+    })
+    ranked = rerank_table(hits, limit=2)
+    assert ranked.num_rows == 2
+    assert ranked.column("chunk_id").to_pylist() == ["a", "c"]
+    assert ranked.column("final_score").to_pylist()[0] == 1.0  # capped
+
+
+def test_rerank_table_empty():
+    empty = _hits().slice(0, 0)
+    assert rerank_table(empty).num_rows == 0
+
+
+def test_to_records_vectors_become_row_views():
+    dim = 3
+    matrix = np.arange(6, dtype=np.float32).reshape(2, dim)
+    table = pa.table({
+        "chunk_id": ["a", "b"],
+        "text_embedding": pa.FixedSizeListArray.from_arrays(pa.array(matrix.ravel()), dim),
+    })
+    records = to_records(table, dim=dim)
+    assert [r["chunk_id"] for r in records] == ["a", "b"]
+    assert isinstance(records[1]["text_embedding"], np.ndarray)
+    np.testing.assert_array_equal(records[1]["text_embedding"], matrix[1])
+
+
+def test_to_records_without_vectors():
+    assert to_records(pa.table({"chunk_id": ["a"]})) == [{"chunk_id": "a"}]
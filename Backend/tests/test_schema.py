@@ -0,0 +1,158 @@
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from schema import (
+    METADATA_FIELDS,
+    SCHEMA_VERSION,
+    SchemaError,
+    coerce,
+    evidence_schema,
+    migrate,
+    table_version,
+)
+
+DIM = 4
+
+
+def _rows(n=2, **overrides):
+    columns = {
+        "chunk_id": [f"c{i}" for i in range(n)],
+        "source_id": ["s"] * n,
+        "source_file": ["talk.mp3"] * n,
+        "source_type": ["audio"] * n,
+        "text_content": ["hello"] * n,
+        "modality": ["audio_transcript"] * n,
+        "status": ["complete"] * n,
+        "text_embedding": pa.array([[0.5] * DIM] * n, type=pa.list_(pa.float32(), DIM)),
+        "embedding_model": ["m"] * n,
+    }
+    columns.update(overrides)
+    return pa.table(columns)
+
+
+def test_evidence_schema():
+    schema = evidence_schema(DIM)
+    assert schema.names[: len(METADATA_FIELDS)] == [name for name, _, _ in METADATA_FIELDS]
+    assert schema.field("text_embedding").type == pa.list_(pa.float32(), DIM)
+    assert schema.metadata[b"schema_version"] == str(SCHEMA_VERSION).encode()
+    assert table_version(schema) == SCHEMA_VERSION
+
+
+def test_table_version_of_older_schemas():
+    v1 = pa.schema([("chunk_id", pa.string()), ("text_embedding", pa.list_(pa.float32(), DIM))])
+    assert table_version(v1) == 1
+    v2 = pa.schema(list(v1) + [("status", pa.string()), ("ocr_regions", pa.string()), ("audio_context", pa.string())])
+    assert table_version(v2) == 2
+
+
+def test_coerce_orders_casts_and_fills_nullable():
+    rows = _rows(page_number=pa.array([1, 2], type=pa.int32()))
+    rows = rows.select(list(reversed(rows.column_names)))
+    out = coerce(rows, evidence_schema(DIM))
+
+    assert out.schema == evidence_schema(DIM)
+    assert out.column("page_number").type == pa.int64()
+    assert out.column("page_number").to_pylist() == [1, 2]
+    assert out.column("bbox").null_count == 2
+
+
+def test_coerce_drops_unknown_columns():
+    out = coerce(_rows(extra=["x", "y"]), evidence_schema(DIM))
+    assert "extra" not in out.column_names
+
+
+def test_coerce_rejects_missing_required_column():
+    with pytest.raises(SchemaError, match="chunk_id"):
+        coerce(_rows().drop(["chunk_id"]), evidence_schema(DIM))
+
+
+def test_coerce_rejects_nulls_in_required_column():
+    with pytest.raises(SchemaError, match="modality"):
+        coerce(_rows(modality=["a", None]), evidence_schema(DIM))
+
+
+def test_coerce_rejects_uncastable_column():
+    with pytest.raises(SchemaError, match="page_number"):
+        coerce(_rows(page_number=["one", "two"]), evidence_schema(DIM))
+
+
+def test_coerce_rejects_wrong_vector_size():
+    wrong = pa.array([[0.5] * (DIM + 1)] * 2, type=pa.list_(pa.float32(), DIM + 1))
+    with pytest.raises(SchemaError, match="text_embedding"):
+        coerce(_rows(text_embedding=wrong), evidence_schema(DIM))
+
+
+def _legacy_table(tmp_path, dim=DIM):
+    """A first-release table: no status/source_type/model columns, page_number and bbox inferred as null."""
+    lancedb = pytest.importorskip("lancedb")
+    v1 = _rows(
+        source_file=["talk.mp3", "slides.pdf"],
+        page_number=pa.nulls(2),
+        bbox=pa.nulls(2),
+        text_embedding=pa.array([[0.5] * dim] * 2, type=pa.list_(pa.float32(), dim)),
+    ).drop(["status", "source_type", "embedding_model"])
+    return lancedb.connect(str(tmp_path)).create_table("evidence", v1)
+
+
+def test_migrate_v1_table(tmp_path):
+    table = _legacy_table(tmp_path)
+    assert table_version(table.schema) == 1
+
+    migrate(table, DIM)
+
+    assert table_version(table.schema) == SCHEMA_VERSION
+    assert table.schema.field("page_number").type == pa.int64()
+    assert table.schema.field("bbox").type == pa.list_(pa.float64())
+    data = table.to_arrow().sort_by("chunk_id")
+    assert data.column("status").to_pylist() == ["complete", "complete"]
+    assert data.column("source_type").to_pylist() == ["audio", "pdf"]
+    assert data.column("embedding_model").to_pylist() == ["all-MiniLM-L6-v2"] * 2
+
+    # Idempotent, and inserts now fit
+    migrate(table, DIM)
+    table.add(coerce(_rows(bbox=pa.array([[0.0, 0.0, 1.0, 1.0], None])), table.schema))
+    assert table.count_rows() == 4
+
+
+def test_insert_after_migrating_legacy_table(tmp_path, monkeypatch):
+    lancedb = pytest.importorskip("lancedb")
+    import embedding_state
+    from config import LEGACY_TEXT_EMBEDDING_MODEL, TEXT_EMBEDDING_DIM
+    from db import LanceDBClient
+
+    monkeypatch.setattr(embedding_state, "_STATE_PATH", tmp_path / "embedding_state.json")
+    monkeypatch.setattr(embedding_state, "_state", None)
+    # Every first-release column, with page_number and bbox inferred as null
+    full = coerce(
+        _rows(text_embedding=pa.array([[0.5] * TEXT_EMBEDDING_DIM] * 2, type=pa.list_(pa.float32(), TEXT_EMBEDDING_DIM))),
+        evidence_schema(TEXT_EMBEDDING_DIM),
+    )
+    v1 = full.drop(
+        ["status", "ocr_regions", "audio_context", "text_embedding_q", "embedding_model", "source_type", "page_number", "bbox"]
+    ).append_column("page_number", pa.nulls(2)).append_column("bbox", pa.nulls(2))
+    lancedb.connect(str(tmp_path)).create_table("evidence", v1)
+
+    client = LanceDBClient(tmp_path)  # opens the legacy table and migrates it
+    chunks = [
+        {
+            "chunk_id": f"new{i}", "source_id": "s2", "source_file": "scan.png", "source_type": "image",
+            "text_content": "text", "modality": "ocr", "embedding_model": LEGACY_TEXT_EMBEDDING_MODEL,
+            "bbox": [0.0, 0.0, 1.0, 1.0] if i == 0 else None,
+        }
+        for i in range(2)
+    ]
+    embeddings = np.full((2, TEXT_EMBEDDING_DIM), 0.1, dtype=np.float32)
+
+    assert client.insert(chunks, embeddings) == 2
+    assert client.table.count_rows() == 4
+    assert client.get_by_id("new0")["bbox"] == [0.0, 0.0, 1.0, 1.0]
+
+
+def test_migrate_raises_when_a_column_cannot_be_fixed(tmp_path):
+    lancedb = pytest.importorskip("lancedb")
+    rows = _rows(page_number=pa.array(["one", "two"]))
+    table = lancedb.connect(str(tmp_path)).create_table("evidence", rows)
+
+    with pytest.raises(SchemaError, match="page_number"):
+        migrate(table, DIM)
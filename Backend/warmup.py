@@ -0,0 +1,100 @@
+"""Startup warm-up and readiness of the ML models.
+
+Models load lazily on first use, which makes the first request after a
+deploy wait 10-30 s. The lifespan hook starts warm_up() in the background:
+it loads each model named in WARMUP_MODELS (one at a time, in order) in a
+worker thread and runs one dummy inference, so lazy initialisation inside
+the libraries happens too.
+
+GET /ready reports each model's state and load time and answers 503 until
+every selected model is ready, so load balancers can hold traffic back.
+/health stays a plain liveness check.
+"""
+from typing import Callable
+from loguru import logger
+import asyncio
+import time
+
+from config import WARMUP_MODELS
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+def _warm_embedder() -> None:
+    from embedder import get_embedder
+    get_embedder().embed_text("warm-up")
+
+
+def _warm_asr() -> None:
+    import numpy as np
+    from ingestion.audio import get_asr_backend
+    from ingestion.media import SAMPLE_RATE
+
+    backend = get_asr_backend()
+    backend.load()
+    backend.transcribe(np.zeros(SAMPLE_RATE, dtype=np.float32))  # 1 s of silence
+
+
+def _warm_ocr() -> None:
+    import numpy as np
+    from ingestion.images import _get_image_ocr_reader
+    from ingestion.video import _get_easyocr_reader
+
+    blank = np.full((64, 256, 3), 255, dtype=np.uint8)
+    _get_image_ocr_reader().readtext(blank)
+    _get_easyocr_reader().readtext(blank)
+
+
+def _warm_clip() -> None:
+    from PIL import Image
+    from embedder import get_embedder
+
+    get_embedder().embed_image(Image.new("RGB", (224, 224)))
+
+
+WARMERS: dict[str, Callable[[], None]] = {
+    "embedder": _warm_embedder,
+    "asr": _warm_asr,
+    "ocr": _warm_ocr,
+    "clip": _warm_clip,
+}
+
+# model -> {"status", "load_sec", "error"}
+_STATE: dict[str, dict] = {}
+
+
+def selected_models() -> list[str]:
+    unknown = [m for m in WARMUP_MODELS if m not in WARMERS]
+    if unknown:
+        logger.warning(f"Ignoring unknown WARMUP_MODELS entries: {unknown}")
+    return [m for m in WARMUP_MODELS if m in WARMERS]
+
+
+async def warm_up() -> None:
+    """Load and exercise every selected model; failures are recorded, not raised."""
+    models = selected_models()
+    for name in models:
+        _STATE[name] = {"status": PENDING, "load_sec": None, "error": None}
+
+    for name in models:
+        _STATE[name]["status"] = LOADING
+        t0 = time.perf_counter()
+        try:
+            await asyncio.to_thread(WARMERS[name])
+            _STATE[name]["status"] = READY
+            logger.info(f"Warm-up: {name} ready in {time.perf_counter() - t0:.1f}s")
+        except Exception as e:
+            _STATE[name]["status"] = FAILED
+            _STATE[name]["error"] = str(e)
+            logger.error(f"Warm-up: {name} failed: {e}")
+        _STATE[name]["load_sec"] = round(time.perf_counter() - t0, 2)
+
+
+def readiness() -> tuple[bool, dict[str, dict]]:
+    """(all selected models ready, per-model state)."""
+    models = {name: dict(_STATE.get(name, {"status": PENDING, "load_sec": None, "error": None}))
+              for name in selected_models()}
+    return all(m["status"] == READY for m in models.values()), models